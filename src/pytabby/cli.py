@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Command-line interface, installed as the 'pytabby' console script
+
+Subcommands:
+    serve CONFIG: builds a menu from a yaml or json config file once and serves it (see server.py)
+    connect: connects the terminal to a served menu
+    compile CONFIG -o MODULE: generates a Python module that builds the menu without reading CONFIG (see codegen.py)
+"""
+
+import argparse
+import importlib
+
+from . import codegen, server, validators
+from .menu import Menu
+
+
+def _import_function(spec):
+    """Imports function from a 'module:function' string"""
+    module_name, _, function_name = spec.partition(":")
+    if not function_name:
+        raise argparse.ArgumentTypeError("expected module:function, not {0!r}".format(spec))
+    return getattr(importlib.import_module(module_name), function_name)
+
+
+def _add_address_arguments(parser):
+    """Adds arguments shared by serve and connect"""
+    parser.add_argument("--unix", metavar="PATH", help="Unix socket path; if not given, localhost TCP is used")
+    parser.add_argument("--host", default=server.DEFAULT_HOST, help="TCP host (default %(default)s)")
+    parser.add_argument("--port", type=int, default=server.DEFAULT_PORT, help="TCP port (default %(default)s)")
+
+
+def _build_parser():
+    """Returns argparse.ArgumentParser for main()"""
+    parser = argparse.ArgumentParser(prog="pytabby", description="pytabby terminal menus")
+    subparsers = parser.add_subparsers(dest="command")
+    subparsers.required = True
+
+    serve_parser = subparsers.add_parser("serve", help="serve a menu to many concurrent clients")
+    serve_parser.add_argument("config", help="yaml or json config file")
+    serve_parser.add_argument("--cache-dir", help="directory to cache the compiled config in")
+    serve_parser.add_argument("--message", help="message to show with the menu")
+    serve_parser.add_argument(
+        "--handler",
+        type=_import_function,
+        help="module:function called with every selection, returning text to send to the client",
+    )
+    _add_address_arguments(serve_parser)
+
+    connect_parser = subparsers.add_parser("connect", help="connect this terminal to a served menu")
+    _add_address_arguments(connect_parser)
+
+    compile_parser = subparsers.add_parser("compile", help="generate a Python module that builds a menu")
+    compile_parser.add_argument("config", help="yaml or json config file")
+    compile_parser.add_argument("-o", "--output", required=True, help="path of the .py file to write")
+    compile_parser.add_argument(
+        "--validation-backend",
+        choices=validators.VALIDATION_BACKENDS,
+        default="compiled",
+        help="validation backend (default %(default)s)",
+    )
+    return parser
+
+
+def main(argv=None):
+    """Entry point of the pytabby console script
+
+    Args:
+        argv (list of str or None): arguments; sys.argv[1:] if None
+    """
+    args = _build_parser().parse_args(argv)
+    if args.command == "serve":
+        menu = Menu.from_file(args.config, cache_dir=args.cache_dir)
+        server.serve(menu, args.unix, args.host, args.port, args.message, args.handler)
+    elif args.command == "connect":
+        server.connect(args.unix, args.host, args.port)
+    elif args.command == "compile":
+        codegen.generate(args.config, args.output, args.validation_backend)
@@ -0,0 +1,163 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Generates a Python module holding a compiled menu, called from cli.py ('pytabby compile') and by users
+
+The generated module contains, as literals:
+1. CONFIG: the validated and normalized config, with tuples instead of lists
+2. ITEM_TABLES: the prebuilt dispatch table (tab.create_item_table()) of every tab
+3. FRAMES: the rendered frame of every page of every tab, at the config's screen width and without message
+4. SOURCE_HASH: hex sha256 digest of the config file it was generated from
+5. FORMAT_VERSION: version of the layout above
+
+and a build_menu() function creating a Menu from them with load(), without calling the validators or normalizer
+modules or reading yaml. Once Python has cached its bytecode, importing it only unmarshals one .pyc file, in
+which tuples of constants are stored as single constants.
+
+Unlike a compiled artifact (compiled.py), a generated module can be versioned, packaged and imported like any
+other module. Its config holds tuples where a config from normalizer.normalize() holds lists, so a
+MenuDefinition built from it is not equal to one built from the config file.
+"""
+
+from . import _version, compiled
+from .definition import MAX_CACHED_FRAMES, MenuDefinition
+from .menu import Menu
+
+FORMAT_VERSION = 1
+
+# containers whose one-line literal is longer than this are written one element per line
+_MAX_INLINE_LENGTH = 100
+
+_TEMPLATE = '''#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""pytabby menu generated from {source_name} by pytabby {version}; do not edit
+
+Regenerate with: pytabby compile {source_name} -o {module_name}
+"""
+
+from pytabby import codegen
+
+FORMAT_VERSION = {format_version!r}
+
+SOURCE_HASH = {source_hash!r}
+
+CONFIG = {config}
+
+ITEM_TABLES = {item_tables}
+
+FRAMES = {frames}
+
+
+def build_menu(start_tab_number=0, path_to_config=None):
+    """Returns pytabby.Menu instance, built without validating, normalizing or reading the config file
+
+    Args:
+        start_tab_number (int): default 0, the number of the tab to start at
+        path_to_config (str or pathlib.Path or None): if given, the config file this module was generated
+                                                     from; raises pytabby.compiled.CompiledMenuError if its
+                                                     contents have changed since
+    """
+    return codegen.load(CONFIG, ITEM_TABLES, FRAMES, SOURCE_HASH, FORMAT_VERSION, start_tab_number, path_to_config)
+'''
+
+
+def _tuples(value):
+    """Returns copy of value, a normalized config or part of it, with every list replaced by a tuple"""
+    if isinstance(value, dict):
+        return {k: _tuples(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return tuple(_tuples(x) for x in value)
+    return value
+
+
+def _literal(value, indent=0):
+    """Returns Python source of value, made of dicts, tuples, strs, ints, bools and None
+
+    Containers are written on one line if short enough, otherwise one element per line with trailing commas
+    """
+    inline = repr(value)
+    if not isinstance(value, (dict, tuple)) or not value or indent + len(inline) <= _MAX_INLINE_LENGTH:
+        return inline
+    inner = " " * (indent + 4)
+    if isinstance(value, dict):
+        lines = ["{0}{1!r}: {2},".format(inner, k, _literal(v, indent + 4)) for k, v in value.items()]
+        brackets = "{}"
+    else:
+        lines = ["{0}{1},".format(inner, _literal(x, indent + 4)) for x in value]
+        brackets = "()"
+    return "{0}\n{1}\n{2}{3}".format(brackets[0], "\n".join(lines), " " * indent, brackets[1])
+
+
+def _prerender(definition):
+    """Returns rendered frames of every page of every tab, as keyed in MenuDefinition's cache
+
+    At most as many frames as the cache holds are rendered.
+    """
+    frames = {}
+    for tab_number in range(len(definition.tabs)):
+        for page_number in range(definition.n_pages(tab_number)):
+            if len(frames) == MAX_CACHED_FRAMES:
+                return frames
+            key = (tab_number, page_number, definition.screen_width, None)
+            frames[key] = definition.render(*key)
+    return frames
+
+
+def generate(path_to_config, path_to_module, validation_backend="compiled"):
+    """Reads, validates and normalizes a config file and writes it as a Python module
+
+    The file is read with Menu.read_config_file()
+
+    Args:
+        path_to_config (str or pathlib.Path): path to a yaml or json file following the config schema
+        path_to_module (str or pathlib.Path): path of the .py file to write
+        validation_backend (str): default 'compiled', or 'schema' to validate with the schema package
+    """
+    source_digest = compiled.source_hash(path_to_config)
+    definition = MenuDefinition(
+        _tuples(MenuDefinition.from_config(Menu.read_config_file(path_to_config), validation_backend).config)
+    )
+    source = _TEMPLATE.format(
+        source_name=str(path_to_config).replace("\\", "/").rsplit("/", 1)[-1],
+        module_name=str(path_to_module).replace("\\", "/").rsplit("/", 1)[-1],
+        version=_version.__version__,
+        format_version=FORMAT_VERSION,
+        source_hash=source_digest.hex(),
+        config=_literal(definition.config),
+        item_tables=_literal(tuple(tab_.item_table for tab_ in definition.tabs)),
+        frames=_literal(_prerender(definition)),
+    )
+    compiled.write_atomically(path_to_module, source.encode("utf-8"))
+
+
+def load(config, item_tables, frames, source_hash, format_version, start_tab_number=0, path_to_config=None):
+    """Creates Menu instance from the literals of a module written by generate(); called from its build_menu()
+
+    Args:
+        config (dict): CONFIG of the module
+        item_tables (tuple of dict): ITEM_TABLES of the module
+        frames (dict): FRAMES of the module
+        source_hash (str): SOURCE_HASH of the module
+        format_version (int): FORMAT_VERSION of the module
+        start_tab_number (int): default 0, the number of the tab to start at
+        path_to_config (str or pathlib.Path or None): if given, the config file the module was generated from
+
+    Returns:
+        (Menu) instance
+
+    Raises:
+        compiled.CompiledMenuError if the module has a different format version, or path_to_config is given
+                                   and its contents have changed since the module was generated
+    """
+    if format_version != FORMAT_VERSION:
+        raise compiled.CompiledMenuError(
+            "generated module has format version {0}, expected {1}; regenerate it".format(
+                format_version, FORMAT_VERSION
+            )
+        )
+    if path_to_config is not None and compiled.source_hash(path_to_config).hex() != source_hash:
+        raise compiled.CompiledMenuError(
+            "generated module is stale: {0} has changed since generation".format(path_to_config)
+        )
+    return Menu.from_definition(MenuDefinition(config, item_tables, frames), start_tab_number)
@@ -0,0 +1,152 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Functions to write and read compiled menu artifacts, called from menu.Menu only, not by user
+
+A compiled artifact holds a config that has already been validated and normalized, plus the prebuilt
+dispatch table (tab.create_item_table()) of every tab, so that a Menu can be built from it without calling the
+validators or normalizer modules.
+
+Artifact layout (all integers big-endian):
+1. MAGIC (8 bytes)
+2. FORMAT_VERSION (2 bytes)
+3. sha256 digest of the source the artifact was compiled from (32 bytes)
+4. sha256 digest of the payload (32 bytes)
+5. payload: marshal dump of a dict with keys 'config' and 'item_tables'
+
+marshal is used because the payload contains only dicts, lists, strs, ints, bools and None, which marshal
+reads much faster than json, yaml or pickle.
+
+glob and tempfile are imported where they are used, since loading an artifact needs neither.
+"""
+
+import hashlib
+import marshal
+import os
+import struct
+
+MAGIC = b"PYTABBY\x00"
+FORMAT_VERSION = 2
+
+_HEADER = struct.Struct(">8sH32s32s")
+
+
+class CompiledMenuError(Exception):
+    """Raised when a compiled artifact cannot be used: unrecognized, wrong format version, corrupt or stale."""
+
+
+def source_hash(path_to_config):
+    """Returns sha256 digest (bytes) of the contents of a config file"""
+    with open(path_to_config, "rb") as f:
+        return hashlib.sha256(f.read()).digest()
+
+
+def dump(path_to_compiled, config, tabs, source_digest):
+    """Writes compiled artifact
+
+    Args:
+        path_to_compiled (str or pathlib.Path): path to write to
+        config (dict): normalized config from menu.Menu
+        tabs (sequence of tab.Tab): tab objects from menu.Menu; every one is built if not already
+        source_digest (bytes): sha256 digest of the source config, from source_hash()
+    """
+    payload = marshal.dumps(
+        {
+            "config": config,
+            "item_tables": [tab_.item_table for tab_ in tabs],
+        }
+    )
+    header = _HEADER.pack(MAGIC, FORMAT_VERSION, source_digest, hashlib.sha256(payload).digest())
+    write_atomically(path_to_compiled, header + payload)
+
+
+def write_atomically(path, data):
+    """Writes bytes to path, so that a reader never sees a partially written file
+
+    Writes to a uniquely named temporary file in the same directory and renames it, so concurrent writers of
+    the same file cannot interfere with each other either. Also used by codegen.generate()
+    """
+    import tempfile  # pylint: disable=import-outside-toplevel  # see module docstring
+
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+
+def load(path_to_compiled, source_digest=None):
+    """Reads compiled artifact
+
+    Args:
+        path_to_compiled (str or pathlib.Path): path to read from
+        source_digest (bytes or None): if given, sha256 digest of the current source config; the artifact
+                                       is rejected if it was compiled from a different source
+
+    Returns:
+        (dict) with keys 'config' and 'item_tables'
+
+    Raises:
+        CompiledMenuError if the artifact is unrecognized, of a different format version, corrupt or stale
+    """
+    with open(path_to_compiled, "rb") as f:
+        data = f.read()
+    if len(data) < _HEADER.size:
+        raise CompiledMenuError("{0} is too short to be a compiled menu".format(path_to_compiled))
+    magic, version, compiled_source_digest, payload_digest = _HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise CompiledMenuError("{0} is not a compiled menu".format(path_to_compiled))
+    if version != FORMAT_VERSION:
+        raise CompiledMenuError(
+            "{0} has format version {1}, expected {2}; recompile it".format(path_to_compiled, version, FORMAT_VERSION)
+        )
+    if source_digest is not None and source_digest != compiled_source_digest:
+        raise CompiledMenuError("{0} is stale: its source has changed since compilation".format(path_to_compiled))
+    payload = data[_HEADER.size :]
+    if hashlib.sha256(payload).digest() != payload_digest:
+        raise CompiledMenuError("{0} is corrupt: payload hash does not match".format(path_to_compiled))
+    try:
+        return marshal.loads(payload)
+    except (EOFError, ValueError, TypeError) as e:
+        raise CompiledMenuError("{0} is corrupt: {1}".format(path_to_compiled, e))
+
+
+def cache_path(cache_dir, path_to_config):
+    """Returns path of the cached artifact for a config file, like a .pyc file for a .py file
+
+    The file name is made of a hash of the config file's absolute path and its current mtime and size, so
+    modifying the config file changes the cache path. The content hash stored in the artifact guards against
+    changes that leave mtime and size unchanged.
+
+    Args:
+        cache_dir (str or pathlib.Path): directory holding cached artifacts
+        path_to_config (str or pathlib.Path): path to a yaml or json config file
+
+    Returns:
+        (str) path
+    """
+    stat = os.stat(path_to_config)
+    return os.path.join(
+        str(cache_dir), "{0}-{1:x}-{2:x}.pytabby".format(_path_key(path_to_config), stat.st_mtime_ns, stat.st_size)
+    )
+
+
+def prune_cache(cache_dir, path_to_config, keep):
+    """Removes cached artifacts of earlier versions of a config file, except the one at path keep"""
+    import glob  # pylint: disable=import-outside-toplevel  # see module docstring
+
+    pattern = os.path.join(glob.escape(str(cache_dir)), "{0}-*.pytabby".format(_path_key(path_to_config)))
+    for path in glob.glob(pattern):
+        if path != keep:
+            try:
+                os.unlink(path)
+            except OSError:  # already removed by a concurrent launch
+                pass
+
+
+def _path_key(path_to_config):
+    """Returns short hex hash of the absolute path of a config file"""
+    return hashlib.sha256(os.path.abspath(str(path_to_config)).encode("utf-8")).hexdigest()[:16]
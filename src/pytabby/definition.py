@@ -0,0 +1,712 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Contains MenuDefinition class, the immutable part of a menu that any number of sessions can share
+
+A MenuDefinition holds everything that follows from a config alone: the validated and normalized config, the
+tab objects with their dispatch tables, the formatted item lines and the cache of rendered frames. Where the
+user is in the menu (current tab and page) is kept by menu.MenuSession objects, so one definition can be shared
+by many sessions, in one thread or many, e.g. by every connection of server.py.
+"""
+
+import hashlib
+import marshal
+import threading
+
+from . import formatting, itemlist, provider, search, tab, validators
+from .tab import PAGE_GOTO_PREFIX, PAGE_NEXT_INPUT, PAGE_PREVIOUS_INPUT, SEARCH_PREFIX
+
+# maximum number of rendered frames kept per MenuDefinition; the message is part of the key, and callers
+# may pass a different message at every run()
+MAX_CACHED_FRAMES = 256
+
+# maximum number of matching items shown after a search, if the config has no page_size
+_MAX_SHOWN_MATCHES = 50
+
+
+class MenuDefinition:
+    """Validated and normalized menu, immutable and hashable; build it once and share it between sessions
+
+    Two definitions are equal if their normalized configs are identical and they have the same item providers.
+    The config and tab objects must be treated as read-only; the only state that changes after instantiation is
+    caches, of tab objects, item lines, rendered frames, sorted inputs, search indexes and pages of provided
+    items, which are safe to use from several threads.
+
+    Args:
+        normalized_config (dict): a config that has already been validated and normalized,
+                                  e.g. by from_config() or from a compiled artifact
+        item_tables (list of dict or None): prebuilt dispatch tables, passed to tab.create_tab_objects()
+        frames (dict or None): prerendered frames to start the cache of rendered frames with
+
+    Attributes:
+        config (dict): the normalized config
+        tabs (tab.LazySequence of tab.Tab): one Tab object per tab of config, in order, built on first access
+                                            except the first; tabs.n_built counts those built so far
+        item_lines (tab.LazySequence of tuple of str): formatted item lines of every tab, on first access
+        screen_width (int): width that sessions wrap the tab headers to unless they set their own
+        page_size (int or None): number of items shown per page, or None if tabs are not paged
+        case_sensitive (bool): whether inputs are matched case-sensitively
+        has_multiple_tabs (bool): whether the menu has tab headers
+        item_providers (dict): tab number to provider.ItemProvider of the tab's provided items, if any
+
+    Methods:
+        from_config(config): class method to validate and normalize a config into a MenuDefinition
+        updated(config, previous_config): new MenuDefinition of a new version of the config, reusing unchanged tabs
+        with_items(tab_number, items): new MenuDefinition with items added to a tab, validating only them
+        without_item(tab_number, item_returns): new MenuDefinition without an item of a tab
+        with_tab(tab_dict): new MenuDefinition with a tab added, validating only it
+        n_pages(tab_number): number of pages of a tab
+        has_page(tab_number, page_number): whether a tab has a page
+        provided_result(tab_number, page_number, selection): Result of an input of a page's provided items
+        render(tab_number, page_number, screen_width, message=None): formatted menu, as shown to the user
+        sorted_inputs(tab_number): every valid input of a tab, sorted, for keystroke mode
+        render_search(tab_number, screen_width, query, message=None): formatted menu showing only matching items
+    """
+
+    __slots__ = (
+        "config",
+        "tabs",
+        "item_lines",
+        "screen_width",
+        "page_size",
+        "case_sensitive",
+        "has_multiple_tabs",
+        "item_providers",
+        "_frames",
+        "_frames_lock",
+        "_sorted_inputs",
+        "_search_indexes",
+        "_return_indexes",
+        "_choice_widths",
+        "_provided_pages",
+        "_digest",
+    )
+    # declared for linters, since _set_state() sets them with object.__setattr__()
+    config: dict
+    tabs: tab.LazySequence
+    item_lines: tab.LazySequence
+    screen_width: int
+    page_size: int
+    case_sensitive: bool
+    has_multiple_tabs: bool
+    item_providers: dict
+    _frames: dict
+    _frames_lock: threading.Lock
+    _sorted_inputs: dict
+    _search_indexes: dict
+    _return_indexes: dict
+    _choice_widths: dict
+    _provided_pages: dict
+    _digest: bytes
+
+    def __init__(self, normalized_config, item_tables=None, frames=None, item_providers=None):
+        """Instantiator for MenuDefinition class.
+
+        Args:
+            normalized_config (dict): output of validators.validate_and_normalize() or normalizer.normalize()
+            item_tables (list of dict or None): prebuilt dispatch tables, passed to tab.create_tab_objects()
+            frames (dict or None): prerendered frames keyed (tab_number, page_number, screen_width, message) like
+                                   the cache of render(), e.g. from a module generated by codegen.generate()
+            item_providers (dict or None): tab number to provider.ItemProvider of the tab's provided items
+
+        Raises:
+            ValueError if a key of item_providers is not the number of a tab, or a value is not an ItemProvider
+        """
+        _check_item_providers(item_providers, len(normalized_config["tabs"]))
+        # item lines never change for a given config, so they are formatted once per tab, when first shown
+        item_lines = tab.LazySequence(
+            len(normalized_config["tabs"]),
+            lambda i: tuple(formatting.format_item_lines(normalized_config["tabs"][i]["items"])),
+        )
+        tabs = tab.create_tab_objects(normalized_config, item_tables)
+        self._set_state(normalized_config, tabs, item_lines, frames, item_providers)
+
+    def _set_state(self, normalized_config, tabs, item_lines, frames=None, item_providers=None):
+        """Sets every attribute; called from __init__(), and from with_tab() and _with_tab_items() on new instances"""
+        set_ = object.__setattr__
+        set_(self, "config", normalized_config)
+        set_(self, "tabs", tabs)
+        set_(self, "item_lines", item_lines)
+        set_(self, "screen_width", normalized_config.get("screen_width", 80))
+        set_(self, "page_size", normalized_config.get("page_size", None))
+        # only used to change user input where required; the config contents have already been altered by
+        # the normalizer module
+        set_(self, "case_sensitive", normalized_config.get("case_sensitive", False))
+        set_(self, "has_multiple_tabs", len(normalized_config["tabs"]) > 1)
+        set_(self, "item_providers", {} if item_providers is None else dict(item_providers))
+        set_(self, "_frames", {} if frames is None else dict(frames))
+        set_(self, "_frames_lock", threading.Lock())
+        set_(self, "_sorted_inputs", {})
+        set_(self, "_search_indexes", {})
+        set_(self, "_return_indexes", {})
+        set_(self, "_choice_widths", {})
+        # (tab_number, page_number) to (provided items, item lines, input to Result), see _provided_page()
+        set_(self, "_provided_pages", {})
+        set_(self, "_digest", None)
+
+    @classmethod
+    def from_config(cls, config, validation_backend="compiled", item_providers=None):
+        """Validates and normalizes a config and creates a MenuDefinition from it
+
+        Args:
+            config (dict): a nested dict, in a schema which will be validated
+            validation_backend (str): default 'compiled', or 'schema' to validate with the schema package
+            item_providers (dict or None): tab number to provider.ItemProvider; the provided items are shown
+                                           below the tab's items of the config, and validated when fetched
+
+        Returns:
+            (MenuDefinition) instance
+        """
+        normalized_config = validators.validate_and_normalize(config, backend=validation_backend)
+        return cls(normalized_config, item_providers=item_providers)
+
+    def updated(self, config, previous_config, validation_backend="compiled"):
+        """Validates and normalizes a new version of the config this definition was built from
+
+        If the two versions differ only in the items of some tabs, and global_jump is not set, the items of the
+        other tabs are neither validated nor normalized again, and their rendered frames are kept. Otherwise this
+        is the same as from_config(config). Used by watcher.ConfigWatcher to reload a config file.
+
+        Args:
+            config (dict): the new version of the config
+            previous_config (dict): the config, as passed to from_config(), this definition was built from
+            validation_backend (str): default 'compiled', or 'schema' to validate with the schema package
+
+        Returns:
+            (MenuDefinition) new instance; this one is left unchanged
+
+        Raises:
+            validators.InvalidInputError if config is invalid, as from_config()
+        """
+        unchanged = _unchanged_tabs(config, previous_config)
+        normalized_tabs = {tab_number: self.config["tabs"][tab_number] for tab_number in unchanged}
+        normalized_config = validators.validate_and_normalize(
+            config, backend=validation_backend, normalized_tabs=normalized_tabs
+        )
+        with self._frames_lock:
+            frames = {key: frame for key, frame in self._frames.items() if key[0] in unchanged}
+        n_tabs = len(normalized_config["tabs"])
+        item_providers = {k: v for k, v in self.item_providers.items() if k < n_tabs}
+        return MenuDefinition(normalized_config, frames=frames, item_providers=item_providers)
+
+    def with_items(self, tab_number, items):
+        """Returns a new MenuDefinition with items added after the last item of a tab; this one is unchanged
+
+        Only the new items are validated and normalized, against indexes of the tab's inputs and return values that
+        are carried from one definition to the next. The cost is proportional to the number of new items, not to
+        the size of the tab: the tab's items become an itemlist.ItemList and its tables tab.LayeredDict objects,
+        sharing all but the change with this definition. The other tabs are shared with this definition, with their
+        item lines and rendered frames, and so are the tab's frames of pages before the new items if neither its
+        number of pages nor the width of its item choices changes.
+
+        Args:
+            tab_number (int): number of the tab
+            items (list of dict): items to add, as they would be in a config
+
+        Returns:
+            (MenuDefinition) new instance
+
+        Raises:
+            validators.InvalidInputError if the items are invalid, or repeat an input or return value of the tab
+            ValueError if the config has global_jump
+        """
+        tab_ = self.tabs[tab_number]
+        return_index = self._return_index(tab_number)
+        new_items = validators.validate_and_normalize_items(
+            self.config, tab_number, items, tab_.item_table, return_index
+        )
+        old_items = self._items(tab_number)
+        width_counts = dict(self._width_counts(tab_number))
+        for width, count in formatting.choice_width_counts(new_items).items():
+            width_counts[width] = width_counts.get(width, 0) + count
+        return self._with_tab_items(
+            tab_number,
+            old_items.appended(new_items),
+            len(old_items),
+            tab_.changed(added=tab.create_item_table(new_items)),
+            return_index.updated(
+                {item["item_returns"]: item_id for item_id, item in enumerate(new_items, start=old_items.next_id)}
+            ),
+            width_counts,
+        )
+
+    def without_item(self, tab_number, item_returns):
+        """Returns a new MenuDefinition without the item of a tab that returns item_returns; this one is unchanged
+
+        The item is found in the tab's index of return values, and its position in the tab's items from its id. As
+        in with_items(), the cost does not depend on the size of the tab, and everything that does not depend on
+        the tab's items after the removed one is shared with this definition.
+
+        Args:
+            tab_number (int): number of the tab
+            item_returns (object): the item's item_returns value, as in the config or normalized
+
+        Returns:
+            (MenuDefinition) new instance
+
+        Raises:
+            ValueError if the tab has no such item, or it is the tab's only item
+        """
+        return_index = self._return_index(tab_number)
+        item_id = return_index.get(str(item_returns), None)
+        if item_id is None:
+            raise ValueError("tab#{0} has no item returning {1!r}".format(tab_number, item_returns))
+        old_items = self._items(tab_number)
+        if len(old_items) == 1:
+            raise ValueError("the only item of tab#{0} cannot be removed".format(tab_number))
+        position = old_items.position(item_id)
+        item = old_items[position]
+        width_counts = dict(self._width_counts(tab_number))
+        width = len(item["item_choice_displayed"])
+        width_counts[width] -= 1
+        if not width_counts[width]:
+            del width_counts[width]
+        return self._with_tab_items(
+            tab_number,
+            old_items.removed(item_id),
+            position,
+            self.tabs[tab_number].changed(removed=item["item_inputs"]),
+            return_index.updated(removed=[item["item_returns"]]),
+            width_counts,
+        )
+
+    def with_tab(self, tab_dict):
+        """Returns a new MenuDefinition with a tab added after the last tab; this one is unchanged
+
+        Only the new tab is validated and normalized; its tab_header_input is looked up in the dispatch table of
+        every tab, so every tab is built if it has not been yet. Tab objects and item lines are shared with this
+        definition, but no rendered frame, since every frame shows the headers of all tabs.
+
+        Args:
+            tab_dict (dict): tab to add, as it would be in a config
+
+        Returns:
+            (MenuDefinition) new instance
+
+        Raises:
+            validators.InvalidInputError if the tab is invalid, or its tab_header_input is an input of a tab
+            ValueError if the config has global_jump or a single tab
+        """
+        n_tabs = len(self.tabs)
+        tab_inputs = [tab_.item_table for tab_ in self.tabs]
+        new_tab = validators.validate_and_normalize_tab(self.config, tab_dict, tab_inputs)
+        config = dict(self.config)
+        config["tabs"] = list(self.config["tabs"]) + [new_tab]
+        selectors = list(self.tabs[0].selectors) + [new_tab["tab_header_input"]]
+        selector_table = tab.create_selector_table(selectors)
+        prefix_matching = config.get("prefix_matching", False)
+
+        def build_tab(i):
+            if i < n_tabs:
+                return self.tabs[i].changed(tab_selectors=selectors, selector_table=selector_table)
+            return tab.Tab(new_tab, selectors, None, selector_table, prefix_matching)
+
+        def build_item_lines(i):
+            if i < n_tabs:
+                return self.item_lines[i]
+            return tuple(formatting.format_item_lines(new_tab["items"]))
+
+        new_definition = MenuDefinition.__new__(MenuDefinition)
+        new_definition._set_state(
+            config,
+            tab.LazySequence(n_tabs + 1, build_tab, eager=(0,)),
+            tab.LazySequence(n_tabs + 1, build_item_lines),
+            item_providers=self.item_providers,
+        )
+        # these do not depend on the tab selectors, unlike sorted inputs
+        new_definition._search_indexes.update(self._search_indexes)
+        new_definition._return_indexes.update(self._return_indexes)
+        new_definition._choice_widths.update(self._choice_widths)
+        return new_definition
+
+    def _with_tab_items(self, tab_number, items, first_changed, new_tab, return_index, width_counts):
+        """Returns new MenuDefinition in which a tab has different items; called from with_items() and without_item()
+
+        Args:
+            tab_number (int): number of the tab
+            items (itemlist.ItemList): all the tab's new items, normalized
+            first_changed (int): position of the first of them that differs from this definition's
+            new_tab (tab.Tab): the tab's new Tab object
+            return_index (tab.LayeredDict): the tab's new index of return values, see _return_index()
+            width_counts (dict): the tab's new choice widths to numbers of items, see formatting.choice_width_counts()
+        """
+        config = dict(self.config)
+        config["tabs"] = list(self.config["tabs"])
+        config["tabs"][tab_number] = dict(config["tabs"][tab_number], items=items)
+        width = max(width_counts)
+        old_tabs, old_item_lines = self.tabs, self.item_lines
+
+        def build_item_lines(i):
+            if i != tab_number:
+                return old_item_lines[i]
+            return tuple(formatting.format_item_lines(items, width))
+
+        new_definition = MenuDefinition.__new__(MenuDefinition)
+        new_definition._set_state(
+            config,
+            tab.LazySequence(len(old_tabs), lambda i: new_tab if i == tab_number else old_tabs[i], eager=(0,)),
+            tab.LazySequence(len(old_tabs), build_item_lines),
+            item_providers=self.item_providers,
+        )
+        # the tab's frames of pages before the first change are the same, unless its width or page lines changed
+        kept_pages = 0
+        if (
+            self.page_size
+            and tab_number not in self.item_providers  # whose frames are not cached
+            and max(self._width_counts(tab_number)) == width
+            and self.n_pages(tab_number) == new_definition.n_pages(tab_number)
+        ):
+            kept_pages = first_changed // self.page_size
+        with self._frames_lock:
+            new_definition._frames.update(
+                (key, frame) for key, frame in self._frames.items() if key[0] != tab_number or key[1] < kept_pages
+            )
+        for name in ["_sorted_inputs", "_search_indexes", "_return_indexes", "_choice_widths"]:
+            cache = dict(getattr(self, name))
+            cache.pop(tab_number, None)
+            getattr(new_definition, name).update(cache)
+        new_definition._return_indexes[tab_number] = return_index
+        new_definition._choice_widths[tab_number] = width_counts
+        return new_definition
+
+    def _items(self, tab_number):
+        """Returns items of a tab as an itemlist.ItemList, wrapping those of the config without copying them"""
+        return itemlist.ItemList.wrap(self.config["tabs"][tab_number]["items"])
+
+    def _return_index(self, tab_number):
+        """Returns tab.LayeredDict of the return values of a tab's items to their ids, built once per tab on first use
+
+        The ids are those of itemlist.ItemList, i.e. the positions of the items in the config
+        """
+        index = self._return_indexes.get(tab_number, None)
+        if index is None:
+            items = self.config["tabs"][tab_number]["items"]
+            index = tab.LayeredDict({item["item_returns"]: item_id for item_id, item in enumerate(items)})
+            self._return_indexes[tab_number] = index
+        return index
+
+    def _width_counts(self, tab_number):
+        """Returns dict of the choice widths of a tab's items to their numbers, computed once per tab on first use"""
+        width_counts = self._choice_widths.get(tab_number, None)
+        if width_counts is None:
+            items = self.config["tabs"][tab_number]["items"]
+            width_counts = self._choice_widths[tab_number] = formatting.choice_width_counts(items)
+        return width_counts
+
+    def _some_item_lines(self, tab_number, positions):
+        """Returns list of the item lines of the items of a tab at positions, e.g. a page or matches of a search
+
+        The item lines of a tab whose items were changed by with_items() or without_item() are formatted in full
+        only when all of them are shown; until then, only those asked for are formatted.
+        """
+        item_lines = self.item_lines.peek(tab_number)
+        items = self.config["tabs"][tab_number]["items"]
+        if item_lines is None and isinstance(items, itemlist.ItemList):
+            width = max(self._width_counts(tab_number))
+            return formatting.format_item_lines([items[i] for i in positions], width)
+        item_lines = self.item_lines[tab_number]
+        return [item_lines[i] for i in positions]
+
+    def __setattr__(self, name, value):
+        """Raises AttributeError, since MenuDefinition is immutable"""
+        raise AttributeError("MenuDefinition is immutable")
+
+    def __delattr__(self, name):
+        """Raises AttributeError, since MenuDefinition is immutable"""
+        raise AttributeError("MenuDefinition is immutable")
+
+    def _get_digest(self):
+        """Returns sha256 digest of the normalized config, computed on first use"""
+        if self._digest is None:
+            # marshal version 2 writes no back-references, so equal configs have the same dump however much of
+            # them they share with other objects, e.g. tabs carried over by updated()
+            config = self.config
+            if any(isinstance(tab_["items"], itemlist.ItemList) for tab_ in config["tabs"]):
+                config = dict(config, tabs=[dict(tab_, items=list(tab_["items"])) for tab_ in config["tabs"]])
+            object.__setattr__(self, "_digest", hashlib.sha256(marshal.dumps(config, 2)).digest())
+        return self._digest
+
+    def __eq__(self, other):
+        """Returns whether other is a MenuDefinition with the same normalized config and item providers"""
+        if not isinstance(other, MenuDefinition):
+            return NotImplemented
+        if self is other:
+            return True
+        return self._get_digest() == other._get_digest() and self.item_providers == other.item_providers
+
+    def __hash__(self):
+        """Returns hash of the digest of the normalized config"""
+        return hash(self._get_digest())
+
+    def __repr__(self):
+        """Returns short description with the number of tabs and the start of the digest"""
+        return "<MenuDefinition: {0} tab(s), {1}>".format(len(self.tabs), self._get_digest().hex()[:12])
+
+    def n_pages(self, tab_number):
+        """Returns number of pages of a tab; always 1 if config has no page_size and the tab has no provided items
+
+        A tab with an item provider has as many pages as its provider knows of so far, see
+        provider.ItemProvider.n_pages(); its items of the config are shown on every page.
+        """
+        provider_ = self.item_providers.get(tab_number, None)
+        if provider_ is not None:
+            return provider_.n_pages()[0]
+        if self.page_size is None:
+            return 1
+        n_items = len(self.config["tabs"][tab_number]["items"])
+        return max(1, -(-n_items // self.page_size))
+
+    def has_page(self, tab_number, page_number):
+        """Returns whether a tab has a page; for a tab with provided items, fetches it if it is not cached
+
+        Args:
+            tab_number (int): number of the tab
+            page_number (int): zero-based number of the page
+
+        Returns:
+            (bool)
+        """
+        if page_number < 0:
+            return False
+        provider_ = self.item_providers.get(tab_number, None)
+        if provider_ is None:
+            return page_number < self.n_pages(tab_number)
+        return page_number == 0 or bool(provider_.page(page_number)[0])
+
+    def _provided_page(self, tab_number, page_number):
+        """Returns item lines and input to Result dict of a page of a tab with provided items
+
+        The page's items are fetched from the tab's provider, or taken from its cache, and are validated,
+        normalized and formatted only if they are not those of the last call for the page: validated against the
+        inputs and return values of the tab in the config, and formatted with the tab's items of the config. What
+        is derived from a page is kept only while the provider caches it, so the provider's max_cached_items and
+        ttl also limit what the definition keeps.
+
+        Raises:
+            validators.InvalidInputError if the page's items are invalid
+        """
+        provider_ = self.item_providers[tab_number]
+        items, _ = provider_.page(page_number)
+        key = (tab_number, page_number)
+        entry = self._provided_pages.get(key, None)
+        if entry is None or entry[0] is not items:
+            config_items = self.config["tabs"][tab_number]["items"]
+            new_items = validators.validate_and_normalize_provided(
+                self.config,
+                tab_number,
+                items,
+                len(config_items) + page_number * provider_.page_size,
+                self.tabs[tab_number].input2result,
+                self._return_index(tab_number),
+            )
+            results = {}
+            for item in new_items:
+                result = tab.Result("return", return_value=item["item_returns"])
+                for entry_ in item["item_inputs"]:
+                    results[entry_] = result
+            entry = (items, tuple(formatting.format_item_lines(list(config_items) + new_items)), results)
+            with self._frames_lock:
+                for old_key in [old_key for old_key in self._provided_pages if old_key[0] == tab_number]:
+                    if provider_.cached(old_key[1]) is not self._provided_pages[old_key][0]:
+                        del self._provided_pages[old_key]
+                self._provided_pages[key] = entry
+        return entry[1], entry[2]
+
+    def provided_result(self, tab_number, page_number, selection):
+        """Returns Result of an input of the provided items of a page of a tab, or None if there is none
+
+        Only the items of the page are looked up, so only items shown can be selected. Always None for a tab
+        without an item provider.
+
+        Args:
+            tab_number (int): number of the tab
+            page_number (int): zero-based number of the page shown
+            selection (str): the input, changed to lower-case if config is not case sensitive
+
+        Returns:
+            (tab.Result or None)
+        """
+        if tab_number not in self.item_providers:
+            return None
+        return self._provided_page(tab_number, page_number)[1].get(selection, None)
+
+    def _visible_item_lines(self, tab_number, page_number):
+        """Returns item lines of a tab to render: all of them, or only those of one page"""
+        provider_ = self.item_providers.get(tab_number, None)
+        if provider_ is not None:
+            item_lines = self._provided_page(tab_number, page_number)[0]
+            n_pages, complete = provider_.n_pages()
+            if n_pages == 1:
+                return item_lines
+            page_line = formatting.format_page_line(
+                page_number,
+                max(n_pages, page_number + 1),
+                PAGE_NEXT_INPUT,
+                PAGE_PREVIOUS_INPUT,
+                PAGE_GOTO_PREFIX,
+                more=not complete,
+            )
+            return item_lines + (page_line,)
+        n_pages = self.n_pages(tab_number)
+        if n_pages == 1:
+            return self.item_lines[tab_number]
+        start = page_number * self.page_size
+        stop = min(start + self.page_size, len(self.config["tabs"][tab_number]["items"]))
+        page_line = formatting.format_page_line(
+            page_number, n_pages, PAGE_NEXT_INPUT, PAGE_PREVIOUS_INPUT, PAGE_GOTO_PREFIX
+        )
+        return tuple(self._some_item_lines(tab_number, range(start, stop))) + (page_line,)
+
+    def render(self, tab_number, page_number, screen_width, message=None):
+        """Returns formatted menu, from the cache of rendered frames if possible
+
+        Frames of tabs with provided items are not cached, since their items may change between two calls
+
+        Args:
+            tab_number (int): number of the current tab
+            page_number (int): zero-based number of the current page of that tab
+            screen_width (int): width to wrap the tab headers to
+            message (str or None): message shown below the items
+
+        Returns:
+            (str) menu to send to stdout
+        """
+        if tab_number in self.item_providers:
+            return formatting.format_menu(
+                self.config, tab_number, screen_width, message, self._visible_item_lines(tab_number, page_number)
+            )
+        key = (tab_number, page_number, screen_width, message)
+        frame = self._frames.get(key, None)
+        if frame is None:
+            frame = formatting.format_menu(
+                self.config, tab_number, screen_width, message, self._visible_item_lines(tab_number, page_number)
+            )
+            with self._frames_lock:
+                if len(self._frames) >= MAX_CACHED_FRAMES:
+                    # discard oldest frame; dicts keep insertion order
+                    del self._frames[next(iter(self._frames))]
+                self._frames[key] = frame
+        return frame
+
+    def sorted_inputs(self, tab_number, page_number=0):
+        """Returns every valid input of a tab, including page navigation inputs if it is paged, sorted
+
+        Used by keypress to tell whether the keys typed so far resolve a selection; built once per tab on first use,
+        except for tabs with provided items, whose inputs include those of the provided items of page_number
+
+        Args:
+            tab_number (int): number of the tab
+            page_number (int): default 0, zero-based number of the page shown; only used with provided items
+        """
+        provider_ = self.item_providers.get(tab_number, None)
+        inputs = None if provider_ is not None else self._sorted_inputs.get(tab_number, None)
+        if inputs is None:
+            inputs = set(self.tabs[tab_number].input2result)
+            if self.n_pages(tab_number) > 1:
+                inputs.update((PAGE_NEXT_INPUT, PAGE_PREVIOUS_INPUT))
+            if provider_ is not None:
+                inputs.update(self._provided_page(tab_number, page_number)[1])
+                return tuple(sorted(inputs))
+            inputs = self._sorted_inputs[tab_number] = tuple(sorted(inputs))
+        return inputs
+
+    def render_search(self, tab_number, screen_width, query, message=None):
+        """Returns formatted menu showing only the items of a tab that match query; not cached
+
+        The tab's search.SearchIndex is built on its first search. At most page_size matches are shown, or
+        _MAX_SHOWN_MATCHES if the config has no page_size.
+
+        Args:
+            tab_number (int): number of the current tab
+            screen_width (int): width to wrap the tab headers to
+            query (str): search terms, see search.SearchIndex.search()
+            message (str or None): message shown below the items
+
+        Returns:
+            (str) menu to send to stdout
+        """
+        index = self._search_indexes.get(tab_number, None)
+        if index is None:
+            index = self._search_indexes[tab_number] = search.SearchIndex(self.config["tabs"][tab_number]["items"])
+        matches = index.search(query)
+        shown = self._some_item_lines(tab_number, matches[: self.page_size or _MAX_SHOWN_MATCHES])
+        shown.append(formatting.format_search_line(query, len(matches), len(shown), SEARCH_PREFIX))
+        return formatting.format_menu(self.config, tab_number, screen_width, message, shown)
+
+    def change_tab_message(self, new_number):
+        """Returns message informing user about a change to tab new_number, or None if tab has no header"""
+        new_tab = self.tabs[new_number]
+        # display a message, including description and long_description if present,
+        # informing user about the tab change
+        if not new_tab.head_choice:  # Should be redundant, because should only be called if
+            # the config's layout is multiple tabs.
+            return None
+        msg = ["Change tab to {0}".format(new_tab.head_choice)]
+        if new_tab.head_desc:
+            msg.append(": {0}".format(new_tab.head_desc))
+        if new_tab.head_desc_long:
+            msg.append("\n{0}".format(new_tab.head_desc_long))
+        return "".join(msg)
+
+    def validate_message(self, message):
+        """If run() is called with message as a dict, validates that all keys are valid tab_header_inputs.
+
+        If message is None or string, does nothing.
+
+        Raises:
+            ValueError if keys do not match tab_header_inputs
+        """
+        if isinstance(message, dict):
+            if not self.has_multiple_tabs:
+                raise ValueError("Menu instance has only one tab, so cannot take a dict as message arg for run()")
+            nonmatching_keys = []
+            for key in message.keys():
+                if not any([x == key for x in self.tabs[0].selectors]):
+                    nonmatching_keys.append(key)
+            if nonmatching_keys:
+                raise ValueError(
+                    "The following key(s) in message dict do not match tab_header_inputs: {}".format(
+                        "; ".join(nonmatching_keys)
+                    )
+                )
+        else:
+            if not isinstance(message, str) and message is not None:
+                raise TypeError("message arg to run() must be None, str or dict")
+
+
+def _check_item_providers(item_providers, n_tabs):
+    """Raise ValueError unless item_providers is None or a dict of tab numbers to provider.ItemProvider"""
+    for tab_number, provider_ in (item_providers or {}).items():
+        if not isinstance(tab_number, int) or isinstance(tab_number, bool) or not 0 <= tab_number < n_tabs:
+            raise ValueError("item_providers has key {0!r}, which is not a tab number".format(tab_number))
+        if not isinstance(provider_, provider.ItemProvider):
+            raise ValueError("item_providers[{0}] is not an ItemProvider".format(tab_number))
+
+
+def _unchanged_tabs(config, previous_config):
+    """Returns set of the numbers of the tabs that are the same in two versions of a config, see updated()
+
+    Empty unless both have a 'tabs' list of as many tabs, with the same settings and tab headers, and global_jump
+    is not set; checks types only as far as needed to compare them, since config has not been validated yet
+    """
+    if not isinstance(config, dict) or not isinstance(previous_config, dict):
+        return set()
+    tabs, previous_tabs = config.get("tabs", None), previous_config.get("tabs", None)
+    if not isinstance(tabs, list) or not isinstance(previous_tabs, list) or len(tabs) != len(previous_tabs):
+        return set()
+    if config.get("global_jump", False) or _without(config, "tabs") != _without(previous_config, "tabs"):
+        return set()
+    unchanged = set()
+    for tab_number, (tab_, previous_tab) in enumerate(zip(tabs, previous_tabs)):
+        if not isinstance(tab_, dict) or not isinstance(previous_tab, dict):
+            return set()
+        if _without(tab_, "items") != _without(previous_tab, "items"):  # the headers of every tab are in every frame
+            return set()
+        if tab_ == previous_tab:
+            unchanged.add(tab_number)
+    return unchanged
+
+
+def _without(dict_, key):
+    """Returns copy of dict_ without key"""
+    return {k: v for k, v in dict_.items() if k != key}
@@ -4,7 +4,7 @@
 """Contains functions used to format shell text output, i.e. multiline strings sent to stdout"""
 
 
-def format_menu(config, current_tab_number, line_length, message=None):
+def format_menu(config, current_tab_number, line_length, message=None, item_lines=None):
     """Creates menu to be displayed to user, called from menu.Menu only, not by user
 
     Args:
@@ -12,6 +12,7 @@ def format_menu(config, current_tab_number, line_length, message=None):
         current_tab_number (int): number of currently selected tab (always 0 for single-tabbed menus)
         line_length (int): value from config
         message (str or None): a message to print from Menu.message
+        item_lines (list of str or None): output of format_item_lines() for the current tab, if precomputed
 
     Returns:
         (str) menu to send to stdout
@@ -24,19 +25,10 @@ def format_menu(config, current_tab_number, line_length, message=None):
     # only format headers if there are headers, i.e. if there is more than one tab
     if len(tabs) > 1:
         menu += _format_headers(tabs, current_tab_number, line_length)
-    # get items from currently selected tab
-    current_tab = tabs[current_tab_number]
-    items = current_tab["items"]
-    # find maximum length of item_choice_displayed in items to make sure they are equally justified
-    max_choice_len = 0
-    for item in items:
-        max_choice_len = max(max_choice_len, len(item["item_choice_displayed"]))
-    # build up one line per item, add to menu list
-    for item in items:
-        choice = item["item_choice_displayed"]
-        description = item["item_description"]
-        spacer = " " * (max_choice_len - len(choice))
-        menu.append("[{0}{1}] {2}".format(choice, spacer, description))
+    # add one line per item of currently selected tab
+    if item_lines is None:
+        item_lines = format_item_lines(tabs[current_tab_number]["items"])
+    menu += item_lines
     # add message if applicable
     if message is not None:
         menu.append(message)
@@ -44,6 +36,88 @@ def format_menu(config, current_tab_number, line_length, message=None):
     return "\n".join(menu)
 
 
+def format_item_lines(items, max_choice_len=None):
+    """Formats the items of one tab, one line per item; called from format_menu() and menu.Menu
+
+    The lines do not depend on the screen width or the message, so menu.Menu computes them once per tab
+
+    Args:
+        items (list of dict): 'items' value of one tab of a normalized config
+        max_choice_len (int or None): length to justify item_choice_displayed to, e.g. to format items added to
+                                      a tab the same as its other items; if None, that of the longest in items
+
+    Returns:
+        (list of str) one line per item
+    """
+    # find maximum length of item_choice_displayed in items to make sure they are equally justified
+    if max_choice_len is None:
+        max_choice_len = choice_width(items)
+    # build up one line per item
+    lines = []
+    for item in items:
+        choice = item["item_choice_displayed"]
+        description = item["item_description"]
+        spacer = " " * (max_choice_len - len(choice))
+        lines.append("[{0}{1}] {2}".format(choice, spacer, description))
+    return lines
+
+
+def choice_width(items):
+    """Returns length of the longest item_choice_displayed of items, to which format_item_lines() justifies them"""
+    max_choice_len = 0
+    for item in items:
+        max_choice_len = max(max_choice_len, len(item["item_choice_displayed"]))
+    return max_choice_len
+
+
+def choice_width_counts(items):
+    """Returns dict of every length of item_choice_displayed in items to the number of items with it
+
+    Kept per tab by definition.MenuDefinition, so that the width of a tab whose items change is known without
+    going over its items; the width is the largest key
+    """
+    counts = {}
+    for item in items:
+        width = len(item["item_choice_displayed"])
+        counts[width] = counts.get(width, 0) + 1
+    return counts
+
+
+def format_page_line(page_number, n_pages, next_input, previous_input, goto_prefix, more=False):
+    """Formats the line shown below the items of a paged tab; called from menu.Menu only
+
+    Args:
+        page_number (int): zero-based number of the page shown
+        n_pages (int): number of pages in the current tab
+        next_input, previous_input, goto_prefix (str): the navigation inputs, from menu.Menu
+        more (bool): default False, whether there may be more pages than n_pages, for provided items
+
+    Returns:
+        (str) line
+    """
+    return "Page {0}/{1}{2} ({3}: next, {4}: previous, {5}<number>: go to page)".format(
+        page_number + 1, n_pages, "+" if more else "", next_input, previous_input, goto_prefix
+    )
+
+
+def format_search_line(query, n_matches, n_shown, search_prefix):
+    """Formats the line shown below the matching items of a search; called from definition.MenuDefinition only
+
+    Args:
+        query (str): the search terms
+        n_matches (int): number of items matching query
+        n_shown (int): number of them shown
+        search_prefix (str): the search input prefix, from tab.py
+
+    Returns:
+        (str) line
+    """
+    line = "{0} match{1} for '{2}'".format(n_matches, "" if n_matches == 1 else "es", query)
+    if n_shown < n_matches:
+        line += ", showing the first {0}".format(n_shown)
+    return "{0} ({1} alone: show all items)".format(line, search_prefix)
+
+
 def _format_headers(tabs, current_tab_number, line_length):
     """Formats just the tab portion if the config specifies a multi-tab menu
 
@@ -0,0 +1,208 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Contains ItemList class, the immutable sequence of items of a tab changed by definition.MenuDefinition
+
+MenuDefinition.with_items() and without_item() must leave the definition they are called on unchanged, since
+sessions may still use it, and cost no more than the change. An ItemList is therefore persistent: a changed
+copy shares everything but the path to the change with the original.
+
+Every item has an id that never changes, assigned in order: the items of the config are numbered from 0 by
+position, and added items get the next ids. Items are only ever added at the end, so ids increase along the
+list, and the position of an item can be found from its id. The list is a tree whose leaves are contiguous
+ranges of another sequence (the list of items of the config, or a tuple of added items) holding consecutive ids:
+wrapping the items of the config is a single leaf, and removing an item splits its leaf in two without copying
+either part. Nodes hold at most _MAX_CHILDREN children; a change copies one node per level of the tree.
+"""
+
+from bisect import bisect_right
+from collections.abc import Sequence
+
+_MAX_CHILDREN = 32
+
+
+class _Leaf:
+    """Range start:stop of seq, whose first element has id first_id"""
+
+    __slots__ = ("seq", "start", "stop", "first_id", "size")
+
+    def __init__(self, seq, start, stop, first_id):
+        """Instantiator for _Leaf class"""
+        self.seq = seq
+        self.start = start
+        self.stop = stop
+        self.first_id = first_id
+        self.size = stop - start
+
+
+class _Node:
+    """Inner node of an ItemList's tree, with the cumulative sizes and first ids of its children"""
+
+    __slots__ = ("children", "ends", "first_ids", "first_id", "size")
+
+    def __init__(self, children):
+        """Instantiator for _Node class; children is a non-empty tuple of _Leaf, or of _Node"""
+        self.children = children
+        ends = []
+        size = 0
+        for child in children:
+            size += child.size
+            ends.append(size)
+        self.ends = tuple(ends)
+        self.first_ids = tuple(child.first_id for child in children)
+        self.first_id = children[0].first_id
+        self.size = size
+
+
+def _nodes(children):
+    """Returns tuple of zero, one or two _Node holding children in order, split if there are too many"""
+    if not children:
+        return ()
+    if len(children) <= _MAX_CHILDREN:
+        return (_Node(children),)
+    half = len(children) // 2
+    return (_Node(children[:half]), _Node(children[half:]))
+
+
+def _appended(node, leaf):
+    """Returns tuple of one or two nodes replacing node, with leaf after its last leaf"""
+    last = node.children[-1]
+    if isinstance(last, _Leaf):
+        return _nodes(node.children + (leaf,))
+    return _nodes(node.children[:-1] + _appended(last, leaf))
+
+
+def _removed(node, item_id):
+    """Returns tuple of zero, one or two nodes replacing node, without the item with item_id"""
+    i = bisect_right(node.first_ids, item_id) - 1
+    child = node.children[i]
+    if isinstance(child, _Leaf):
+        offset = item_id - child.first_id
+        replacement = []
+        if offset:
+            replacement.append(_Leaf(child.seq, child.start, child.start + offset, child.first_id))
+        if offset + 1 < child.size:
+            replacement.append(_Leaf(child.seq, child.start + offset + 1, child.stop, item_id + 1))
+        replacement = tuple(replacement)
+    else:
+        replacement = _removed(child, item_id)
+    return _nodes(node.children[:i] + replacement + node.children[i + 1 :])
+
+
+class ItemList(Sequence):
+    """Immutable sequence of the normalized items of one tab, with ids, see module docstring
+
+    Created with wrap(); it is a Sequence, so it can be used wherever the list of items of a normalized config
+    is read, except by marshal.
+
+    Attributes:
+        next_id (int): id the next item added will have
+
+    Methods:
+        wrap(items): class method, ItemList of the items of a config, without copying them
+        appended(items): new ItemList with items added at the end
+        removed(item_id): new ItemList without an item
+        position(item_id): position of an item
+    """
+
+    __slots__ = ("_root", "next_id")
+
+    def __init__(self, root, next_id):
+        """Instantiator for ItemList class; use wrap() rather than calling it directly
+
+        Args:
+            root (_Node or None): root of the tree, None if empty
+            next_id (int): see class docstring
+        """
+        self._root = root
+        self.next_id = next_id
+
+    @classmethod
+    def wrap(cls, items):
+        """Returns ItemList of items, numbered from 0 by position; items must not change afterwards"""
+        if isinstance(items, ItemList):
+            return items
+        if not items:
+            return cls(None, 0)
+        return cls(_Node((_Leaf(items, 0, len(items), 0),)), len(items))
+
+    def appended(self, items):
+        """Returns new ItemList with items, a sequence, at the end; they get the next ids"""
+        if not items:
+            return self
+        leaf = _Leaf(tuple(items), 0, len(items), self.next_id)
+        if self._root is None:
+            nodes = (_Node((leaf,)),)
+        else:
+            nodes = _appended(self._root, leaf)
+        root = nodes[0] if len(nodes) == 1 else _Node(nodes)
+        return ItemList(root, self.next_id + len(items))
+
+    def removed(self, item_id):
+        """Returns new ItemList without the item with item_id, which must be in this one"""
+        nodes = _removed(self._root, item_id)
+        if not nodes:
+            return ItemList(None, self.next_id)
+        root = nodes[0] if len(nodes) == 1 else _Node(nodes)
+        while len(root.children) == 1 and isinstance(root.children[0], _Node):
+            root = root.children[0]
+        return ItemList(root, self.next_id)
+
+    def position(self, item_id):
+        """Returns position of the item with item_id, which must be in this list"""
+        node = self._root
+        position = 0
+        while isinstance(node, _Node):
+            i = bisect_right(node.first_ids, item_id) - 1
+            if i:
+                position += node.ends[i - 1]
+            node = node.children[i]
+        return position + item_id - node.first_id
+
+    def __len__(self):
+        """Returns number of items"""
+        return 0 if self._root is None else self._root.size
+
+    def __getitem__(self, index):
+        """Returns item at index, or list of the items of a slice"""
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step != 1:
+                return list(self)[index]
+            return list(self._range(start, stop))
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("ItemList index out of range")
+        node = self._root
+        while isinstance(node, _Node):
+            i = bisect_right(node.ends, index)
+            if i:
+                index -= node.ends[i - 1]
+            node = node.children[i]
+        return node.seq[node.start + index]
+
+    def _range(self, start, stop):
+        """Yields items at positions start to stop, visiting only the leaves holding them"""
+        if start >= stop:
+            return
+        stack = [(self._root, 0)]
+        while stack:
+            node, offset = stack.pop()
+            if isinstance(node, _Leaf):
+                seq = node.seq
+                for k in range(node.start + max(0, start - offset), node.start + min(node.size, stop - offset)):
+                    yield seq[k]
+                continue
+            first = bisect_right(node.ends, start - offset)
+            last = min(bisect_right(node.ends, stop - 1 - offset), len(node.children) - 1)
+            for i in range(last, first - 1, -1):
+                stack.append((node.children[i], offset + (node.ends[i - 1] if i else 0)))
+
+    def __iter__(self):
+        """Iterates over the items in order"""
+        return self._range(0, len(self))
+
+    def __repr__(self):
+        """Returns short description with the number of items"""
+        return "<ItemList: {0} item(s)>".format(len(self))
@@ -0,0 +1,190 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Reads a selection keystroke by keystroke, called from menu.MenuSession only, not by user
+
+In keystroke mode a selection is made as soon as the keys typed so far can only mean one thing: they are the
+start of a single valid input, which is completed (with inputs 'open' and 'quit', typing 'o' selects 'open'), or
+they are not the start of any valid input (which makes them invalid). Enter submits what has been typed, for
+inputs that are the start of longer ones, and Backspace deletes the last key. The escape sequences sent by arrow
+and function keys are ignored.
+
+This needs the termios and tty modules and a terminal on stdin; available() tells whether both are there, and
+menu.MenuSession falls back to line input with input() otherwise.
+"""
+
+import bisect
+import sys
+
+try:
+    import termios
+    import tty
+except ImportError:  # e.g. on Windows
+    termios = None
+    tty = None
+
+_ENTER = ("\r", "\n")
+_BACKSPACE = ("\x7f", "\b")
+_END_OF_TRANSMISSION = "\x04"  # Ctrl-D
+_ESCAPE = "\x1b"
+# second key of the escape sequences of arrow and function keys: CSI ('ESC [', then parameter and intermediate
+# bytes up to a final byte) and SS3 ('ESC O', then a single final byte)
+_CSI = "["
+_SS3 = "O"
+
+
+def available(stream=None):
+    """Returns whether keystrokes can be read from stream (default sys.stdin): termios exists and it is a terminal"""
+    if termios is None:
+        return False
+    if stream is None:
+        stream = sys.stdin
+    try:
+        return stream.isatty()
+    except (AttributeError, ValueError):  # no isatty(), or closed
+        return False
+
+
+def is_resolved(typed, sorted_inputs):
+    """Returns whether typed needs no more keys: at most one input starts with it
+
+    Args:
+        typed (str): keys typed so far, changed to lower-case if the menu is not case sensitive
+        sorted_inputs (tuple of str): every valid input of the current tab, sorted
+
+    Returns:
+        (bool)
+    """
+    i = bisect.bisect_left(sorted_inputs, typed)
+    if i == len(sorted_inputs) or not sorted_inputs[i].startswith(typed):
+        return True
+    return i + 1 == len(sorted_inputs) or not sorted_inputs[i + 1].startswith(typed)
+
+
+def _completion(typed, sorted_inputs):
+    """Returns the rest of the input typed is the start of, or '' if there is none; only if is_resolved(typed)"""
+    i = bisect.bisect_left(sorted_inputs, typed)
+    if i < len(sorted_inputs) and sorted_inputs[i].startswith(typed):
+        return sorted_inputs[i][len(typed) :]
+    return ""
+
+
+def _starts_any(typed, sorted_inputs):
+    """Returns whether typed is the start of at least one input"""
+    i = bisect.bisect_left(sorted_inputs, typed)
+    return i < len(sorted_inputs) and sorted_inputs[i].startswith(typed)
+
+
+def _skip_escape_sequence(read_key):
+    """Reads the rest of a CSI or SS3 escape sequence after ESC has been read
+
+    Returns:
+        (str or None) None if the sequence has been read; otherwise the key read after ESC, which did not start
+        such a sequence, or '' at end of input
+    """
+    key = read_key()
+    if key not in (_CSI, _SS3):
+        return key
+    introducer = key
+    while True:
+        key = read_key()
+        if key == "":
+            return key
+        if introducer == _SS3 or "\x40" <= key <= "\x7e":
+            return None
+
+
+def collect_keys(read_key, write, sorted_inputs, case_sensitive=False, wait_prefix=None, free_prefix=None):
+    """Reads keys until the selection is resolved or submitted; the part of read_selection() that needs no terminal
+
+    Args:
+        read_key (function): returns the next key as a str of length 1, or '' at end of input
+        write (function): echoes text to the user
+        sorted_inputs (tuple of str): every valid input of the current tab, sorted
+        case_sensitive (bool): if False, keys are looked up in lower case, as menu.MenuSession does
+        wait_prefix (str or None): typed keys starting with this and followed by digits only are resolved by
+                                   Enter, e.g. the page number input of paged tabs
+        free_prefix (str or None): typed keys starting with this are resolved by Enter whatever follows, unless
+                                   they are a valid input no other input starts with, e.g. search inputs; they
+                                   are not completed, since they may be the start of a search
+
+    Returns:
+        (str) the keys typed, as typed, followed by the rest of the input they are the start of if they resolved
+        the selection by being the start of a single input
+
+    Raises:
+        EOFError at end of input or Ctrl-D before any key is typed, as the built-in input() does
+    """
+    typed = ""
+    while True:
+        key = read_key()
+        while key == _ESCAPE:
+            key = _skip_escape_sequence(read_key)
+        if key is None:
+            continue
+        if key == "" or (key == _END_OF_TRANSMISSION and not typed):
+            raise EOFError
+        if key in _ENTER:
+            break
+        if key in _BACKSPACE:
+            if typed:
+                typed = typed[:-1]
+                write("\b \b")
+            continue
+        if not key.isprintable():
+            continue
+        typed += key
+        write(key)
+        lookup = typed if case_sensitive else typed.lower()
+        if wait_prefix and lookup.startswith(wait_prefix):
+            rest = lookup[len(wait_prefix) :]
+            if not rest or rest.isdigit():
+                continue
+        if free_prefix and lookup.startswith(free_prefix):
+            if _starts_any(lookup, sorted_inputs) and is_resolved(lookup, sorted_inputs):
+                if not _completion(lookup, sorted_inputs):
+                    break
+            continue
+        if is_resolved(lookup, sorted_inputs):
+            completion = _completion(lookup, sorted_inputs)
+            typed += completion
+            write(completion)
+            break
+    write("\n")
+    return typed
+
+
+def read_selection(
+    prompt, sorted_inputs, case_sensitive=False, wait_prefix=None, free_prefix=None, stream=None, output=None
+):
+    """Shows prompt and reads one selection from a terminal in cbreak mode, restoring the terminal afterwards
+
+    Only call this if available(stream) is True. Arguments as in collect_keys(), plus:
+
+    Args:
+        prompt (str): written before the first key is read
+        stream (file-like or None): terminal to read from, default sys.stdin
+        output (file-like or None): stream to echo to, default sys.stdout
+
+    Returns:
+        (str) the keys typed, as typed
+    """
+    if stream is None:
+        stream = sys.stdin
+    if output is None:
+        output = sys.stdout
+
+    def write(text):
+        output.write(text)
+        output.flush()
+
+    write(prompt)
+    fd = stream.fileno()
+    old_settings = termios.tcgetattr(fd)
+    try:
+        # cbreak rather than raw mode, so Ctrl-C still raises KeyboardInterrupt; TCSANOW rather than the default
+        # TCSAFLUSH, so keys typed ahead while the menu was being drawn are not discarded
+        tty.setcbreak(fd, termios.TCSANOW)
+        return collect_keys(lambda: stream.read(1), write, sorted_inputs, case_sensitive, wait_prefix, free_prefix)
+    finally:
+        termios.tcsetattr(fd, termios.TCSADRAIN, old_settings)
@@ -1,100 +1,183 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
-"""Contains Menu class; this is the base imported class of this package"""
+"""Contains Menu class, the base imported class of this package, and MenuSession class
 
+asyncio, json and yaml are imported where they are used rather than here: most menus are run synchronously
+from a config that is a Python dict or a compiled artifact, and importing them would take longer than
+importing the rest of the package.
+"""
 
-import json
 
-import yaml
+from collections import namedtuple
+import os
 
-from . import formatting, normalizer, tab, validators
+from . import compiled, keypress
+from .watcher import ConfigWatcher
+from .definition import MenuDefinition
+from .tab import PAGE_GOTO_PREFIX, PAGE_NEXT_INPUT, PAGE_PREVIOUS_INPUT, SEARCH_PREFIX
 
 
-class Menu:
-    """Base class to import to create a menu
+# result types for which no selection is made and the user is asked again
+_NO_SELECTION = ("invalid", "ambiguous")
+
+# maximum number of candidates listed in the prompt after an ambiguous prefix
+_MAX_SHOWN_CANDIDATES = 8
+
+
+BatchEvent = namedtuple("BatchEvent", ["type", "input", "value", "tab_number"])
+BatchEvent.__doc__ = """Event yielded by Menu.run_batch() for each input that is a selection, invalid or ambiguous
+
+Fields:
+    type (str): 'selection', 'invalid' or 'ambiguous' (a prefix of several inputs, with prefix_matching)
+    input (str): the input as given
+    value: for 'selection', what Menu.run() would have returned; for 'invalid', None; for 'ambiguous', the
+           tuple of inputs the prefix could stand for
+    tab_number (int): number of the tab that was current when the input was processed
+"""
+
+
+async def _read_async(reader, writer, prompt):
+    """Writes prompt and reads one line for Menu.run_async(), without the line ending
+
+    Raises:
+        EOFError at end of stream, as the built-in input() does
+    """
+    import asyncio  # pylint: disable=import-outside-toplevel  # see module docstring
+
+    if reader is None and writer is None:
+        return await asyncio.get_running_loop().run_in_executor(None, input, prompt)
+    await _write_async(writer, prompt)
+    if reader is None:
+        line = await asyncio.get_running_loop().run_in_executor(None, input)
+    else:
+        line = await reader.readline()
+        if not line:
+            raise EOFError("end of stream before a selection was made")
+    if isinstance(line, bytes):
+        line = line.decode("utf-8")
+    return line.rstrip("\r\n")
+
+
+async def _write_async(writer, text):
+    """Writes text for Menu.run_async(); prints it if writer is None"""
+    if writer is None:
+        print(text, end="", flush=True)
+        return
+    writer.write(text.encode("utf-8"))
+    drain = getattr(writer, "drain", None)
+    if drain is not None:
+        await drain()
+
+
+def _retry_prompt(result):
+    """Returns prompt asking again after an 'invalid' or 'ambiguous' Result"""
+    if result["type"] == "ambiguous":
+        candidates = result["candidates"]
+        shown = ", ".join(candidates[:_MAX_SHOWN_CANDIDATES])
+        if len(candidates) > _MAX_SHOWN_CANDIDATES:
+            shown += ", ..."
+        return "Ambiguous ({0}), try again".format(shown)
+    return "Invalid, try again"
+
+
+def _yaml_safe_loader():
+    """Returns libyaml's yaml.CSafeLoader if PyYAML was built with it, otherwise the pure-python yaml.SafeLoader"""
+    import yaml  # pylint: disable=import-outside-toplevel  # see module docstring
+
+    return getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+
+class MenuSession:
+    """One user's position in a shared MenuDefinition: the current tab and page, and the screen width.
+
+    Sessions are cheap: everything that follows from the config is in the definition, so a server can create one
+    session per connection. A session is meant to be used by one user at a time; its definition can be shared
+    by any number of sessions, in any number of threads.
 
     Args:
-        config (dict): a nested dict, in a schema which will be validated, containing everything needed
-                        to instantiate the Menu class
+        definition (definition.MenuDefinition): the validated and normalized menu
         start_tab_number(int): default 0, the number of the tab to start at
 
     Methods:
-        safe_read_yaml(path_to_yaml): static method to read a yaml file into a config dict
-        read_json(path_to_json): static method to read a json file into a config dict
+        session(start_tab_number=None): creates another session of the same definition
         run(message=None): Displays menu at currently selected tab, asks for user input and returns it as a string
-
-    Examples:
-
-        >>> config = Menu.safe_read_yaml('config.yaml')
-        >>> menu = Menu(config, start_tab_number=0)
-        >>> result = menu.run()
-        >>> if result = "action name":
-        >>>         my_great_function()
-
-        >>> # with a submenu
-        >>> config = Menu.safe_read_yaml('config.yaml')
-        >>> menu = Menu(config, start_tab_number=0)
-        >>> result = menu.run()
-        >>> if result = "further options":
-        >>>     submenu = Menu(submenu_config)
-        >>>     if submenu_result = "action name":
-        >>>         my_great_function()
+        run_async(message=None, reader=None, writer=None): coroutine version of run() for asyncio streams
+        run_batch(inputs): Processes an iterable of inputs without displaying anything, yielding BatchEvents
     """
 
-    def __init__(self, config, start_tab_number=0):
-        """Instantiator for Menu class.
+    __slots__ = (
+        "_definition",
+        "_current_tab_number",
+        "_current_page_number",
+        "_screen_width",
+        "_keystroke_mode",
+        "_testing",
+        "_watcher",
+    )
+
+    def __init__(self, definition, start_tab_number=0):
+        """Instantiator for MenuSession class.
 
         Args:
-            config (dict): a nested dict, in a schema which will be validated, containing everything needed
-                           to instantiate the Menu class
+            definition (definition.MenuDefinition): the validated and normalized menu
             start_tab_number(int): default 0, the number of the tab to start at
         """
-        self._config = config
         self._set_testing()
-        # validate config
-        validators.validate_all(self._config)
-        # normalize config
-        self._config = normalizer.normalize(self._config)
-
+        self._definition = definition
         self._current_tab_number = start_tab_number
-        self._screen_width = self._config.get("screen_width", 80)
-        self._has_multiple_tabs = len(self._config["tabs"]) > 1
+        self._current_page_number = 0
+        self._screen_width = definition.screen_width
+        self._keystroke_mode = False
+        self._watcher = None  # set by Menu.watch()
         # ensure start_tab_number is valid
-        if not self._current_tab_number < len(self._config["tabs"]):
+        if not self._current_tab_number < len(definition.tabs):
             raise AssertionError
-        self._create_tab_objects()
-        # this attribute is only used by the instance to change user input where required;
-        # the config contents have already been altered by the normalizer module
-        self._case_sensitive = config.get("case_sensitive", False)
 
-    @staticmethod
-    def safe_read_yaml(path_to_yaml):
-        """Reads yaml file at specified path.
-
-        Args:
-            path_to_yaml (str or pathlib.Path): path to a yaml file following the config schema
-
-        Returns:
-            (dict) config to pass to Menu instantiator
+    @property
+    def definition(self):
+        """The MenuDefinition this session navigates"""
+        return self._definition
+
+    @property
+    def screen_width(self):
+        """Width in characters that the tab headers are wrapped to"""
+        return self._screen_width
+
+    @screen_width.setter
+    def screen_width(self, value):
+        """Sets width for this session; frames of other widths stay cached in the definition"""
+        if not isinstance(value, int) or isinstance(value, bool) or value <= 0:
+            raise ValueError("screen_width must be a positive int")
+        self._screen_width = value
+
+    @property
+    def keystroke_mode(self):
+        """Whether run() reads selections key by key instead of line by line; False by default
+
+        In keystroke mode, a selection is made as soon as the keys typed can only mean one valid input (or none),
+        without Enter, e.g. after one key if every input is one character. Enter submits inputs that are the start
+        of longer ones. If stdin is not a terminal, or termios is not available, run() reads lines regardless.
         """
-        with open(path_to_yaml, "r") as f:
-            dict_ = yaml.safe_load(f.read())
-        return dict_
+        return self._keystroke_mode
 
-    @staticmethod
-    def read_json(path_to_json):
-        """Reads json file at specified path.
+    @keystroke_mode.setter
+    def keystroke_mode(self, value):
+        """Turns keystroke mode on or off"""
+        self._keystroke_mode = bool(value)
+
+    def session(self, start_tab_number=None):
+        """Returns a new MenuSession sharing this one's definition, e.g. for a server.py connection
 
         Args:
-            path_to_json (str or pathlib.Path): path to a json file following the config schema
+            start_tab_number(int or None): the number of the tab to start at; if None, this session's current tab
 
         Returns:
-            (dict) config to pass to Menu instantiator
+            (MenuSession) instance
         """
-        with open(path_to_json, "r") as f:
-            dict_ = json.load(f)
-        return dict_
+        if start_tab_number is None:
+            start_tab_number = self._current_tab_number
+        return MenuSession(self._definition, start_tab_number)
 
     def _set_testing(self):
         """Sets self._testing to False during normal operation.
@@ -107,34 +190,79 @@ class Menu:
         """
         self._testing = False
 
-    def _create_tab_objects(self):
-        """Calls function in tab module"""
-        self._tabs = tab.create_tab_objects(self._config)
+    def _change_tab(self, new_number, announce=True):
+        """Changes the active tab. Only called from .run(), .run_async() and .run_batch()
 
-    def _change_tab(self, new_number):
-        """Changes the active tab. Only called from Menu instance .run()"""
+        Args:
+            new_number (int): number of tab to change to
+            announce (bool): whether to print a message about the tab change
+        """
         # print message about new selection
-        new_tab = self._tabs[new_number]
-        # display a message, including description and long_description if present,
-        # informing user about the tab change
-        if new_tab.head_choice:  # Should be redundant, because should only be called if
-            # the config's layout is multiple tabs.
-            msg = ["Change tab to {0}".format(new_tab.head_choice)]
-            if new_tab.head_desc:
-                msg.append(": {0}".format(new_tab.head_desc))
-            if new_tab.head_desc_long:
-                msg.append("\n{0}".format(new_tab.head_desc_long))
-            print("".join(msg))
+        tab_message = self._definition.change_tab_message(new_number)
+        if announce and tab_message is not None:
+            print(tab_message)
         self._current_tab_number = new_number
+        self._current_page_number = 0
+
+    def _change_page(self, selection):
+        """Changes the page of the current tab if selection is a valid page navigation input.
+
+        Returns:
+            (bool) whether the page was changed
+        """
+        n_pages = self._definition.n_pages(self._current_tab_number)
+        if n_pages == 1:
+            return False
+        if selection == PAGE_NEXT_INPUT:
+            new_number = self._current_page_number + 1
+        elif selection == PAGE_PREVIOUS_INPUT:
+            new_number = self._current_page_number - 1
+        elif selection.startswith(PAGE_GOTO_PREFIX) and selection[len(PAGE_GOTO_PREFIX) :].isdigit():
+            new_number = int(selection[len(PAGE_GOTO_PREFIX) :]) - 1
+        else:
+            return False
+        if not self._definition.has_page(self._current_tab_number, new_number):
+            return False
+        self._current_page_number = new_number
+        return True
+
+    def _reload_if_changed(self):
+        """Swaps in a new definition if the config file watched since Menu.watch() has changed
+
+        Called before the menu is shown and, in run_batch(), before each input. The current tab is kept if a tab
+        with the same tab_header_input still exists, and so is the current page, or the last page if there are
+        fewer pages now
+        """
+        if self._watcher is None:
+            return
+        definition = self._watcher.poll(self._definition)
+        if definition is None:
+            return
+        header = self._definition.config["tabs"][self._current_tab_number].get("tab_header_input", None)
+        headers = [tab_.get("tab_header_input", None) for tab_ in definition.config["tabs"]]
+        tab_number = headers.index(header) if header in headers else 0
+        self._definition = definition
+        self._current_tab_number = tab_number
+        self._current_page_number = min(self._current_page_number, definition.n_pages(tab_number) - 1)
+
+    def _render(self, message=None):
+        """Returns formatted menu, from the definition's cache of rendered frames if possible"""
+        return self._definition.render(
+            self._current_tab_number, self._current_page_number, self._screen_width, message
+        )
 
     def _print_menu(self, message=None):
         """Prints formatted menu to stdout"""
-        formatted = formatting.format_menu(self._config, self._current_tab_number, self._screen_width, message)
-        print(formatted)
+        print(self._render(message))
 
-    def _collect_input(self):
+    def _collect_input(self, message=None):
         """Gets choice from user, repeating until a valid choice given
 
+        Page navigation and search inputs are handled here, redrawing the menu, without returning
+
+        Args:
+            message (str or None): message to display when redrawing the menu after a page change
+
         Returns:
             (dict) containing info about input, e.g. whether it's a new tab or something that leads to
                    an input_returns value
@@ -145,50 +273,84 @@ class Menu:
         if self._testing == "message":
             return prompt
         while not received_valid_input:
-            selection = input("{0}: ".format(prompt))  # the 'input' built-in is monkeypatched for testing
-            # change input to lower-case if config is not case sensitive
-            if not self._case_sensitive:
-                selection = selection.lower()
-            # call tab.Tab.process_input() function on current tab
-            return_dict = self._tabs[self._current_tab_number].process_input(selection)
-            if return_dict["type"] == "invalid":
-                prompt = "Invalid, try again"
+            selection = self._read_selection("{0}: ".format(prompt))
+            return_dict, selection = self._process_selection(selection)
+            if return_dict["type"] in _NO_SELECTION and self._change_page(selection):
+                self._print_menu(message)
+                prompt = "?"
+            elif return_dict["type"] in _NO_SELECTION and selection.startswith(SEARCH_PREFIX):
+                print(self._search_frame(selection, message))
+                prompt = "?"
+            elif return_dict["type"] in _NO_SELECTION:
+                prompt = _retry_prompt(return_dict)
             else:
                 received_valid_input = True
             if self._testing in ["run_invalid", "collect_input"]:  # To avoid infinite loop in test
                 return prompt
         return return_dict
 
-    def _validate_message(self, message):
-        """If run() is called with message as a dict, validates that all keys are valid tab_header_inputs.
+    def _read_selection(self, prompt):
+        """Reads one selection from the user, key by key in keystroke mode if stdin is a terminal, else one line"""
+        if self._keystroke_mode and keypress.available():
+            wait_prefix = None
+            if self._definition.n_pages(self._current_tab_number) > 1:
+                wait_prefix = PAGE_GOTO_PREFIX
+            return keypress.read_selection(
+                prompt,
+                self._definition.sorted_inputs(self._current_tab_number, self._current_page_number),
+                self._definition.case_sensitive,
+                wait_prefix,
+                SEARCH_PREFIX,
+            )
+        return input(prompt)  # the 'input' built-in is monkeypatched for testing
+
+    def _search_frame(self, selection, message=None):
+        """Returns menu showing the current tab's items matching a search input, or all of them if it has no terms"""
+        query = selection[len(SEARCH_PREFIX) :]
+        if not query.strip():
+            return self._render(message)
+        return self._definition.render_search(self._current_tab_number, self._screen_width, query, message)
+
+    def _process_selection(self, selection):
+        """Looks up one input in the current tab; called from _collect_input() and run_batch()
+
+        An input of the tab's provided items on the current page, if any, comes after the tab's exact matches and
+        before prefix matches, see tab.Tab.process_input()
 
-        If message is None or string, does nothing.
+        Returns:
+            (tab.Result, str) result and input, changed to lower-case if config is not case sensitive
+        """
+        if not self._definition.case_sensitive:
+            selection = selection.lower()
+        tab_ = self._definition.tabs[self._current_tab_number]
+        if self._definition.item_providers and selection not in tab_.input2result:
+            result = self._definition.provided_result(self._current_tab_number, self._current_page_number, selection)
+            if result is not None:
+                return result, selection
+        # call tab.Tab.process_input() function on current tab
+        return tab_.process_input(selection), selection
+
+    def _return_value(self, return_dict):
+        """Returns the value run() returns for a 'return' or 'jump' Result
+
+        A 'jump' Result selects an item of another tab, so the current tab changes to that tab first, silently
+        """
+        if return_dict["type"] == "jump":
+            self._change_tab(return_dict["new_number"], announce=False)
+        if self._definition.has_multiple_tabs:
+            tab_id = self._definition.tabs[self._current_tab_number].head_choice
+            return (tab_id, return_dict["return_value"])
+        return return_dict["return_value"]
 
-        Raises:
-            ValueError if keys do not match tab_header_inputs
-        """
-        if isinstance(message, dict):
-            if not self._has_multiple_tabs:
-                raise ValueError("Menu instance has only one tab, so cannot take a dict as message arg for run()")
-            nonmatching_keys = []
-            for key in message.keys():
-                if not any([x == key for x in self._tabs[0].selectors]):
-                    nonmatching_keys.append(key)
-            if nonmatching_keys:
-                raise ValueError(
-                    "The following key(s) in message dict do not match tab_header_inputs: {}".format(
-                        "; ".join(nonmatching_keys)
-                    )
-                )
-        else:
-            if not isinstance(message, str) and message is not None:
-                raise TypeError("message arg to run() must be None, str or dict")
+    def _validate_message(self, message):
+        """Calls definition.MenuDefinition.validate_message()"""
+        self._definition.validate_message(message)
 
     def _get_message(self, message):
         """Returns None or str or dict's value, as appropriate"""
         if not isinstance(message, dict):
             return message
-        current_selector = self._tabs[0].selectors[self._current_tab_number]
+        current_selector = self._definition.tabs[0].selectors[self._current_tab_number]
         return message.get(current_selector, None)
 
     def run(self, message=None):
@@ -211,9 +373,10 @@ class Menu:
         # flag
         received_return_value = False
         while not received_return_value:
+            self._reload_if_changed()
             message_ = self._get_message(message)
             self._print_menu(message_)
-            return_dict = self._collect_input()
+            return_dict = self._collect_input(message_)
             if self._testing in ["run_invalid", "message"]:
                 return return_dict
             if return_dict["type"] == "change_tab":
@@ -221,8 +384,386 @@ class Menu:
                 if self._testing == "run_tab":
                     return return_dict
             else:
-                if self._has_multiple_tabs:
-                    tab_id = self._tabs[self._current_tab_number].head_choice
-                    return (tab_id, return_dict["return_value"])
+                return self._return_value(return_dict)
+
+    async def run_async(self, message=None, reader=None, writer=None):
+        """Called by user, coroutine equivalent of run() reading from and writing to asyncio streams
+
+        Note that the current tab is session state, so concurrent users need one session each (see session()).
+
+        Args:
+            message (None, str or dict(str: str)): as in run()
+            reader (asyncio.StreamReader or None): anything with a coroutine readline() returning one line of
+                bytes or str, and an empty line at end of stream. If None, the built-in input() is run in
+                the event loop's default executor
+            writer (asyncio.StreamWriter or None): anything with a write(bytes) method, and optionally a
+                coroutine drain(). If None, output is printed
+
+        Returns:
+            same as run()
+
+        Raises:
+            EOFError if reader reaches end of stream before a selection is made
+        """
+        self._validate_message(message)
+        while True:
+            self._reload_if_changed()
+            message_ = self._get_message(message)
+            await _write_async(writer, self._render(message_) + "\n")
+            prompt = "?"
+            while True:
+                selection = await _read_async(reader, writer, "{0}: ".format(prompt))
+                return_dict, selection = self._process_selection(selection)
+                if return_dict["type"] not in _NO_SELECTION:
+                    break
+                if self._change_page(selection):
+                    await _write_async(writer, self._render(message_) + "\n")
+                    prompt = "?"
+                elif selection.startswith(SEARCH_PREFIX):
+                    await _write_async(writer, self._search_frame(selection, message_) + "\n")
+                    prompt = "?"
                 else:
-                    return return_dict["return_value"]
+                    prompt = _retry_prompt(return_dict)
+            if return_dict["type"] != "change_tab":
+                return self._return_value(return_dict)
+            tab_message = self._definition.change_tab_message(return_dict["new_number"])
+            if tab_message is not None:
+                await _write_async(writer, tab_message + "\n")
+            self._change_tab(return_dict["new_number"], announce=False)
+
+    def run_batch(self, inputs):
+        """Called by user, processes inputs as run() would, without displaying anything; a generator.
+
+        Tab changes and page navigation inputs change the state of the session, exactly as in run(), but yield
+        nothing, and so do search inputs. The session keeps its current tab after the generator is exhausted, as it
+        does between calls to run().
+
+        Args:
+            inputs (iterable of str): inputs, e.g. lines of a recorded session; consumed lazily
+
+        Yields:
+            (BatchEvent) for every input that is a selection (with the value run() would have returned),
+                is invalid or is ambiguous
+        """
+        for raw_input in inputs:
+            self._reload_if_changed()
+            return_dict, selection = self._process_selection(raw_input)
+            result_type = return_dict["type"]
+            if result_type in ("return", "jump"):
+                value = self._return_value(return_dict)
+                yield BatchEvent("selection", raw_input, value, self._current_tab_number)
+            elif result_type == "change_tab":
+                self._change_tab(return_dict["new_number"], announce=False)
+            elif not self._change_page(selection) and not selection.startswith(SEARCH_PREFIX):
+                candidates = return_dict.get("candidates", None)
+                yield BatchEvent(result_type, raw_input, candidates, self._current_tab_number)
+
+
+class Menu(MenuSession):
+    """Base class to import to create a menu
+
+    A Menu is a MenuSession that builds its own MenuDefinition from a config; concurrent users of the same menu
+    should each get a session from session() rather than a Menu each.
+
+    Args:
+        config (dict): a nested dict, in a schema which will be validated, containing everything needed
+                        to instantiate the Menu class
+        start_tab_number(int): default 0, the number of the tab to start at
+        validation_backend (str): default 'compiled', or 'schema' to validate with the schema package
+        item_providers (dict or None): tab number to provider.ItemProvider, for items generated while the menu
+                                       runs, shown below the tab's items of the config
+
+    Methods:
+        safe_read_yaml(path_to_yaml): static method to read a yaml file into a config dict
+        yaml_backend(): static method returning the name of the yaml loader used by safe_read_yaml()
+        read_json(path_to_json): static method to read a json file into a config dict
+        read_config_file(path_to_config): static method to read a yaml or json file into a config dict
+        compile(path_to_config, path_to_compiled): static method to write a compiled artifact of a config file
+        from_file(path_to_config, cache_dir=None): class method to create a menu from a yaml or json file,
+            optionally caching its compiled artifact in cache_dir
+        load_compiled(path_to_compiled, path_to_config=None): class method to create a menu from a compiled artifact
+        watch(path_to_config): class method to create a menu from a yaml or json file, reloaded when it changes
+        from_definition(definition): class method to create a menu from an existing MenuDefinition
+        add_item(tab_number, item): adds an item to a tab, validating only the item
+        remove_item(tab_number, item_returns): removes the item of a tab with this return value
+        add_tab(tab_dict): adds a tab after the last tab, validating only the tab
+        session(start_tab_number=None): creates a MenuSession sharing this menu's definition
+        run(message=None): Displays menu at currently selected tab, asks for user input and returns it as a string
+        run_async(message=None, reader=None, writer=None): coroutine version of run() for asyncio streams
+        run_batch(inputs): Processes an iterable of inputs without displaying anything, yielding BatchEvents
+
+    Examples:
+
+        >>> config = Menu.safe_read_yaml('config.yaml')
+        >>> menu = Menu(config, start_tab_number=0)
+        >>> result = menu.run()
+        >>> if result = "action name":
+        >>>         my_great_function()
+
+        >>> # with a submenu
+        >>> config = Menu.safe_read_yaml('config.yaml')
+        >>> menu = Menu(config, start_tab_number=0)
+        >>> result = menu.run()
+        >>> if result = "further options":
+        >>>     submenu = Menu(submenu_config)
+        >>>     if submenu_result = "action name":
+        >>>         my_great_function()
+    """
+
+    def __init__(self, config, start_tab_number=0, validation_backend="compiled", item_providers=None):
+        """Instantiator for Menu class.
+
+        Args:
+            config (dict): a nested dict, in a schema which will be validated, containing everything needed
+                           to instantiate the Menu class
+            start_tab_number(int): default 0, the number of the tab to start at
+            validation_backend (str): default 'compiled', or 'schema' to validate with the schema package
+            item_providers (dict or None): tab number to provider.ItemProvider, see
+                                           definition.MenuDefinition.from_config()
+        """
+        definition = MenuDefinition.from_config(config, validation_backend, item_providers)
+        super().__init__(definition, start_tab_number)
+
+    @classmethod
+    def from_definition(cls, definition, start_tab_number=0):
+        """Creates Menu instance from a MenuDefinition, without validating or normalizing
+
+        Args:
+            definition (definition.MenuDefinition): the validated and normalized menu
+            start_tab_number(int): default 0, the number of the tab to start at
+
+        Returns:
+            (Menu) instance
+        """
+        menu = cls.__new__(cls)
+        MenuSession.__init__(menu, definition, start_tab_number)
+        return menu
+
+    # the attributes below predate MenuDefinition and are kept for compatibility
+
+    @property
+    def _config(self):
+        """Normalized config, from the definition"""
+        return self._definition.config
+
+    @property
+    def _tabs(self):
+        """Tab objects, from the definition"""
+        return self._definition.tabs
+
+    @property
+    def _frames(self):
+        """Cache of rendered frames, from the definition"""
+        return self._definition._frames
+
+    @staticmethod
+    def safe_read_yaml(path_to_yaml):
+        """Reads yaml file at specified path.
+
+        Parses straight from the file stream, with libyaml's CSafeLoader if available (see yaml_backend())
+
+        Args:
+            path_to_yaml (str or pathlib.Path): path to a yaml file following the config schema
+
+        Returns:
+            (dict) config to pass to Menu instantiator
+        """
+        import yaml  # pylint: disable=import-outside-toplevel  # see module docstring
+
+        with open(path_to_yaml, "r") as f:
+            dict_ = yaml.load(f, Loader=_yaml_safe_loader())  # both possible loaders are safe loaders
+        return dict_
+
+    @staticmethod
+    def yaml_backend():
+        """Returns name of the loader used by safe_read_yaml(): 'CSafeLoader' (libyaml) or 'SafeLoader'"""
+        return _yaml_safe_loader().__name__
+
+    @staticmethod
+    def read_json(path_to_json):
+        """Reads json file at specified path.
+
+        Args:
+            path_to_json (str or pathlib.Path): path to a json file following the config schema
+
+        Returns:
+            (dict) config to pass to Menu instantiator
+        """
+        import json  # pylint: disable=import-outside-toplevel  # see module docstring
+
+        with open(path_to_json, "r") as f:
+            dict_ = json.load(f)
+        return dict_
+
+    @staticmethod
+    def read_config_file(path_to_config):
+        """Reads config file with read_json() if it ends in .json, otherwise with safe_read_yaml()
+
+        Args:
+            path_to_config (str or pathlib.Path): path to a yaml or json file following the config schema
+
+        Returns:
+            (dict) config to pass to Menu instantiator
+        """
+        if str(path_to_config).lower().endswith(".json"):
+            return Menu.read_json(path_to_config)
+        return Menu.safe_read_yaml(path_to_config)
+
+    @staticmethod
+    def compile(path_to_config, path_to_compiled, validation_backend="compiled"):
+        """Reads, validates and normalizes a config file and writes it as a compiled artifact.
+
+        Files ending in .json are read with read_json(), all others with safe_read_yaml()
+
+        Args:
+            path_to_config (str or pathlib.Path): path to a yaml or json file following the config schema
+            path_to_compiled (str or pathlib.Path): path to write the compiled artifact to
+            validation_backend (str): default 'compiled', or 'schema' to validate with the schema package
+        """
+        source_digest = compiled.source_hash(path_to_config)
+        definition = MenuDefinition.from_config(Menu.read_config_file(path_to_config), validation_backend)
+        compiled.dump(path_to_compiled, definition.config, definition.tabs, source_digest)
+
+    @classmethod
+    def load_compiled(cls, path_to_compiled, path_to_config=None, start_tab_number=0):
+        """Creates Menu instance from an artifact written by compile(), without validating or normalizing.
+
+        Args:
+            path_to_compiled (str or pathlib.Path): path to the compiled artifact
+            path_to_config (str or pathlib.Path or None): if given, the source config file; the artifact is
+                                                         rejected if it was compiled from different contents
+            start_tab_number(int): default 0, the number of the tab to start at
+
+        Returns:
+            (Menu) instance
+
+        Raises:
+            compiled.CompiledMenuError if the artifact is unrecognized, of a different format version,
+                                       corrupt or stale
+        """
+        source_digest = None
+        if path_to_config is not None:
+            source_digest = compiled.source_hash(path_to_config)
+        payload = compiled.load(path_to_compiled, source_digest)
+        return cls._from_compiled_payload(payload, start_tab_number)
+
+    @classmethod
+    def from_file(cls, path_to_config, cache_dir=None, start_tab_number=0, validation_backend="compiled"):
+        """Creates Menu instance from a yaml or json config file, optionally using an on-disk cache.
+
+        Files ending in .json are read with read_json(), all others with safe_read_yaml().
+        If cache_dir is given, it works like __pycache__: a compiled artifact keyed on the file's path, mtime,
+        size and content hash is loaded if present, skipping parsing, validation and normalization. Otherwise the
+        file is read as usual and the artifact is written atomically, so concurrent launches do not race.
+
+        Args:
+            path_to_config (str or pathlib.Path): path to a yaml or json file following the config schema
+            cache_dir (str or pathlib.Path or None): directory for cached artifacts, created if needed
+            start_tab_number(int): default 0, the number of the tab to start at
+            validation_backend (str): default 'compiled', or 'schema' to validate with the schema package
+
+        Returns:
+            (Menu) instance
+        """
+        if cache_dir is None:
+            return cls(cls.read_config_file(path_to_config), start_tab_number, validation_backend)
+        path_to_cached = compiled.cache_path(cache_dir, path_to_config)
+        source_digest = compiled.source_hash(path_to_config)
+        try:
+            payload = compiled.load(path_to_cached, source_digest)
+        except (OSError, compiled.CompiledMenuError):
+            pass
+        else:
+            return cls._from_compiled_payload(payload, start_tab_number)
+        menu = cls(cls.read_config_file(path_to_config), start_tab_number, validation_backend)
+        try:
+            os.makedirs(str(cache_dir), exist_ok=True)
+            compiled.dump(path_to_cached, menu.definition.config, menu.definition.tabs, source_digest)
+            compiled.prune_cache(cache_dir, path_to_config, keep=path_to_cached)
+        except OSError:  # an unwritable cache must not prevent the menu from running
+            pass
+        return menu
+
+    @classmethod
+    def watch(cls, path_to_config, start_tab_number=0, validation_backend="compiled", on_error=None):
+        """Creates Menu instance from a yaml or json config file that is reloaded whenever it changes.
+
+        Before the menu is shown by run() or run_async(), and before each input of run_batch(), the file's mtime and
+        size are checked. If they have changed, the file is read and validated again, only in the tabs that changed
+        if the settings and tab headers did not, and the new menu replaces the old one, on the same tab if it still
+        exists. If the new file cannot be read or is invalid, the old menu is kept and on_error is called.
+        Sessions created with session() are not reloaded.
+
+        Args:
+            path_to_config (str or pathlib.Path): path to a yaml or json file following the config schema
+            start_tab_number(int): default 0, the number of the tab to start at
+            validation_backend (str): default 'compiled', or 'schema' to validate with the schema package
+            on_error (callable or None): called with the path and the exception when a changed file cannot be
+                                         loaded; if None, a message is printed
+
+        Returns:
+            (Menu) instance
+
+        Raises:
+            validators.InvalidInputError if the config file is invalid when the menu is created
+        """
+        watcher = ConfigWatcher(path_to_config, cls.read_config_file, validation_backend, on_error)
+        menu = cls(watcher.read(), start_tab_number, validation_backend)
+        menu._watcher = watcher
+        return menu
+
+    def add_item(self, tab_number, item):
+        """Adds an item after the last item of a tab, validating and normalizing only that item
+
+        The menu gets a new definition from definition.MenuDefinition.with_items(), sharing everything that the
+        item does not change with the old one, which sessions created with session() keep using. If the menu is
+        watched, the next change of the file reloads every tab.
+
+        Args:
+            tab_number (int): number of the tab
+            item (dict): the item, as it would be in the config
+
+        Raises:
+            validators.InvalidInputError if the item is invalid, or repeats an input or return value of the tab
+            ValueError if the config has global_jump
+        """
+        self._replace_definition(self._definition.with_items(tab_number, [item]))
+
+    def remove_item(self, tab_number, item_returns):
+        """Removes the item of a tab that returns item_returns; see add_item()
+
+        Args:
+            tab_number (int): number of the tab
+            item_returns (object): the item's item_returns value
+
+        Raises:
+            ValueError if the tab has no such item, or it is the tab's only item
+        """
+        self._replace_definition(self._definition.without_item(tab_number, item_returns))
+
+    def add_tab(self, tab_dict):
+        """Adds a tab after the last tab, validating and normalizing only that tab; see add_item()
+
+        Args:
+            tab_dict (dict): the tab, as it would be in the config
+
+        Raises:
+            validators.InvalidInputError if the tab is invalid, or its tab_header_input is an input of a tab
+            ValueError if the config has global_jump or a single tab
+        """
+        self._replace_definition(self._definition.with_tab(tab_dict))
+
+    def _replace_definition(self, definition):
+        """Swaps in a definition changed by add_item(), remove_item() or add_tab()
+
+        The session stays on the same tab and page, or goes to the last page if there are fewer pages now.
+        """
+        self._definition = definition
+        self._current_page_number = min(self._current_page_number, definition.n_pages(self._current_tab_number) - 1)
+        if self._watcher is not None:
+            self._watcher.invalidate()
+
+    @classmethod
+    def _from_compiled_payload(cls, payload, start_tab_number):
+        """Creates Menu instance from the output of compiled.load(), without validating or normalizing"""
+        return cls.from_definition(MenuDefinition(payload["config"], payload["item_tables"]), start_tab_number)
@@ -10,10 +10,11 @@ Normalization consists of, for those parts of the config that require it:
 1. Adding default values where the key is missing
 2. Converting elements to string where appropriate
 3. Converting elements to lower-case where appropriate if config's case_sensitive is False
-"""
-
 
-from copy import deepcopy
+The config passed in is never modified: the normalized config is a new one. normalize_settings(), normalize_tab()
+and normalize_item() normalize one part each, for validators.validate_and_normalize(), which normalizes the parts
+as it validates them.
+"""
 
 
 def _add_tabs_key_if_needed(config):
@@ -25,34 +26,72 @@ def _add_tabs_key_if_needed(config):
         config (dict): config dict from menu.Menu
 
     Returns:
-        config (dict): modified so that 'items' key is a member of 'tabs': list if appropriate
+        config (dict): shallow copy in which 'items' key is a member of 'tabs': list if appropriate
                        otherwise, unchanged config
     """
     if "tabs" not in config.keys():
         if "items" not in config.keys():  # sanity check
             raise AssertionError("There is something wrong with the test suite if this error is called")
-        config["tabs"] = [{"items": deepcopy(config["items"])}]
-        del config["items"]
+        # items are copied while they are normalized, so only the outer dict needs copying here
+        config = dict(config)
+        config["tabs"] = [{"items": config.pop("items")}]
         return config
     else:
         return config
 
 
-def _walk_stringize_and_case(config):  # noqa: C901
-    """Walks the various contents of config and:
+def _stringify_and_recase(element, change_case=False, none_allowed=False):
+    """Changes to string and/or changes case where appropriate.
 
-    1. Adds default values if missing
-    2. Converts to string if not None where appropriate
-    3. If case_sensitive is False, converts to lowercase where appropriate
+    Args:
+        element (object): Python object (probably a string or an int) that is a value of config
+        change_case (bool): whether to change to lowercase; the caller passes True only for inputs
+                            in a config whose case_sensitive is False
+        none_allowed (bool): whether element is allowed to be None, in which case if it is None,
+                             None is returned
+    """
+    # return None if element is None and that's allowed
+    if none_allowed and element is None:
+        return None
+    if change_case:
+        return str(element).lower()
+    # return as-is, but as a string
+    return str(element)
 
-    Called from normalize()
+
+def normalize_item(old_item, lowercase_inputs, new_inputs=None):
+    """Returns normalized copy of one item dict; called from normalize_tab() once per item
 
     Args:
-        config (dict): config dict from menu.Menu after possibly being modified by _add_key_if_needed()
+        old_item (dict): item from config, already validated
+        lowercase_inputs (bool): True if config's case_sensitive is False
+        new_inputs (list of str or None): the item's inputs if they have already been normalized,
+                                          otherwise None to normalize them here
+    """
+    new_item = {}
+    for item_key, old_item_value in old_item.items():
+        if item_key == "item_inputs":
+            # since these are inputs, they should be lowercased if config is not case sensitive
+            if new_inputs is not None:
+                new_item[item_key] = new_inputs
+            elif lowercase_inputs:
+                new_item[item_key] = [str(entry).lower() for entry in old_item_value]
+            else:
+                new_item[item_key] = [str(entry) for entry in old_item_value]
+        else:
+            # the only other possible keys, already validated, are 'item_choice_displayed', 'item_description'
+            # and 'item_returns'. These keys are changed to string only.
+            # changing the returns value to a string was a design decision which could be
+            # reversed in future, e.g. so a function could be returned
+            new_item[item_key] = str(old_item_value)
+    return new_item
 
-    Returns:
-        config (dict): modified so that 'items' key is a member of 'tabs': list if appropriate
-                       otherwise, unchanged config
+
+def normalize_settings(config):
+    """Returns new config dict holding the normalized values of the outermost keys of config, except 'tabs'
+
+    Args:
+        config (dict): config dict from menu.Menu, already validated
     """
     new_config = {}
     old_config = config
@@ -67,61 +106,67 @@ def _walk_stringize_and_case(config):  # noqa: C901
     else:
         new_config["screen_width"] = 80
 
-    def stringify_and_recase(element, change_case=False, none_allowed=False):
-        """Changes to string and/or changes case where appropriate.
-
-        Args:
-            element (object): Python object (probably a string or an int) that is a value of config
-            change_case (bool): whether to change case if and only if nonlocal variable
-                                new_config["case_sensitive"] is true
-            none_allowed (bool): whether element is allowed to be None, in which case if it is None,
-                                 None is returned
-        """
-        # return None if element is None and that's allowed
-        if none_allowed and element is None:
-            return None
-        # change to lowercase if appropriate for element and for config's case_sensitive boolean key
-        if change_case and not new_config["case_sensitive"]:
-            return str(element).lower()
-        else:
-            # return as-is, but as a string
-            return str(element)
+    # None means no paging: all items of a tab are shown
+    new_config["page_size"] = old_config.get("page_size", None)
 
-    # walk tree of config["tabs"], building a new config tree with modified values where appropriate
-    new_config["tabs"] = []
-    for old_tab in old_config["tabs"]:
-        new_tab = {}
-        # Note by iterating over the keys and values present in old_tab, there is no assumption made
-        # that any key except for 'items' will be present. Congruity of the presence and types of these
-        # keys was already done by the validators module
-        for tab_key, old_tab_value in old_tab.items():
-            if tab_key == "tab_header_input":
-                # since this is an input, it should be lowercased if config is not case-sensitive
-                new_tab[tab_key] = stringify_and_recase(old_tab_value, change_case=True)
-            elif tab_key in ["tab_header_description", "tab_header_long_description"]:
-                # these are allowed to be None (or missing, though that's not checked here), and since
-                # they are only printed to stdout, they should not change case
-                new_tab[tab_key] = stringify_and_recase(old_tab_value, change_case=False, none_allowed=True)
+    new_config["prefix_matching"] = old_config.get("prefix_matching", False)
+
+    new_config["global_jump"] = old_config.get("global_jump", False)
+
+    return new_config
+
+
+def normalize_tab(old_tab, lowercase_inputs, new_items=None):
+    """Returns normalized copy of one tab dict, with its keys in the same order
+
+    Args:
+        old_tab (dict): tab from config, already validated
+        lowercase_inputs (bool): True if config's case_sensitive is False
+        new_items (list of dict or None): the tab's items if they have already been normalized with
+                                          normalize_item(), otherwise None to normalize them here
+    """
+    new_tab = {}
+    # Note by iterating over the keys and values present in old_tab, there is no assumption made
+    # that any key except for 'items' will be present. Congruity of the presence and types of these
+    # keys was already done by the validators module
+    for tab_key, old_tab_value in old_tab.items():
+        if tab_key == "tab_header_input":
+            # since this is an input, it should be lowercased if config is not case-sensitive
+            new_tab[tab_key] = _stringify_and_recase(old_tab_value, change_case=lowercase_inputs)
+        elif tab_key in ("tab_header_description", "tab_header_long_description"):
+            # these are allowed to be None (or missing, though that's not checked here), and since
+            # they are only printed to stdout, they should not change case
+            new_tab[tab_key] = _stringify_and_recase(old_tab_value, none_allowed=True)
+        elif tab_key == "items":
             # items is the only key this function assumes will be there; its presence was already validated
             # by the validators script
-            new_tab["items"] = []
-            for old_item in old_tab["items"]:
-                new_item = {}
-                for item_key, old_item_value in old_item.items():
-                    if item_key in ["item_choice_displayed", "item_description", "item_returns"]:
-                        # these keys are changed to string only
-                        # changing the returns value to a string was a design decision which could be
-                        # reversed in future, e.g. so a function could be returned
-                        new_item[item_key] = stringify_and_recase(old_item_value)
-                    else:
-                        # the only other possible key, already validated, is 'item_inputs
-                        new_entries = []
-                        for old_entry in old_item["item_inputs"]:
-                            # since this is an input, it should be lowercased if config is not case sensitive
-                            new_entries.append(stringify_and_recase(old_entry, True))
-                        new_item["item_inputs"] = new_entries
-                new_tab["items"].append(new_item)
-        new_config["tabs"].append(new_tab)
+            if new_items is None:
+                new_items = [normalize_item(old_item, lowercase_inputs) for old_item in old_tab_value]
+            new_tab[tab_key] = new_items
+    return new_tab
+
+
+def _walk_stringize_and_case(config):
+    """Walks the various contents of config and:
+
+    1. Adds default values if missing
+    2. Converts to string if not None where appropriate
+    3. If case_sensitive is False, converts to lowercase where appropriate
+
+    Every tab and every item is visited exactly once, so this is linear in the size of the config
+
+    Called from normalize()
+
+    Args:
+        config (dict): config dict from menu.Menu after passing through _add_tabs_key_if_needed()
+
+    Returns:
+        config (dict): new normalized config
+    """
+    new_config = normalize_settings(config)
+    lowercase_inputs = not new_config["case_sensitive"]
+    # walk tree of config["tabs"], building a new config tree with modified values where appropriate
+    new_config["tabs"] = [normalize_tab(old_tab, lowercase_inputs) for old_tab in config["tabs"]]
     return new_config
 
 
@@ -133,9 +178,9 @@ def normalize(config):
     Called from menu.Menu only, not by user
 
     Args:
-        config (dict): config data as passed to menu.Menu instantiator
+        config (dict): config data as passed to menu.Menu instantiator; not modified
     Returns:
-        (dict): normalized/modified config dict
+        (dict): new normalized config dict
     """
     config = _add_tabs_key_if_needed(config)
     config = _walk_stringize_and_case(config)
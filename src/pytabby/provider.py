@@ -0,0 +1,189 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Contains ItemProvider class, a source of items generated while the menu runs, for one tab
+
+Tabs list their items in the config, which is validated and normalized once. Items that are too many, or change
+too often, to be listed there (hosts, jobs, files...) can come from an ItemProvider instead, given to
+definition.MenuDefinition.from_config() or menu.Menu with the number of the tab they are shown in. They are
+fetched one page at a time, when the page is shown or one of its inputs is typed, and only the items of the
+pages fetched are validated and normalized, by the definition; the provider caches the items it fetched, and
+the definition keeps what it derived from a page only while the provider caches the page.
+
+The config must still list at least one item for a tab with an ItemProvider, since every tab of a config needs
+items: e.g. an item to refresh the provided items, or to go back.
+
+A page is fetched with one more item than it shows, so whether there is a next page is known without counting
+the items: the provider only ever knows how many pages there are up to the furthest page fetched.
+"""
+
+from itertools import islice
+import threading
+import time
+
+
+class ItemProvider:
+    """Fetches the items of one tab page by page, from a callable or an iterable, and caches them
+
+    Items have the same keys as the items of a config. The items of a callable are fetched again once they are
+    older than ttl, and the pages least recently shown are evicted once more than max_cached_items are cached.
+    An iterable, e.g. a generator, is pulled only as far as the pages shown and kept, since it cannot be read
+    again: ttl and max_cached_items do not apply, and clear() has no effect. The tab the items are shown in must
+    have at least one item in the config, like every tab, e.g. one to refresh the provided items.
+
+    Args:
+        source (callable or iterable): callable(offset, limit) returning an iterable of the items from number
+                                       offset on, at most limit of them and fewer only if there are no more;
+                                       or an iterable of items
+        page_size (int): default 20, number of items per page
+        ttl (int or float or None): default None, seconds after which the items of a callable are fetched again;
+                                    if None, they are kept until evicted or clear() is called
+        max_cached_items (int or None): default 1000, number of items of a callable cached at most, not counting
+                                        the page fetched last; if None, no limit
+        clock (callable): default time.monotonic, returns the current time in seconds
+
+    Methods:
+        page(page_number): items of a page, and whether there are items after it
+        cached(page_number): items of a page if they are cached and not older than ttl, without fetching them
+        n_pages(): number of pages known to exist, and whether there are no more
+        clear(): forgets the items fetched, so that they are fetched again when shown
+
+    Raises:
+        ValueError if page_size, ttl or max_cached_items is not positive
+    """
+
+    __slots__ = (
+        "source",
+        "page_size",
+        "ttl",
+        "max_cached_items",
+        "clock",
+        "_iterator",
+        "_pulled",
+        "_pages",
+        "_n_cached_items",
+        "_n_known",
+        "_last_page",
+        "_lock",
+    )
+
+    def __init__(self, source, page_size=20, ttl=None, max_cached_items=1000, clock=time.monotonic):
+        """Instantiator for ItemProvider class; see class docstring for arguments"""
+        if not isinstance(page_size, int) or isinstance(page_size, bool) or page_size <= 0:
+            raise ValueError("page_size must be a positive int")
+        if ttl is not None and not ttl > 0:
+            raise ValueError("ttl must be positive or None")
+        if max_cached_items is not None and not max_cached_items > 0:
+            raise ValueError("max_cached_items must be positive or None")
+        self.source = source
+        self.page_size = page_size
+        self.ttl = ttl
+        self.max_cached_items = max_cached_items
+        self.clock = clock
+        # pulled items of an iterable source, or None for a callable source
+        self._iterator = None if callable(source) else iter(source)
+        self._pulled = []
+        # page number to (time fetched, tuple of items, whether there are more), least recently used first
+        self._pages = {}
+        self._n_cached_items = 0
+        self._n_known = 0
+        self._last_page = None
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        """Returns short description with the number of pages cached"""
+        return "<ItemProvider: {0} page(s) cached>".format(len(self._pages))
+
+    def page(self, page_number):
+        """Returns items of a page, fetched or from the cache, and whether there are items after it
+
+        The tuple of items is the same object as long as the page is cached, so that the definition can keep
+        what it derived from it.
+
+        Args:
+            page_number (int): zero-based number of the page
+
+        Returns:
+            (tuple of dict, bool) items of the page, empty if there is no such page, and whether there are more
+        """
+        with self._lock:
+            entry = self._pages.pop(page_number, None)
+            if entry is not None and (self.ttl is None or self.clock() - entry[0] < self.ttl):
+                self._pages[page_number] = entry  # most recently used last; dicts keep insertion order
+                return entry[1], entry[2]
+            if entry is not None:
+                self._n_cached_items -= len(entry[1])
+            offset = page_number * self.page_size
+            if self._iterator is None:
+                fetched = list(islice(self.source(offset, self.page_size + 1), self.page_size + 1))
+            else:
+                n_missing = max(0, offset + self.page_size + 1 - len(self._pulled))
+                self._pulled.extend(islice(self._iterator, n_missing))
+                fetched = self._pulled[offset : offset + self.page_size + 1]
+            items, more = tuple(fetched[: self.page_size]), len(fetched) > self.page_size
+            self._record_extent(page_number, items, more)
+            self._pages[page_number] = (self.clock(), items, more)
+            if self._iterator is None:
+                self._n_cached_items += len(items)
+                self._evict(page_number)
+            return items, more
+
+    def cached(self, page_number):
+        """Returns tuple of the items of a page, the same object as page() returned, if cached and still fresh
+
+        Neither fetches the page nor makes it the most recently used; returns None if the page is not cached
+        """
+        with self._lock:
+            entry = self._pages.get(page_number, None)
+            if entry is None or (self.ttl is not None and self.clock() - entry[0] >= self.ttl):
+                return None
+            return entry[1]
+
+    def _record_extent(self, page_number, items, more):
+        """Updates the number of pages known to exist after fetching one; called from page() only"""
+        if not items:
+            if page_number:
+                self._n_known = min(self._n_known, page_number)
+                if self._last_page is not None and self._last_page >= page_number:
+                    self._last_page = None
+            else:
+                self._n_known, self._last_page = 1, 0
+        elif more:
+            self._n_known = max(self._n_known, page_number + 2)
+            if self._last_page is not None and self._last_page <= page_number:
+                self._last_page = None
+        else:
+            self._n_known, self._last_page = page_number + 1, page_number
+
+    def _evict(self, keep):
+        """Evicts the least recently used pages, except page number keep, while too many items are cached"""
+        if self.max_cached_items is None:
+            return
+        for page_number in list(self._pages):
+            if self._n_cached_items <= self.max_cached_items:
+                return
+            if page_number != keep:
+                self._n_cached_items -= len(self._pages.pop(page_number)[1])
+
+    def n_pages(self):
+        """Returns number of pages known to exist, at least 1, and whether there are no more
+
+        Fetches the first page if no page has been fetched yet
+
+        Returns:
+            (int, bool) number of pages, and whether it is the total rather than a lower bound
+        """
+        if not self._n_known:
+            self.page(0)
+        with self._lock:
+            return max(1, self._n_known), self._last_page is not None and self._last_page + 1 == self._n_known
+
+    def clear(self):
+        """Forgets the items of a callable fetched so far, e.g. after they have changed"""
+        if self._iterator is not None:
+            return
+        with self._lock:
+            self._pages.clear()
+            self._n_cached_items = 0
+            self._n_known = 0
+            self._last_page = None
@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Contains SearchIndex class, to find the items of a tab by part of their text; called from definition.py only
+
+The searchable text of an item is its item_choice_displayed and item_description, in lower case. A query is
+split into words, and an item matches if every word is a substring of its text. To avoid scanning every item,
+the index maps every substring of one to three characters of the texts to the sorted numbers of the items
+containing it: a word of up to three characters is looked up directly, and for a longer word only the items
+listed for its rarest trigram (substring of three characters) need to be checked. The lists of the words of a
+query are intersected if there are several words.
+"""
+
+_N = 3
+
+
+def _searchable_text(item):
+    """Returns the lower-case text an item is searched by"""
+    description = item.get("item_description", None)
+    if description is None:
+        return str(item["item_choice_displayed"]).lower()
+    return "{0} {1}".format(item["item_choice_displayed"], description).lower()
+
+
+class SearchIndex:
+    """Index of the substrings of up to three characters of the items of one tab
+
+    Args:
+        items (list of dict): 'items' value of one tab of a normalized config
+
+    Methods:
+        search(query): numbers of the matching items, in tab order
+    """
+
+    __slots__ = ("_texts", "_postings")
+
+    def __init__(self, items):
+        """Instantiator for SearchIndex class; builds the index in one pass over items"""
+        self._texts = [_searchable_text(item) for item in items]
+        postings = {}
+        for i, text in enumerate(self._texts):
+            grams = {text[j : j + n] for n in range(1, _N + 1) for j in range(len(text) - n + 1)}
+            for gram in grams:
+                numbers = postings.get(gram, None)
+                if numbers is None:
+                    postings[gram] = [i]
+                else:
+                    numbers.append(i)
+        self._postings = postings
+
+    def search(self, query):
+        """Finds the items whose text contains every word of query, ignoring case
+
+        Args:
+            query (str): words separated by whitespace
+
+        Returns:
+            (list of int) numbers of the matching items, in tab order; every item if query has no words
+        """
+        words = query.lower().split()
+        if not words:
+            return list(range(len(self._texts)))
+        # a short word is indexed itself, and the rarest trigram of a longer word bounds the items containing it
+        rarest = []
+        for word in words:
+            word_rarest = None
+            for j in range(max(1, len(word) - _N + 1)):
+                numbers = self._postings.get(word[j : j + _N], None)
+                if numbers is None:
+                    return []
+                if word_rarest is None or len(numbers) < len(word_rarest):
+                    word_rarest = numbers
+            rarest.append(word_rarest)
+        if len(rarest) == 1:
+            candidates = rarest[0]
+        else:
+            rarest.sort(key=len)
+            candidate_set = set(rarest[0])
+            for numbers in rarest[1:]:
+                candidate_set.intersection_update(numbers)
+            candidates = sorted(candidate_set)
+        # a trigram in common does not make a longer word a substring, so those words are checked
+        texts = self._texts
+        for word in words:
+            if len(word) > _N:
+                candidates = [i for i in candidates if word in texts[i]]
+        return list(candidates)
@@ -0,0 +1,156 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Serves one menu.Menu to many concurrent clients over a Unix socket or localhost TCP, and a client for it
+
+The menu's definition.MenuDefinition is built once. Every connection gets its own menu.MenuSession, which
+holds only the current tab and page, while the config, tab objects and rendered frames are shared by all sessions.
+
+The protocol is plain text, as a terminal would show it: the server writes frames and prompts, the client
+sends one input per line. Whenever the client makes a selection, on_selection is called with it, and the
+text it returns, if any, is sent to the client before the menu is shown again.
+"""
+
+import asyncio
+import sys
+import threading
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+
+def default_on_selection(value):
+    """Default on_selection: tells the client what was selected
+
+    Args:
+        value: what Menu.run() returns, (tab_header_input, item_returns) or item_returns
+
+    Returns:
+        (str) text to send to the client
+    """
+    if isinstance(value, tuple):
+        value = ":".join(value)
+    return "Selected {0}\n".format(value)
+
+
+async def _handle_connection(menu, message, on_selection, reader, writer):
+    """Runs one session until the client disconnects"""
+    session = menu.session()
+    try:
+        while True:
+            value = await session.run_async(message, reader, writer)
+            reply = on_selection(value)
+            if reply:
+                writer.write(reply.encode("utf-8"))
+                await writer.drain()
+    except (EOFError, ConnectionError):
+        pass
+    finally:
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except ConnectionError:
+            pass
+
+
+async def start_server(menu, path=None, host=DEFAULT_HOST, port=DEFAULT_PORT, message=None, on_selection=None):
+    """Starts serving menu; a coroutine
+
+    Args:
+        menu (menu.Menu or menu.MenuSession): the menu to serve; its current tab is the starting tab of every
+                                              session
+        path (str or None): path of a Unix socket to listen on; if None, listen on host and port
+        host (str): TCP host, localhost by default
+        port (int): TCP port; 0 picks a free port
+        message (None, str or dict(str: str)): as in Menu.run()
+        on_selection (function or None): called with every selection, returns text for the client or None;
+                                         default_on_selection if None
+
+    Returns:
+        (asyncio.AbstractServer) already serving
+    """
+    if on_selection is None:
+        on_selection = default_on_selection
+    menu.definition.validate_message(message)
+
+    def handler(reader, writer):
+        return _handle_connection(menu, message, on_selection, reader, writer)
+
+    if path is not None:
+        return await asyncio.start_unix_server(handler, path=path)
+    return await asyncio.start_server(handler, host=host, port=port)
+
+
+def serve(menu, path=None, host=DEFAULT_HOST, port=DEFAULT_PORT, message=None, on_selection=None):
+    """Serves menu until interrupted; arguments as in start_server()"""
+
+    async def main():
+        server = await start_server(menu, path, host, port, message, on_selection)
+        async with server:
+            await server.serve_forever()
+
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
+
+
+async def _copy_to_stdout(reader):
+    """Writes everything received from the server to stdout until it closes the connection"""
+    while True:
+        data = await reader.read(65536)
+        if not data:
+            return
+        sys.stdout.write(data.decode("utf-8"))
+        sys.stdout.flush()
+
+
+async def _copy_from_stdin(writer):
+    """Sends lines typed by the user to the server until end of input"""
+    loop = asyncio.get_running_loop()
+    lines = asyncio.Queue()
+
+    def read_lines():
+        """Runs in a daemon thread, so a pending readline does not keep the client alive after disconnection"""
+        try:
+            for line in iter(sys.stdin.readline, ""):
+                loop.call_soon_threadsafe(lines.put_nowait, line)
+            loop.call_soon_threadsafe(lines.put_nowait, "")
+        except RuntimeError:  # event loop closed because the server disconnected
+            pass
+
+    threading.Thread(target=read_lines, daemon=True).start()
+    while True:
+        line = await lines.get()
+        if not line:
+            # half-close, so output the server sends in response to the last lines is still received
+            if writer.can_write_eof():
+                writer.write_eof()
+            return
+        writer.write(line.encode("utf-8"))
+        await writer.drain()
+
+
+async def _connect(path, host, port):
+    """Coroutine for connect()"""
+    if path is not None:
+        reader, writer = await asyncio.open_unix_connection(path)
+    else:
+        reader, writer = await asyncio.open_connection(host, port)
+    sender = asyncio.ensure_future(_copy_from_stdin(writer))
+    await _copy_to_stdout(reader)
+    sender.cancel()
+
+
+def connect(path=None, host=DEFAULT_HOST, port=DEFAULT_PORT):
+    """Local client: connects the terminal to a served menu until either side closes
+
+    Args:
+        path (str or None): path of the server's Unix socket; if None, connect to host and port
+        host (str): TCP host
+        port (int): TCP port
+    """
+    try:
+        asyncio.run(_connect(path, host, port))
+    except KeyboardInterrupt:
+        pass
@@ -3,52 +3,481 @@
 
 """Helper functions for menu.Menu and Tab class to represent individual tabs in menu.Menu"""
 
+from collections import ChainMap
+from collections.abc import Mapping, Sequence
+import threading
 
-def create_tab_objects(config):
-    """Creates Tab objects in list in order of (normalized) menu._config['tabs']
+# keys of Result for each result type, in the order of the dicts this class replaced
+_RESULT_KEYS = {
+    "change_tab": ("type", "new_number"),
+    "return": ("type", "return_value"),
+    "invalid": ("type",),
+    "ambiguous": ("type", "candidates"),
+    "jump": ("type", "new_number", "return_value"),
+}
+
+# inputs that change the page of a tab if the config has a page_size; an item input that is equal to one of
+# these takes precedence over it, and so does an item input they are a prefix of, if prefix_matching is on
+PAGE_NEXT_INPUT = ">"
+PAGE_PREVIOUS_INPUT = "<"
+PAGE_GOTO_PREFIX = "#"
+
+# an input starting with this that is not a valid input searches the current tab for the rest of the input
+SEARCH_PREFIX = "/"
+
+# separates tab_header_input from item input in the qualified inputs of the global jump table
+JUMP_SEPARATOR = ":"
+
+
+class Result(Mapping):
+    """Immutable record of what an input leads to; behaves like a read-only dict.
+
+    Results are shared: there is one 'change_tab' Result per tab for all Tab instances, one 'return' Result
+    per item for all of that item's inputs, and one 'invalid' Result, INVALID. 'ambiguous' Results are only
+    created by tabs with prefix matching, for prefixes of inputs leading to different Results. 'jump' Results
+    are only created with global_jump, one per item of a tab, for inputs selecting it from any other tab.
+
+    Keys:
+        type (str): 'change_tab', 'return', 'invalid', 'ambiguous' or 'jump'
+        new_number (int): number of the tab to change to; only if type is 'change_tab' or 'jump'
+        return_value (str): value to return; only if type is 'return' or 'jump'
+        candidates (tuple of str): sorted inputs the prefix could stand for; only if type is 'ambiguous'
+    """
+
+    __slots__ = ("type", "new_number", "return_value", "candidates")
+    # declared for linters, since __init__() sets them with object.__setattr__()
+    type: str
+    new_number: int
+    return_value: str
+    candidates: tuple
+
+    def __init__(self, type_, new_number=None, return_value=None, candidates=None):
+        """Instantiator for Result class; see class docstring for the keys"""
+        object.__setattr__(self, "type", type_)
+        object.__setattr__(self, "new_number", new_number)
+        object.__setattr__(self, "return_value", return_value)
+        object.__setattr__(self, "candidates", candidates)
+
+    def __setattr__(self, name, value):
+        """Raises AttributeError, since Result is immutable"""
+        raise AttributeError("Result is immutable")
+
+    def __reduce__(self):
+        """Returns how to pickle a Result: by calling Result() again, since __setattr__() refuses to set slots"""
+        return (Result, (self.type, self.new_number, self.return_value, self.candidates))
+
+    def __getitem__(self, key):
+        """Returns value of one of the keys of this Result's type, raising KeyError for any other key"""
+        if key in _RESULT_KEYS[self.type]:
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def __iter__(self):
+        """Iterates over the keys of this Result's type"""
+        return iter(_RESULT_KEYS[self.type])
+
+    def __len__(self):
+        """Returns number of keys of this Result's type"""
+        return len(_RESULT_KEYS[self.type])
+
+    def __repr__(self):
+        """Returns repr of the dict this Result behaves like"""
+        return repr(dict(self))
+
+
+INVALID = Result("invalid")
+
+# value of _TrieNode.unique until the first input is added below the node
+_NO_RESULT = object()
+
+
+class _TrieNode:
+    """Node of a Tab's prefix trie, for one prefix of its inputs
+
+    Attributes:
+        children (dict): next character to _TrieNode
+        result (Result or None): Result of the input equal to this prefix, if there is one
+        unique (Result or None): Result shared by every input starting with this prefix, or None if they lead to
+                                 different Results
+    """
+
+    __slots__ = ("children", "result", "unique")
+
+    def __init__(self):
+        self.children = {}
+        self.result = None
+        self.unique = _NO_RESULT
+
+
+def create_trie(input2result):
+    """Creates prefix trie of a tab's inputs, with every node knowing whether its prefix is unambiguous
+
+    Args:
+        input2result (Mapping): every valid input of a tab to its Result
+
+    Returns:
+        (_TrieNode) root, standing for the empty prefix
+    """
+    root = _TrieNode()
+    for entry, result in input2result.items():
+        node = root
+        for char in entry:
+            child = node.children.get(char, None)
+            if child is None:
+                child = node.children[char] = _TrieNode()
+            node = child
+            if node.unique is _NO_RESULT:
+                node.unique = result
+            elif node.unique is not result:
+                node.unique = None
+        node.result = result
+    return root
+
+
+def _trie_inputs(node, prefix):
+    """Yields every input in the subtree of node, which stands for prefix"""
+    if node.result is not None:
+        yield prefix
+    for char, child in node.children.items():
+        yield from _trie_inputs(child, prefix + char)
+
+
+class LazySequence(Sequence):
+    """Read-only sequence whose elements are built on first access, at most once each, then kept
+
+    Safe to use from several threads: an element is never built twice.
+
+    Args:
+        length (int): number of elements
+        build (function): called with an index, returns the element at that index
+        eager (iterable of int): indices of elements to build right away
+
+    Attributes:
+        n_built (int): number of elements built so far
+    """
+
+    __slots__ = ("_elements", "_build", "_lock", "n_built")
+
+    def __init__(self, length, build, eager=()):
+        """Instantiator for LazySequence class; see class docstring for arguments"""
+        self._elements = [None] * length
+        self._build = build
+        self._lock = threading.Lock()
+        self.n_built = 0
+        for index in eager:
+            self.__getitem__(index)
+
+    def __len__(self):
+        """Returns number of elements, built or not"""
+        return len(self._elements)
+
+    def __getitem__(self, index):
+        """Returns element at index, or list of the elements of a slice, building those not built yet"""
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self._elements)))]
+        element = self._elements[index]
+        if element is None:
+            with self._lock:
+                element = self._elements[index]
+                if element is None:
+                    element = self._elements[index] = self._build(index % len(self._elements))
+                    self.n_built += 1
+        return element
+
+    def __repr__(self):
+        """Returns short description with the number of elements built"""
+        return "<LazySequence: {0} of {1} built>".format(self.n_built, len(self._elements))
+
+    def peek(self, index):
+        """Returns element at index if it has been built, else None, without building it"""
+        return self._elements[index]
+
+
+# value of a key removed in a layer of LayeredDict, and value of a key absent from a layer
+_REMOVED = object()
+_ABSENT = object()
+
+
+class LayeredDict(Mapping):
+    """Read-only dict made of a base dict and layers of changes over it, so that a changed copy costs the change
+
+    Used by Tab.changed() for the tables of tabs whose items are added or removed one at a time: the new Tab's
+    tables are the old one's with a layer on top, and both Tabs stay valid. Layers are merged like a binary
+    counter, a layer into the one below once it is at least as large, and into the base once it is at least half
+    as large as the base, so there are O(log n) layers and every key is copied O(log n) times.
+
+    Lookups go through the layers from the top; iterating costs the size of every layer.
+
+    Args:
+        base (Mapping): the table without changes, e.g. a dict from create_item_table(); it must not change
+    """
+
+    __slots__ = ("_layers", "_len")
+
+    def __init__(self, base, layers=(), length=None):
+        """Instantiator for LayeredDict class; layers and length are only passed by updated()"""
+        self._layers = (base,) + layers
+        self._len = len(base) if length is None else length
+
+    def updated(self, added=None, removed=()):
+        """Returns new LayeredDict with keys removed, then those of added set; this one is unchanged
+
+        Args:
+            added (dict or None): keys to set, to their values
+            removed (iterable): keys to remove, which must be in this LayeredDict
+        """
+        layer = dict.fromkeys(removed, _REMOVED)
+        layer.update(added or {})
+        length = self._len
+        for key, value in layer.items():
+            length += (value is not _REMOVED) - (key in self)
+        layers = self._layers[1:] + (layer,)
+        while len(layers) > 1 and len(layers[-1]) >= len(layers[-2]):
+            merged = dict(layers[-2])
+            merged.update(layers[-1])
+            layers = layers[:-2] + (merged,)
+        base = self._layers[0]
+        if len(layers) == 1 and 2 * len(layers[0]) >= len(base):
+            base = dict(base)
+            for key, value in layers[0].items():
+                if value is _REMOVED:
+                    base.pop(key, None)
+                else:
+                    base[key] = value
+            layers = ()
+        return LayeredDict(base, layers, length)
+
+    def get(self, key, default=None):
+        """Returns value of key, or default if it is not in this LayeredDict"""
+        for layer in reversed(self._layers):
+            value = layer.get(key, _ABSENT)
+            if value is not _ABSENT:
+                return default if value is _REMOVED else value
+        return default
+
+    def __getitem__(self, key):
+        """Returns value of key, raising KeyError if it is not in this LayeredDict"""
+        value = self.get(key, _ABSENT)
+        if value is _ABSENT:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key):
+        """Returns whether key is in this LayeredDict"""
+        return self.get(key, _ABSENT) is not _ABSENT
+
+    def __iter__(self):
+        """Iterates over the keys, from the bottom layer up"""
+        layers = self._layers
+        for i, layer in enumerate(layers):
+            for key, value in layer.items():
+                if value is not _REMOVED and not any(key in upper for upper in layers[i + 1 :]):
+                    yield key
+
+    def __len__(self):
+        """Returns number of keys"""
+        return self._len
+
+    def __repr__(self):
+        """Returns short description with the number of keys and layers"""
+        return "<LayeredDict: {0} key(s) in {1} layer(s)>".format(self._len, len(self._layers))
+
+
+def _layered(table):
+    """Returns table if it is a LayeredDict, else a LayeredDict with table as its base"""
+    return table if isinstance(table, LayeredDict) else LayeredDict(table)
+
+
+def create_selector_table(tab_selectors):
+    """Creates dict of tab selector to 'change_tab' Result, built once per menu and shared by all tabs"""
+    return {selector: Result("change_tab", new_number=i) for i, selector in enumerate(tab_selectors)}
+
+
+def create_jump_table(config):
+    """Creates dict of global jump inputs to 'jump' Results, built once per menu and shared by all tabs
+
+    Every item input of every tab can be given qualified by its tab_header_input, e.g. 'files:o', and also
+    unqualified if no other tab has it. Only for configs with global_jump and more than one tab; the validators
+    module checks that these inputs do not collide.
+
+    Args:
+        config (dict): normalized config
+
+    Returns:
+        (dict) input to Result; empty if the config has no global_jump or a single tab
+    """
+    tabs = config["tabs"]
+    if not config.get("global_jump", False) or len(tabs) < 2:
+        return {}
+    jump_table = {}
+    unqualified = {}
+    for i, tab in enumerate(tabs):
+        for item in tab["items"]:
+            result = Result("jump", new_number=i, return_value=item["item_returns"])
+            for entry in item["item_inputs"]:
+                jump_table[tab["tab_header_input"] + JUMP_SEPARATOR + entry] = result
+                # None marks an input that several tabs have
+                unqualified[entry] = result if entry not in unqualified else None
+    for entry, result in unqualified.items():
+        if result is not None:
+            jump_table[entry] = result
+    return jump_table
+
+
+def create_item_table(items):
+    """Creates dict of item input to the item's return value, for one tab
+
+    This plain form of the table is what compiled artifacts store
+    """
+    item_table = {}
+    for item in items:
+        for entry in item["item_inputs"]:
+            item_table[entry] = item["item_returns"]
+    return item_table
+
+
+def create_tab_objects(config, item_tables=None):
+    """Creates LazySequence of Tab objects in order of (normalized) menu._config['tabs']
+
+    Only the first Tab is built right away; the others are built on first access, so menus with many tabs
+    start up in time depending on the tabs used rather than the tabs defined. A lazily built Tab is identical
+    to one built eagerly; the sequence's n_built attribute counts the Tabs built.
 
     NOTE: tab_selectors is a list (in tab order) of 'header_input' values.
     It is needed because they are valid inputs along with the 'item_inputs' values of each tab
     For a single-tabbed (i.e. no-tabbed) layout, tab_selector == []
+    The list, and the table of 'change_tab' Results built from it, are shared by all tabs, and so is the
+    global jump table
+
+    Args:
+        config (dict): normalized config
+        item_tables (list of dict or None): prebuilt output of create_item_table() for every tab, e.g. from a
+                                            compiled artifact; if None, they are built from the items
     """
     tab_selectors = []
     for tab in config["tabs"]:
         if tab.get("tab_header_input", None):
             tab_selectors.append(tab["tab_header_input"])
-    tabs = []
-    for tab in config["tabs"]:
-        tabs.append(Tab(tab, tab_selectors))
-    return tabs
+    selector_table = create_selector_table(tab_selectors)
+    jump_table = create_jump_table(config)
+    prefix_matching = config.get("prefix_matching", False)
+
+    def build(i):
+        item_table = None if item_tables is None else item_tables[i]
+        return Tab(config["tabs"][i], tab_selectors, item_table, selector_table, prefix_matching, jump_table)
+
+    return LazySequence(len(config["tabs"]), build, eager=(0,))
 
 
 class Tab:
     """Tab class to represent individual tabs in Menu instance
 
+    Attributes:
+        item_table (dict or LayeredDict): this tab's item inputs to return values, output of create_item_table(),
+                                          a LayeredDict over it once items are added or removed
+        input2result (collections.ChainMap): every valid input of this tab to its Result; this tab's item
+                                             inputs are layered over the tab selectors and the global jump
+                                             inputs shared by all tabs
+        prefix_matching (bool): whether an unambiguous prefix of an input is accepted for it
+
     Methods:
         process_input: called from Menu instance, not user
     """
 
-    def __init__(self, tab_dict, tab_selectors):
+    __slots__ = (
+        "head_choice",
+        "head_desc",
+        "head_desc_long",
+        "selectors",
+        "item_table",
+        "input2result",
+        "prefix_matching",
+        "_item_results",
+        "_selector_results",
+        "_jump_results",
+        "_trie",
+    )
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self, tab_dict, tab_selectors, item_table=None, selector_table=None, prefix_matching=False, jump_table=None
+    ):
         """Instantiator for Tab class instances. Called by Menu instance, not by user.
 
         Args:
             tab_dict (dict): passed from menu instantiator's _config
             tab_selectors (list): all values of 'header_input' in _config
+            item_table (dict or None): prebuilt output of create_item_table(); if None, built from tab_dict's items
+            selector_table (dict or None): shared output of create_selector_table(); if None, built from
+                                           tab_selectors
+            prefix_matching (bool): if True, process_input() accepts unambiguous prefixes of inputs
+            jump_table (dict or None): shared output of create_jump_table(), or None for no global jump inputs
         """
         self.head_choice = tab_dict.get("tab_header_input", None)
         self.head_desc = tab_dict.get("tab_header_description", None)
         self.head_desc_long = tab_dict.get("tab_header_long_description", None)
         self.selectors = tab_selectors
-        self._parse_items(tab_dict["items"])
-
-    def _parse_items(self, items):
-        """Creates a dict of possible input values to possible return values"""
-        self.input2result = {}
-        for i, selector in enumerate(self.selectors):
-            self.input2result[selector] = {"type": "change_tab", "new_number": i}
-        for item in items:
-            for entry in item["item_inputs"]:
-                self.input2result[entry] = {"type": "return", "return_value": item["item_returns"]}
+        if selector_table is None:
+            selector_table = create_selector_table(tab_selectors)
+        if item_table is None:
+            item_table = create_item_table(tab_dict["items"])
+        self.item_table = item_table
+        self._selector_results = selector_table
+        self._jump_results = {} if jump_table is None else jump_table
+        self.prefix_matching = prefix_matching
+        # built on the first input that is not an exact match, see _match_prefix()
+        self._trie = None
+        self._parse_items()
+
+    def _parse_items(self):
+        """Creates one Result per item and the layered dict of possible input values to Results"""
+        results = {}
+        self._item_results = {}
+        for entry, return_value in self.item_table.items():
+            result = results.get(return_value, None)
+            if result is None:
+                result = results[return_value] = Result("return", return_value=return_value)
+            self._item_results[entry] = result
+        self.input2result = ChainMap(self._item_results, self._selector_results, self._jump_results)
+
+    def changed(self, added=None, removed=(), tab_selectors=None, selector_table=None):
+        """Returns a new Tab with item inputs added and removed, or with new tab selectors; this one is unchanged
+
+        Costs one LayeredDict layer over this tab's tables if items change, and one Result per new return value,
+        rather than one per input of the tab; the tables are shared if only the selectors change. Called from
+        definition.MenuDefinition
+
+        Args:
+            added (dict or None): new item inputs to return values, output of create_item_table() for new items
+            removed (iterable of str): item inputs to remove
+            tab_selectors (list or None): new list of all tab selectors, or None to keep this tab's
+            selector_table (dict or None): shared output of create_selector_table() for tab_selectors
+        """
+        new_tab = Tab.__new__(Tab)
+        new_tab.head_choice = self.head_choice
+        new_tab.head_desc = self.head_desc
+        new_tab.head_desc_long = self.head_desc_long
+        new_tab.selectors = self.selectors if tab_selectors is None else tab_selectors
+        new_tab._selector_results = self._selector_results if selector_table is None else selector_table
+        new_tab._jump_results = self._jump_results
+        new_tab.prefix_matching = self.prefix_matching
+        new_tab._trie = None
+        if added or removed:
+            results = {}
+            added_results = {}
+            for entry, return_value in (added or {}).items():
+                result = results.get(return_value, None)
+                if result is None:
+                    result = results[return_value] = Result("return", return_value=return_value)
+                added_results[entry] = result
+            item_table = _layered(self.item_table).updated(added, removed)
+            item_results = _layered(self._item_results).updated(added_results, removed)
+        else:
+            item_table = self.item_table
+            item_results = self._item_results
+        new_tab.item_table = item_table
+        new_tab._item_results = item_results
+        new_tab.input2result = ChainMap(item_results, new_tab._selector_results, new_tab._jump_results)
+        return new_tab
 
     def process_input(self, inputstr):
         """Processes input value from menu instance according to this Tab instance
@@ -56,10 +485,34 @@ class Tab:
         Args:
             inputstr (str): menu instance's input
 
+        Exact matches always come first: this tab's items, then tab selectors, then global jump inputs. With prefix
+        matching, any other input is looked up as a prefix, at a cost proportional to its length: it leads to the
+        Result all inputs starting with it share, or, if they do not share one, to an 'ambiguous' Result listing
+        them.
+
         Returns:
-            (dict), with "type" in ['change_tab', 'return' or 'invalid']
+            (Result), a read-only dict with "type" in ['change_tab', 'return', 'invalid', 'ambiguous' or 'jump']
         """
-        if inputstr in self.input2result.keys():
-            return self.input2result[inputstr]
-        else:
-            return {"type": "invalid"}
+        result = self._item_results.get(inputstr, None)
+        if result is None:
+            result = self._selector_results.get(inputstr, None)
+            if result is None:
+                result = self._jump_results.get(inputstr, None)
+            if result is None:
+                if self.prefix_matching and inputstr:
+                    return self._match_prefix(inputstr)
+                return INVALID
+        return result
+
+    def _match_prefix(self, prefix):
+        """Looks up a non-empty input that is not an exact match in the prefix trie, building it if needed"""
+        if self._trie is None:
+            self._trie = create_trie(self.input2result)
+        node = self._trie
+        for char in prefix:
+            node = node.children.get(char, None)
+            if node is None:
+                return INVALID
+        if node.unique is not None:
+            return node.unique
+        return Result("ambiguous", candidates=tuple(sorted(_trie_inputs(node, prefix))))
@@ -13,40 +13,207 @@ There are three possible values of config_layout, determined from the config dic
                       whose values is a list of size one containing a dict with the key 'items'
 3. 'single_without_key': a config with a single tab but lacking the 'tabs' key; the single dict with the key 'items'
                          is at the top level of the config dict, i.e. where 'tabs' would have been
+
+Note on backends:
+There are two interchangeable backends that check each part of the config against its schema
+1. 'compiled' (default): plain-python type and length checks built once at import, in _CompiledSchemas
+2. 'schema': the schema package's Schema.validate, in _ValidSchemas
+Both produce the same error messages; the compiled backend avoids schema's per-call object creation and
+exception machinery, which dominates startup time for configs with many items. The schema package is only
+imported when the 'schema' backend is first used, or SCHEMA_ERRORS first accessed
+
+Note on error records:
+Errors are collected as ErrorRecord(path, kind, detail) tuples, and only formatted into messages when
+InvalidInputError is displayed. The compiled backend never builds the repr of a config or of any part of it
+while validating; when displayed, values are shown with bounded reprs and whole dicts as 'config'. validate_all
+stops after max_errors errors, so the cost of reporting a broken config does not grow with its size.
 """
 
 # pylint: disable=broad-except
 # allowing this ^ because it's validation...
 
 import re
-from collections import Counter
+import warnings
+from collections import Counter, namedtuple
+from itertools import islice
+
+from . import normalizer
+from .tab import JUMP_SEPARATOR, PAGE_GOTO_PREFIX, PAGE_NEXT_INPUT, PAGE_PREVIOUS_INPUT
+
+
+def _schema_errors():
+    """Returns exception classes of the schema package, importing it"""
+    # pylint: disable=import-outside-toplevel  # see note on backends
+    from schema import (
+        SchemaError,
+        SchemaForbiddenKeyError,
+        SchemaMissingKeyError,
+        SchemaUnexpectedTypeError,
+        SchemaWrongKeyError,
+    )
+
+    # SchemaOnlyOneAllowedError is not used
+    return (
+        SchemaError,
+        SchemaForbiddenKeyError,
+        SchemaMissingKeyError,
+        SchemaUnexpectedTypeError,
+        SchemaWrongKeyError,
+    )
+
+
+def __getattr__(name):
+    """Provides SCHEMA_ERRORS, importing the schema package on first access"""
+    if name == "SCHEMA_ERRORS":
+        return _schema_errors()
+    raise AttributeError("module {0!r} has no attribute {1!r}".format(__name__, name))
+
+
+VALIDATION_BACKENDS = ("compiled", "schema")
+
+# default number of errors after which validate_all stops
+DEFAULT_MAX_ERRORS = 100
+
+# values in error messages show at most this many items per container, containers nested this deep,
+# and this many characters for anything else
+_MAX_REPR_ITEMS = 20
+_MAX_REPR_DEPTH = 4
+_MAX_REPR_CHARS = 200
+
+
+def _bounded_repr(value, depth=_MAX_REPR_DEPTH):
+    """Same as repr(value) for small values; larger containers and strings are cut short with '...'"""
+    type_ = type(value)
+    if type_ is dict:
+        if not depth:
+            return "{...}"
+        parts = [
+            "{0}: {1}".format(_bounded_repr(k, depth - 1), _bounded_repr(v, depth - 1))
+            for k, v in islice(value.items(), _MAX_REPR_ITEMS)
+        ]
+        opening, closing = "{", "}"
+    elif type_ in (list, tuple):
+        opening, closing = ("[", "]") if type_ is list else ("(", ",)" if len(value) == 1 else ")")
+        if not depth:
+            return opening + "..." + closing[-1]
+        parts = [_bounded_repr(v, depth - 1) for v in islice(value, _MAX_REPR_ITEMS)]
+    else:
+        text = repr(value)
+        if len(text) > _MAX_REPR_CHARS:
+            return text[: _MAX_REPR_CHARS - 3] + "..."
+        return text
+    if len(value) > _MAX_REPR_ITEMS:
+        parts.append("...")
+    return opening + ", ".join(parts) + closing
+
+
+class _Repr:  # pylint: disable=R0903
+    """Part of an error detail shown as the bounded repr of a value, computed only when displayed"""
+
+    __slots__ = ("value",)
+
+    def __init__(self, value):
+        self.value = value
+
+    def __str__(self):
+        return _bounded_repr(self.value)
+
+
+def _format_path(path):
+    """Format path of ErrorRecord, e.g. ('tab', 0, 'item', 3) -> 'tab#0,item#3'"""
+    parts = []
+    for element in path:
+        if isinstance(element, int):
+            parts[-1] = "{0}#{1}".format(parts[-1], element)
+        else:
+            parts.append(element)
+    return ",".join(parts)
+
+
+class ErrorRecord(namedtuple("ErrorRecord", ["path", "kind", "detail"])):
+    """One validation error, formatted into a message only by str()
+
+    Attributes:
+        path (tuple): where in the config the error is, as names each optionally followed by a number,
+                      e.g. ('tab', 0, 'item', 3); empty if it concerns the config as a whole
+        kind (str): 'schema' if a part of the config does not match its schema, 'iteration' if a part cannot be
+                    iterated over, 'overlap' if inputs or return values are repeated
+        detail (tuple): parts of the message, either str or values shown by their bounded repr
+    """
+
+    __slots__ = ()
+
+    def __str__(self):
+        """Returns the message of the error, after its path if it is a schema error"""
+        message = "".join(str(part) for part in self.detail)
+        if self.kind == "schema" and self.path:
+            return "{0}: {1}".format(_format_path(self.path), message)
+        return message
+
+
+class _ErrorLimitReached(Exception):
+    """Raised by _ErrorRecords when it holds as many errors as allowed"""
+
 
-from schema import And, Forbidden, Optional, Or, Schema
-from schema import (
-    SchemaError,
-    SchemaForbiddenKeyError,
-    SchemaMissingKeyError,
-    SchemaUnexpectedTypeError,
-    SchemaWrongKeyError,
-)
+class _ErrorRecords(list):
+    """List of ErrorRecord that raises _ErrorLimitReached once max_errors (None for no limit) are appended"""
 
-# SchemaOnlyOneAllowedError is not used
+    def __init__(self, max_errors=None):
+        super().__init__()
+        self.max_errors = max_errors
 
-SCHEMA_ERRORS = (
-    SchemaError,
-    SchemaForbiddenKeyError,
-    SchemaMissingKeyError,
-    SchemaUnexpectedTypeError,
-    SchemaWrongKeyError,
-)
+    def append(self, record):
+        super().append(record)
+        if self.max_errors is not None and len(self) >= self.max_errors:
+            raise _ErrorLimitReached
 
 
 class InvalidInputError(Exception):
     """Catchall exception for invalid input.
 
-    Prints list of all errors to stderr.
+    Prints list of all errors to stderr; the message is only formatted then.
+
+    Args:
+        errors (list of ErrorRecord, ErrorRecord or str): errors found, or a message already formatted,
+                                                        which str() then returns unchanged
+        complete (bool): False if validation stopped before the whole config was checked
+
+    Attributes:
+        errors (list of ErrorRecord): empty if a message was given
+        message (str or None): the message given, if any
+        complete (bool)
     """
 
+    def __init__(self, errors=(), complete=True):
+        """Instantiator for InvalidInputError class; see class docstring for arguments"""
+        self.message = None
+        if isinstance(errors, str):
+            self.message = errors
+            errors = ()
+        elif isinstance(errors, ErrorRecord):
+            errors = (errors,)
+        self.errors = list(errors)
+        self.complete = complete
+        if self.message is None:
+            super().__init__(self.errors, complete)
+        else:
+            super().__init__(self.message)
+
+    def __str__(self):
+        """Returns the message given, or else numbered list of the errors, noting if they may not be all of them"""
+        if self.message is not None:
+            return self.message
+        printed_message = ["", "Errors:"]
+        for i, error in enumerate(self.errors):
+            printed_message.append("{0}. {1}".format(i + 1, error))
+        if not self.complete:
+            printed_message.append("Stopped after {0} error(s); there may be more.".format(len(self.errors)))
+        return "\n".join(printed_message)
+
+
+class PrefixMatchingWarning(UserWarning):
+    """Warning that prefix matching makes some inputs of a valid config unreachable."""
+
 
 class _ValidSchemas:  # pylint: disable=R0903
 
@@ -56,6 +223,7 @@ class _ValidSchemas:  # pylint: disable=R0903
     """
 
     def __init__(self):
+        from schema import And, Forbidden, Optional, Or, Schema  # pylint: disable=import-outside-toplevel
 
         # outermost keys of config if it has a 'tabs' outermost key, i.e. if it is of layout
         # multiple or single_with_key
@@ -63,6 +231,9 @@ class _ValidSchemas:  # pylint: disable=R0903
             {
                 Optional("case_sensitive"): bool,
                 Optional("screen_width"): And(int, lambda x: x > 0),
+                Optional("page_size"): And(int, lambda x: x > 0),
+                Optional("prefix_matching"): bool,
+                Optional("global_jump"): bool,
                 "tabs": And(Or(list, tuple), lambda x: len(x) > 0),
             }
         )
@@ -72,6 +243,9 @@ class _ValidSchemas:  # pylint: disable=R0903
             {
                 Optional("case_sensitive"): bool,
                 Optional("screen_width"): And(int, lambda x: x > 0),
+                Optional("page_size"): And(int, lambda x: x > 0),
+                Optional("prefix_matching"): bool,
+                Optional("global_jump"): bool,
                 "items": And(Or(list, tuple), lambda x: len(x) > 0),
             }
         )
@@ -110,6 +284,213 @@ class _ValidSchemas:  # pylint: disable=R0903
         self.entry_schema = Schema(lambda x: x is not None and len(str(x)) > 0)
 
 
+# COMPILED BACKEND #
+# Each check below mirrors one schema in _ValidSchemas. Value checks return None if valid, otherwise the
+# detail parts of the inner part of the message the schema package would have produced; dict checks return
+# the detail parts of the full message including the schema exception class, as _validate_schema_part would
+# have formatted it and then shortened it with _shorten_long_schema_error_message.
+
+
+def _check_callable(predicate, value):
+    """Mirror schema's handling of a lambda: returns None or detail parts"""
+    try:
+        if predicate(value):
+            return None
+    except Exception as e:  # noqa
+        return ("<lambda>(", _Repr(value), ") raised ", _Repr(e))
+    return ("<lambda>(", _Repr(value), ") should evaluate to True")
+
+
+def _check_bool(value):
+    """Mirror of schema bool"""
+    if isinstance(value, bool):
+        return None
+    return (_Repr(value), " should be instance of 'bool'")
+
+
+def _check_positive_int(value):
+    """Mirror of schema And(int, lambda x: x > 0)"""
+    if not isinstance(value, int) or isinstance(value, bool):
+        return (_Repr(value), " should be instance of 'int'")
+    return _check_callable(lambda x: x > 0, value)
+
+
+def _check_nonempty_sequence(value):
+    """Mirror of schema And(Or(list, tuple), lambda x: len(x) > 0)"""
+    if not isinstance(value, (list, tuple)):
+        value_repr = _Repr(value)
+        return (
+            "Or(<class 'list'>, <class 'tuple'>) did not validate ",
+            value_repr,
+            " ",
+            value_repr,
+            " should be instance of 'list' ",
+            value_repr,
+            " should be instance of 'tuple'",
+        )
+    if value:
+        return None
+    return ("<lambda>(", _Repr(value), ") should evaluate to True")
+
+
+def _check_not_none_nonempty(value):
+    """Mirror of schema lambda x: x is not None and len(str(x)) > 0"""
+    if isinstance(value, str):
+        if value:
+            return None
+        return ("<lambda>('') should evaluate to True",)
+    return _check_callable(lambda x: x is not None and len(str(x)) > 0, value)
+
+
+def _check_none_or_nonempty(value):
+    """Mirror of schema lambda x: x is None or len(str(x)) > 0"""
+    if value is None or (isinstance(value, str) and value):
+        return None
+    return _check_callable(lambda x: x is None or len(str(x)) > 0, value)
+
+
+def _compile_dict_check(required, optional=None, forbidden=()):
+    """Build a function that checks a dict the way schema.Schema(dict) would, in the same order.
+
+    Like the schema package, the first failing value is reported, then missing keys, then wrong keys;
+    keys are examined in data order except that dict values are examined last.
+
+    Args:
+        required (dict of str: function): value checks for required keys
+        optional (dict of str: function): value checks for optional keys
+        forbidden (iterable of str): keys that must not be present
+
+    Returns:
+        (function) taking the data to check and returning None or the detail parts of an error message
+    """
+    checks = dict(optional or {})
+    checks.update(required)
+    forbidden = frozenset(forbidden)
+    required_keys = frozenset(required)
+
+    def check(data):
+        """Compiled dict check; returns None or detail parts"""
+        if not isinstance(data, dict):
+            return ("schema.SchemaUnexpectedTypeError: ", _Repr(data), " should be instance of 'dict'")
+        dict_values = []
+        for key, value in data.items():
+            if isinstance(value, dict):
+                dict_values.append((key, value))
+                continue
+            error = _check_value(key, value, checks, forbidden)
+            if error is not None:
+                return error
+        for key, value in dict_values:
+            error = _check_value(key, value, checks, forbidden)
+            if error is not None:
+                return error
+        return _check_keys(data, required_keys, checks)
+
+    return check
+
+
+def _check_value(key, value, checks, forbidden):
+    """Check one key/value pair of a dict; returns None or detail parts, as a check built by _compile_dict_check()"""
+    if key in forbidden:
+        return ("schema.SchemaForbiddenKeyError: Forbidden key encountered: ", _Repr(key), " in config")
+    value_check = checks.get(key, None)
+    if value_check is None:
+        return None
+    error = value_check(value)
+    if error is None:
+        return None
+    return ("schema.SchemaError: Key '{0}' error: ".format(key),) + error
+
+
+def _check_keys(data, required_keys, checks):
+    """Check that a dict has every required key and no key without a check, after its values were checked
+
+    Returns:
+        None or the detail parts of an error message, as a check built by _compile_dict_check()
+    """
+    if not required_keys.issubset(data):
+        missing = sorted(repr(k) for k in required_keys if k not in data)
+        return (
+            "schema.SchemaMissingKeyError: Missing key{0}: {1}".format(
+                "s" if len(missing) > 1 else "", ", ".join(missing)
+            ),
+        )
+    if len(data) > len(required_keys) and not checks.keys() >= data.keys():
+        wrong = sorted(repr(k) for k in data if k not in checks)
+        return (
+            "schema.SchemaWrongKeyError: Wrong key{0} {1} in config".format(
+                "s" if len(wrong) > 1 else "", ", ".join(wrong)
+            ),
+        )
+    return None
+
+
+def _check_entry(entry):
+    """Mirror of _ValidSchemas.entry_schema"""
+    error = _check_not_none_nonempty(entry)
+    if error is None:
+        return None
+    return ("schema.SchemaError: ",) + error
+
+
+class _CompiledSchemas:  # pylint: disable=R0903
+    """Compiled equivalents of _ValidSchemas; each attribute is a function returning None or detail parts.
+
+    Instantiated once, as _COMPILED_SCHEMAS
+    """
+
+    def __init__(self):
+
+        self.outer_schema_multiple_or_single_with_key = _compile_dict_check(
+            {"tabs": _check_nonempty_sequence},
+            optional={
+                "case_sensitive": _check_bool,
+                "screen_width": _check_positive_int,
+                "page_size": _check_positive_int,
+                "prefix_matching": _check_bool,
+                "global_jump": _check_bool,
+            },
+        )
+
+        self.outer_schema_single_without_key = _compile_dict_check(
+            {"items": _check_nonempty_sequence},
+            optional={
+                "case_sensitive": _check_bool,
+                "screen_width": _check_positive_int,
+                "page_size": _check_positive_int,
+                "prefix_matching": _check_bool,
+                "global_jump": _check_bool,
+            },
+        )
+
+        self.tab_schema_multiple = _compile_dict_check(
+            {"tab_header_input": _check_not_none_nonempty, "items": _check_nonempty_sequence},
+            optional={
+                "tab_header_description": _check_none_or_nonempty,
+                "tab_header_long_description": _check_none_or_nonempty,
+            },
+        )
+
+        self.tab_schema_single_with_key = _compile_dict_check(
+            {"items": _check_nonempty_sequence},
+            forbidden=("tab_header_input", "tab_header_description", "tab_header_long_description"),
+        )
+
+        self.item_schema = _compile_dict_check(
+            {
+                "item_choice_displayed": _check_not_none_nonempty,
+                "item_inputs": _check_nonempty_sequence,
+                "item_returns": _check_not_none_nonempty,
+            },
+            optional={"item_description": _check_none_or_nonempty},
+        )
+
+        self.entry_schema = _check_entry
+
+
+_COMPILED_SCHEMAS = _CompiledSchemas()
+
+
 def _extract_class(class_repr):
     """Prettify class specifications in error messages
 
@@ -126,28 +507,31 @@ def _extract_class(class_repr):
     return class_repr.replace("<class '", "").replace("'>", "")
 
 
-def _validate_schema_part(error_messages, schema_, to_validate, prefix=None):
+def _validate_schema_part(error_messages, schema_, to_validate, path=()):
     """Validate that a section of the config follows schema
 
     Args:
-        error_messages (list of str): list of all error messages produced by the validator to date
-        schema_ (schema.Schema): instance defined in _ValidSchemas() class in this module
+        error_messages (list of ErrorRecord): list of all errors produced by the validator to date
+        schema_ (schema.Schema or function): instance defined in _ValidSchemas() class in this module, or
+                                             function defined in _CompiledSchemas() class
         to_validate (dict or str): config or subsection of config to validate
-        prefix (str): prefix to be added to error message, to make it clear exactly where in the
-                      config dict the error occurred
+        path (tuple): where in the config dict to_validate is, see ErrorRecord
 
     Returns:
-        (list of str) error_messages, extended if applicable
+        (list of ErrorRecord) error_messages, extended if applicable
     """
-    try:
-        _ = schema_.validate(to_validate)
-    except SCHEMA_ERRORS as e:  # noqa
-        error_type = _extract_class(str(e.__class__)) + ": "
-        error_description = str(e).replace("\n", " ")
-        if not prefix:
-            prefix = ""
-        error_message = prefix + error_type + error_description
-        error_messages.append(error_message)
+    if not callable(schema_):  # schema.Schema instance
+        try:
+            _ = schema_.validate(to_validate)
+            detail = None
+        except _schema_errors() as e:  # noqa
+            error_type = _extract_class(str(e.__class__)) + ": "
+            error_description = str(e).replace("\n", " ")
+            detail = (_shorten_long_schema_error_message(error_type + error_description),)
+    else:
+        detail = schema_(to_validate)
+    if detail is not None:
+        error_messages.append(ErrorRecord(path, "schema", detail))
     return error_messages
 
 
@@ -183,16 +567,18 @@ def _validate_schema_multiple(error_messages, config, valid_schemas):
     try:
         level = "tabs"
         for tab_num, tab in enumerate(config["tabs"]):
-            prefix = "tab#{0}: ".format(tab_num)
-            error_messages = _validate_schema_part(error_messages, valid_schemas.tab_schema_multiple, tab, prefix)
+            path = ("tab", tab_num)
+            error_messages = _validate_schema_part(error_messages, valid_schemas.tab_schema_multiple, tab, path)
             level = "items"
             for item_num, item in enumerate(tab["items"]):
-                prefix = "tab#{0},item#{1}: ".format(tab_num, item_num)
-                error_messages = _validate_schema_part(error_messages, valid_schemas.item_schema, item, prefix)
+                path = ("tab", tab_num, "item", item_num)
+                error_messages = _validate_schema_part(error_messages, valid_schemas.item_schema, item, path)
                 level = "item_inputs"
                 for entry_num, entry in enumerate(item["item_inputs"]):
-                    prefix = "tab#{0},item#{1},valid_entry#{2}: ".format(tab_num, item_num, entry_num)
-                    error_messages = _validate_schema_part(error_messages, valid_schemas.entry_schema, entry, prefix)
+                    path = ("tab", tab_num, "item", item_num, "valid_entry", entry_num)
+                    error_messages = _validate_schema_part(error_messages, valid_schemas.entry_schema, entry, path)
+    except _ErrorLimitReached:
+        raise
     except Exception as e:  # noqa
         error_messages = _catch_iteration_error(error_messages, e, level)
     return error_messages
@@ -203,20 +589,22 @@ def _validate_schema_single_with_key(error_messages, config, valid_schemas):
     error_messages = _validate_schema_part(
         error_messages, valid_schemas.outer_schema_multiple_or_single_with_key, config
     )
-    prefix = "sole tab: "
+    path = ("sole tab",)
     try:
         level = "tabs"
         error_messages = _validate_schema_part(
-            error_messages, valid_schemas.tab_schema_single_with_key, config["tabs"][0], prefix
+            error_messages, valid_schemas.tab_schema_single_with_key, config["tabs"][0], path
         )
         level = "items"
         for item_num, item in enumerate(config["tabs"][0]["items"]):
-            prefix = "sole tab,item#{0}: ".format(item_num)
-            error_messages = _validate_schema_part(error_messages, valid_schemas.item_schema, item, prefix)
+            path = ("sole tab", "item", item_num)
+            error_messages = _validate_schema_part(error_messages, valid_schemas.item_schema, item, path)
             level = "item_inputs"
             for entry_num, entry in enumerate(item["item_inputs"]):
-                prefix = "sole tab,item#{0},valid_entry#{1}: ".format(item_num, entry_num)
-                error_messages = _validate_schema_part(error_messages, valid_schemas.entry_schema, entry, prefix)
+                path = ("sole tab", "item", item_num, "valid_entry", entry_num)
+                error_messages = _validate_schema_part(error_messages, valid_schemas.entry_schema, entry, path)
+    except _ErrorLimitReached:
+        raise
     except Exception as e:  # noqa
         error_messages = _catch_iteration_error(error_messages, e, level)
     return error_messages
@@ -228,12 +616,14 @@ def _validate_schema_single_without_key(error_messages, config, valid_schemas):
     try:
         level = "items"
         for item_num, item in enumerate(config["items"]):
-            prefix = "item#{0}: ".format(item_num)
-            error_messages = _validate_schema_part(error_messages, valid_schemas.item_schema, item, prefix)
+            path = ("item", item_num)
+            error_messages = _validate_schema_part(error_messages, valid_schemas.item_schema, item, path)
             level = "item_inputs"
             for entry_num, entry in enumerate(item["item_inputs"]):
-                prefix = "item#{0},valid_entry#{1}: ".format(item_num, entry_num)
-                error_messages = _validate_schema_part(error_messages, valid_schemas.entry_schema, entry, prefix)
+                path = ("item", item_num, "valid_entry", entry_num)
+                error_messages = _validate_schema_part(error_messages, valid_schemas.entry_schema, entry, path)
+    except _ErrorLimitReached:
+        raise
     except Exception as e:  # noqa
         error_messages = _catch_iteration_error(error_messages, e, level)
     return error_messages
@@ -243,14 +633,28 @@ def _catch_iteration_error(error_messages, e, level):
     """Stop introspection on an iterable when it throws an exception, add it to error_messages"""
     error_type = _extract_class(str(e.__class__)) + ": "
     error_description = str(e).replace("\n", " ")
-    error_message = "WHILE ITERATING OVER {0}: {1}{2}. No further introspection possible.".format(
-        level, error_type, error_description
+    error_messages.append(
+        ErrorRecord(
+            (level,),
+            "iteration",
+            ("WHILE ITERATING OVER {0}: {1}{2}. No further introspection possible.".format(
+                level, error_type, error_description
+            ),),
+        )
     )
-    error_messages.append(error_message)
     return error_messages
 
 
-def _validate_schema(error_messages, config):
+def _get_valid_schemas(backend):
+    """Return _COMPILED_SCHEMAS or a new _ValidSchemas instance depending on backend"""
+    if backend == "compiled":
+        return _COMPILED_SCHEMAS
+    if backend == "schema":
+        return _ValidSchemas()
+    raise ValueError("backend must be one of {0}, not {1!r}".format(", ".join(VALIDATION_BACKENDS), backend))
+
+
+def _validate_schema(error_messages, config, backend="compiled"):
     """Validate that config has the expected schema.
 
     Examples of valid schemas can be seen in the examples/ folder of the git repo, or in the docs.
@@ -258,14 +662,15 @@ def _validate_schema(error_messages, config):
     tab that skips the redundant 'tabs' key
 
     Args:
-        error_messages: list of str passed around
+        error_messages: list of ErrorRecord passed around
         config: the dict
+        backend (str): one of VALIDATION_BACKENDS
 
     Returns:
-        error messages list of str
+        error messages list of ErrorRecord
     """
+    valid_schemas = _get_valid_schemas(backend)
     config_layout = _determine_config_layout(config)
-    valid_schemas = _ValidSchemas()
     if config_layout == "multiple":
         error_messages = _validate_schema_multiple(error_messages, config, valid_schemas)
     elif config_layout == "single_with_key":
@@ -277,9 +682,10 @@ def _validate_schema(error_messages, config):
     return error_messages
 
 
-def _config_tabs(config):
+def _config_tabs(config, config_layout=None):
     """Return 'tabs' list unless single_without_key, in which case manufacture one"""
-    config_layout = _determine_config_layout(config)
+    if config_layout is None:
+        config_layout = _determine_config_layout(config)
     if config_layout == "single_without_key":
         return [{"items": config["items"]}]
     return config["tabs"]
@@ -292,98 +698,565 @@ def _count_for_overlap(items_):
     return multiples
 
 
-def _validate_no_return_value_overlap(error_messages, config):
-    """Validate that all return values in every tab are unique.
+def _sorted_multiples(counts, first_positions):
+    """Return counts of repeated values as _count_for_overlap() would: most common first, ties in order of appearance
 
-    Checks all tabs, so can result in long error message
-    Case insensitivity does not affect return values
+    Args:
+        counts (dict): repeated value: number of times it appears
+        first_positions (function): returns the position of the first appearance of a value
     """
-    tabs = _config_tabs(config)
-    for tab_num, tab in enumerate(tabs):
-        returns = []
-        if "items" in tab.keys():  # so as not to raise premature KeyError in invalid schema
-            for item in tab["items"]:
-                value = item.get("item_returns", None)
-                if value:  # so as not to raise premature KeyError in invalid schema
-                    returns.append(value)
-        multiples = _count_for_overlap(returns)
-        if multiples:
-            if "tab_header_input" in tab.keys():
-                error_messages.append("In tab#{0}, there are repeated return values: {1}.".format(tab_num, multiples))
-            else:
-                error_messages.append("In the single tab, there are repeated return values: {0}".format(multiples))
-    return error_messages
+    return sorted(counts.items(), key=lambda value_count: (-value_count[1], first_positions(value_count[0])))
 
 
-def _validate_no_input_value_overlap(error_messages, config):  # noqa:C901
-    """Validate that the potential inputs on each tab are unambiguous.
+def _overlap_record(tab_num, in_multiple, multiples, kind_of_value, case_sensitive):
+    """Create ErrorRecord for repeated input values (kind_of_value 'input') or return values ('return')
 
-    In other words, validates that any entry will either lead
-    to another tab OR to returning a unique value OR the current tab's input value (this could have gone either
-    way, I chose not to accept duplicate tab name and input in that tab for the sake of consistency rather than
-    freeing up one possible input in a sort of weird edge case)
+    in_multiple is whether the message names the tab, or refers to the single tab
+    """
+    if kind_of_value == "return":
+        if in_multiple:
+            detail = ("In tab#{0}, there are repeated return values: ".format(tab_num), _Repr(multiples), ".")
+            return ErrorRecord(("tab", tab_num), "overlap", detail)
+        return ErrorRecord((), "overlap", ("In the single tab, there are repeated return values: ", _Repr(multiples)))
+    if not case_sensitive:
+        case_sensitive_message = (
+            " Note case sensitive is false, so values have been changed to lower-case, which can create overlap"
+        )
+    else:
+        case_sensitive_message = ""
+    if in_multiple:
+        detail = (
+            "In tab#{0}, there are repeated input values including tab selectors: ".format(tab_num),
+            _Repr(multiples),
+            "." + case_sensitive_message,
+        )
+        return ErrorRecord(("tab", tab_num), "overlap", detail)
+    detail = ("In single tab, there are repeated input values: ", _Repr(multiples), "." + case_sensitive_message)
+    return ErrorRecord((), "overlap", detail)
 
-    Case insensitivity casts all inputs to lowercase, which can create overlap
+
+def _validate_no_overlap(error_messages, config):  # noqa:C901
+    """Validate that inputs and return values are unambiguous, in one pass over the config.
+
+    1. Inputs: on each tab, any entry must either lead to another tab OR to returning a unique value OR the
+       current tab's input value (this could have gone either way, I chose not to accept duplicate tab name and
+       input in that tab for the sake of consistency rather than freeing up one possible input in a sort of weird
+       edge case). Case insensitivity casts all inputs to lowercase, which can create overlap
+    2. Return values: all return values in every tab are unique. Case insensitivity does not affect return values
+    3. With global_jump, every qualified input (tab_header_input:item_input) is unambiguous across tabs:
+       a qualified input must not be made by two different tabs, e.g. tab 'a' with input 'b:c' and tab 'a:b' with
+       input 'c', and must not also be an input of a tab, which would always take precedence over it. Unqualified
+       inputs need no rule: if several tabs have one, it is simply not a global jump input
+
+    Checks all tabs, so can result in long error message; errors of each rule come after those of the one above.
+    The tab selectors are counted once, and each tab only counts its own entries, using dicts of the values seen,
+    so the cost is proportional to the number of entries; a Counter is only built for tabs lacking 'items'.
+
+    Returns:
+        (list of ErrorRecord) error_messages, extended if applicable
     """
     case_sensitive = config.get("case_sensitive", False)
     config_layout = _determine_config_layout(config)
-    tabs = _config_tabs(config)
-    starting_choices = []
-    # get tab header choices if multiple tabs
+    tabs = _config_tabs(config, config_layout)
+    global_jump = config.get("global_jump", False) and config_layout == "multiple"
+    # get tab header choices if multiple tabs, with position of their first appearance and counts of repeats
+    raw_selectors = []
+    selector_positions = {}
+    selector_counts = {}
     if config_layout == "multiple":
         for tab in tabs:
             if tab.get("tab_header_input", None):  # so as not to raise premature KeyError for invalid schema
-                starting_choices.append(tab["tab_header_input"])
+                raw_selectors.append(tab["tab_header_input"])
+                selector = tab["tab_header_input"] if case_sensitive else str(tab["tab_header_input"]).lower()
+                if selector in selector_positions:
+                    selector_counts[selector] = selector_counts.get(selector, 1) + 1
+                else:
+                    selector_positions[selector] = len(raw_selectors) - 1
+    input_errors = []
+    return_errors = []
+    qualified = []
+    jump_inputs = set()
+    multiple = config_layout == "multiple"
     for tab_num, tab in enumerate(tabs):
-        choices = starting_choices[:]
-        if "items" in tab.keys():  # so as not to raise premature KeyError for invalid schema
-            for item in tab["items"]:
-                if "item_inputs" in item.keys():  # so as not to raise premature KeyError for invalid schema
-                    for entry in item["item_inputs"]:
-                        choices.append(entry)
-            if not case_sensitive:
-                choices = [str(choice).lower() for choice in choices]
-        multiples = _count_for_overlap(choices)
+        header = None
+        if global_jump and tab.get("tab_header_input", None):
+            header = str(tab["tab_header_input"]) if case_sensitive else str(tab["tab_header_input"]).lower()
+            jump_inputs.add(header)
+        if "items" not in tab.keys():  # so as not to raise premature KeyError for invalid schema
+            # choices are then not lower-cased
+            multiples = _count_for_overlap(raw_selectors)
+            if multiples:
+                input_errors.append(_overlap_record(tab_num, multiple, multiples, "input", case_sensitive))
+            continue
+        input_counts = dict(selector_counts)
+        input_positions = {}
+        position = len(raw_selectors)
+        return_counts = {}
+        return_positions = {}
+        for item in tab["items"]:
+            if "item_inputs" in item.keys():  # so as not to raise premature KeyError for invalid schema
+                for entry in item["item_inputs"]:
+                    choice = entry if case_sensitive else str(entry).lower()
+                    if choice in selector_positions or choice in input_positions:
+                        input_counts[choice] = input_counts.get(choice, 1) + 1
+                    else:
+                        input_positions[choice] = position
+                    position += 1
+                    if header is not None:
+                        jump_input = str(entry) if case_sensitive else choice
+                        jump_inputs.add(jump_input)
+                        qualified.append(header + JUMP_SEPARATOR + jump_input)
+            value = item.get("item_returns", None)
+            if value:  # so as not to raise premature KeyError in invalid schema
+                if value in return_positions:
+                    return_counts[value] = return_counts.get(value, 1) + 1
+                else:
+                    return_positions[value] = len(return_positions)
+        if input_counts:
+            multiples = _sorted_multiples(
+                input_counts, lambda choice: selector_positions.get(choice, input_positions.get(choice, None))
+            )
+            input_errors.append(_overlap_record(tab_num, multiple, multiples, "input", case_sensitive))
+        if return_counts:
+            multiples = _sorted_multiples(return_counts, return_positions.get)
+            in_multiple = "tab_header_input" in tab.keys()
+            return_errors.append(_overlap_record(tab_num, in_multiple, multiples, "return", case_sensitive))
+    for error in input_errors + return_errors:
+        error_messages.append(error)
+    if global_jump:
+        multiples = _count_for_overlap(qualified)
         if multiples:
-            if not case_sensitive:
-                case_sensitive_message = (
-                    " Note case sensitive is false, so values have been changed to lower-case, "
-                    "which can create overlap"
-                )
-            else:
-                case_sensitive_message = ""
-            if config_layout == "multiple":
-                error_messages.append(
-                    "In tab#{0}, there are repeated input values including tab selectors: {1}.{2}".format(
-                        tab_num, multiples, case_sensitive_message
-                    )
-                )
-            else:
-                error_messages.append(
-                    "In single tab, there are repeated input values: {0}.{1}".format(
-                        multiples, case_sensitive_message
-                    )
-                )
+            detail = ("With global_jump, there are repeated qualified inputs: ", _Repr(multiples), ".")
+            error_messages.append(ErrorRecord((), "overlap", detail))
+        overlap = sorted(set(qualified) & jump_inputs)
+        if overlap:
+            detail = (
+                "With global_jump, these qualified inputs are also inputs of tabs or tab selectors: ",
+                _Repr(overlap),
+                ".",
+            )
+            error_messages.append(ErrorRecord((), "overlap", detail))
     return error_messages
 
 
-def _shorten_long_schema_error_messages(error_messages):
-    """Remove entire config string from schema package error message."""
-    for i, message in enumerate(error_messages[:]):
-        if re.search("in {.+}$", message):
-            error_messages[i] = re.sub(r"in \{.+\}$", "in config", message)
-    return error_messages
+def _warn_unreachable_with_prefix_matching(config):
+    """Warn about page navigation inputs that prefix matching makes unreachable
+
+    Exact matches always come first, so prefix matching can only hide an input that is not in the tab's
+    dispatch table, i.e. a page navigation input: '>', '<' or '#<number>' leads to an item or tab instead if
+    it is the prefix of one of their inputs. Only applies if both prefix_matching and page_size are set.
+    Called on a config that has passed validation.
+    """
+    if not config.get("prefix_matching", False) or not config.get("page_size", None):
+        return
+    page_inputs = (PAGE_NEXT_INPUT, PAGE_PREVIOUS_INPUT)
+    goto_pattern = re.compile(re.escape(PAGE_GOTO_PREFIX) + "[0-9]")
+    case_sensitive = config.get("case_sensitive", False)
+    tabs = _config_tabs(config)
+    selectors = [tab["tab_header_input"] for tab in tabs if tab.get("tab_header_input", None)]
+    for tab_num, tab in enumerate(tabs):
+        choices = selectors + [entry for item in tab["items"] for entry in item["item_inputs"]]
+        choices = {str(choice) if case_sensitive else str(choice).lower() for choice in choices}
+        shadowing = sorted(
+            choice
+            for choice in choices
+            if choice not in page_inputs
+            and (choice.startswith(page_inputs) or goto_pattern.match(choice))
+        )
+        if shadowing:
+            warnings.warn(
+                "In tab#{0}, prefix matching makes page navigation inputs unreachable, because they are "
+                "prefixes of these inputs: {1}".format(tab_num, shadowing),
+                PrefixMatchingWarning,
+                stacklevel=3,
+            )
+
+
+def _shorten_long_schema_error_message(message):
+    """Remove entire config string from schema package error message.
+
+    Same as replacing regex 'in {.+}$' with 'in config', without running a regex over a possibly huge string
+    """
+    start = message.find("in {")
+    if start == -1 or len(message) - start < 6 or not message.endswith("}"):
+        return message
+    return message[:start] + "in config"
+
+
+def _check_max_errors(max_errors):
+    """Raise ValueError unless max_errors is a positive int or None"""
+    if max_errors is not None and (not isinstance(max_errors, int) or isinstance(max_errors, bool) or max_errors < 1):
+        raise ValueError("max_errors must be a positive int or None, not {0!r}".format(max_errors))
+
+
+def _is_valid(schema_, to_validate):
+    """Same as _validate_schema_part() adding no error, without creating any error message"""
+    if not callable(schema_):  # schema.Schema instance
+        try:
+            _ = schema_.validate(to_validate)
+        except _schema_errors():
+            return False
+        return True
+    return schema_(to_validate) is None
+
 
+def _normalize_if_valid(config, valid_schemas, normalized_tabs=None):  # noqa:C901
+    """Normalize config in the same traversal as checking that it is valid; called from validate_and_normalize()
 
-def validate_all(config):
-    """Run above non-underscored functions on input"""
-    error_messages = []
-    error_messages = _validate_schema(error_messages, config)
-    error_messages = _validate_no_input_value_overlap(error_messages, config)
-    error_messages = _validate_no_return_value_overlap(error_messages, config)
+    Checks the same rules as _validate_schema() and _validate_no_overlap(), but stops at the first error
+    without describing it, because validate_all() is then called to do so. The items of tabs in normalized_tabs
+    are neither checked nor normalized, unless global_jump is set, since its rules span the items of every tab.
+
+    Returns:
+        (dict) new normalized config, or None if config is invalid
+    """
+    config_layout = _determine_config_layout(config)
+    if config_layout == "single_without_key":
+        if not _is_valid(valid_schemas.outer_schema_single_without_key, config):
+            return None
+        tabs = [{"items": config["items"]}]
+        tab_schema = None
+    else:
+        if not _is_valid(valid_schemas.outer_schema_multiple_or_single_with_key, config):
+            return None
+        tabs = config["tabs"]
+        if config_layout == "multiple":
+            tab_schema = valid_schemas.tab_schema_multiple
+        else:
+            tab_schema = valid_schemas.tab_schema_single_with_key
+    new_config = normalizer.normalize_settings(config)
+    case_sensitive = new_config["case_sensitive"]
+    global_jump = new_config["global_jump"] and config_layout == "multiple"
+    if normalized_tabs is None or global_jump:
+        normalized_tabs = {}
+    # tabs are visited twice, because every tab selector is an input of every tab; items only once
+    selectors = set()
+    for tab in tabs:
+        if tab_schema is not None and not _is_valid(tab_schema, tab):
+            return None
+        # as in _validate_no_overlap(), falsy tab_header_input values such as 0 are valid but not counted
+        if config_layout == "multiple" and tab["tab_header_input"]:
+            selector = tab["tab_header_input"] if case_sensitive else str(tab["tab_header_input"]).lower()
+            if selector in selectors:
+                return None
+            selectors.add(selector)
+    item_schema = valid_schemas.item_schema
+    entry_schema = valid_schemas.entry_schema
+    # a non-empty str is always a valid entry, which the compiled backend needs no call to tell
+    str_entries_valid = entry_schema is _check_entry
+    qualified = set()
+    jump_inputs = set()
+    new_tabs = []
+    for tab_num, tab in enumerate(tabs):
+        if tab_num in normalized_tabs:
+            new_tabs.append(normalized_tabs[tab_num])
+            continue
+        header = None
+        if global_jump and tab["tab_header_input"]:
+            header = str(tab["tab_header_input"]) if case_sensitive else str(tab["tab_header_input"]).lower()
+            jump_inputs.add(header)
+        inputs = set()
+        returns = set()
+        new_items = []
+        for item in tab["items"]:
+            if not _is_valid(item_schema, item):
+                return None
+            new_inputs = []
+            for entry in item["item_inputs"]:
+                fast_valid = str_entries_valid and entry.__class__ is str and entry
+                if not fast_valid and not _is_valid(entry_schema, entry):
+                    return None
+                if case_sensitive:
+                    choice = entry
+                else:
+                    choice = str(entry).lower()
+                    if choice == entry:  # already lower-case: keep the caller's string instead of a copy
+                        choice = entry
+                if choice in selectors or choice in inputs:
+                    return None
+                inputs.add(choice)
+                # the normalized input; same object as choice unless case sensitive and entry is not a str
+                new_inputs.append(choice if choice.__class__ is str else str(choice))
+                if header is not None:
+                    jump_input = str(entry) if case_sensitive else choice
+                    jump_inputs.add(jump_input)
+                    qualified_input = header + JUMP_SEPARATOR + jump_input
+                    if qualified_input in qualified:
+                        return None
+                    qualified.add(qualified_input)
+            value = item["item_returns"]
+            if value:  # as in _validate_no_overlap()
+                if value in returns:
+                    return None
+                returns.add(value)
+            new_items.append(normalizer.normalize_item(item, not case_sensitive, new_inputs))
+        new_tabs.append(normalizer.normalize_tab(tab, not case_sensitive, new_items))
+    if not qualified.isdisjoint(jump_inputs):
+        return None
+    new_config["tabs"] = new_tabs
+    return new_config
+
+
+def validate_and_normalize(
+    config, backend="compiled", max_errors=DEFAULT_MAX_ERRORS, fail_fast=False, normalized_tabs=None
+):
+    """Validate config and return it normalized, visiting each of its items once
+
+    Same result as validate_all() followed by normalizer.normalize(), in one traversal instead of three: each part
+    of the config is normalized as soon as it has been checked. config is neither modified nor deep-copied. If
+    it is invalid, validate_all() is called to report the errors, so they are exactly the same.
+
+    Args:
+        config (dict): config dict as passed to menu.Menu instantiator
+        backend, max_errors, fail_fast: as in validate_all()
+        normalized_tabs (dict or None): normalized tabs by tab number, used as they are instead of checking and
+                                        normalizing their items again; only for tabs unchanged since a version
+                                        of config with the same settings and tab headers, see
+                                        definition.MenuDefinition.updated(). Ignored if global_jump is set
+
+    Returns:
+        (dict) new normalized config
+
+    Raises:
+        InvalidInputError if config is invalid, ValueError if max_errors is not a positive int or None
+
+    Warns:
+        PrefixMatchingWarning if config is valid but prefix_matching makes page navigation inputs unreachable
+    """
+    _check_max_errors(max_errors)
+    new_config = _normalize_if_valid(config, _get_valid_schemas(backend), normalized_tabs)
+    if new_config is None:
+        validate_all(config, backend, max_errors, fail_fast)
+        raise AssertionError("validate_all() found no error in a config found invalid")
+    _warn_unreachable_with_prefix_matching(config)
+    return new_config
+
+
+def validate_all(config, backend="compiled", max_errors=DEFAULT_MAX_ERRORS, fail_fast=False):
+    """Run above non-underscored functions on input
+
+    Args:
+        config (dict): config dict as passed to menu.Menu instantiator
+        backend (str): 'compiled' (default) or 'schema'; see note on backends at top of module
+        max_errors (int or None): stop validating after this many errors; None to report every error
+        fail_fast (bool): stop validating at the first error, same as max_errors=1
+
+    Raises:
+        InvalidInputError if config is invalid, with the errors found as ErrorRecord in its errors attribute
+        ValueError if max_errors is not a positive int or None
+
+    Warns:
+        PrefixMatchingWarning if config is valid but prefix_matching makes page navigation inputs unreachable
+    """
+    _check_max_errors(max_errors)
+    error_messages = _ErrorRecords(1 if fail_fast else max_errors)
+    try:
+        error_messages = _validate_schema(error_messages, config, backend)
+        error_messages = _validate_no_overlap(error_messages, config)
+    except _ErrorLimitReached:
+        raise InvalidInputError(error_messages, complete=False) from None
     if error_messages:
-        error_messages = _shorten_long_schema_error_messages(error_messages)
-        printed_message = ["", "Errors:"]
-        for i, message in enumerate(error_messages):
-            printed_message.append("{0}. {1}".format(i + 1, message))
-        raise InvalidInputError("\n".join(printed_message))
+        raise InvalidInputError(error_messages)
+    _warn_unreachable_with_prefix_matching(config)
+
+
+def _check_incremental(config):
+    """Raise ValueError if config has global_jump, whose inputs depend on the items of every tab"""
+    if config.get("global_jump", False) and len(config["tabs"]) > 1:
+        raise ValueError("a menu with global_jump cannot be changed incrementally; create a new menu instead")
+
+
+def _validate_and_normalize_new_items(error_messages, items, path, first_item_num, taken, returns, case_sensitive):
+    """Check items to be added to one tab, adding errors to error_messages, and return them normalized
+
+    Called from validate_and_normalize_items() and validate_and_normalize_tab(); overlaps are found with dicts of
+    the new values only, looking up the existing ones in taken and returns.
+
+    Args:
+        error_messages (list of ErrorRecord): passed around
+        items (list of dict): the new items
+        path (tuple): path of the tab in ErrorRecords, e.g. ('tab', 2), or () for a single tab
+        first_item_num (int): number the first new item will have in the tab
+        taken (function): returns whether a normalized input is already a tab selector or an input of the tab
+        returns (container of str): return values the tab already has
+        case_sensitive (bool): config's case_sensitive
+
+    Returns:
+        (list of dict) normalized items, meaningless if errors were added
+    """
+    item_schema = _COMPILED_SCHEMAS.item_schema
+    tab_num = path[1] if path else None
+    input_counts = {}
+    input_positions = {}
+    return_counts = {}
+    return_positions = {}
+    new_items = []
+    for item_num, item in enumerate(items, start=first_item_num):
+        n_errors = len(error_messages)
+        error_messages = _validate_schema_part(error_messages, item_schema, item, path + ("item", item_num))
+        if len(error_messages) > n_errors:
+            continue
+        new_inputs = []
+        for entry_num, entry in enumerate(item["item_inputs"]):
+            entry_path = path + ("item", item_num, "valid_entry", entry_num)
+            error_messages = _validate_schema_part(error_messages, _check_entry, entry, entry_path)
+            choice = str(entry) if case_sensitive else str(entry).lower()
+            if choice in input_positions:
+                input_counts[choice] = input_counts.get(choice, 1) + 1
+            else:
+                input_positions[choice] = len(input_positions)
+                if taken(choice):
+                    input_counts[choice] = 2
+            new_inputs.append(choice)
+        value = str(item["item_returns"])
+        if value in return_positions:
+            return_counts[value] = return_counts.get(value, 1) + 1
+        else:
+            return_positions[value] = len(return_positions)
+            if value in returns:
+                return_counts[value] = 2
+        new_items.append(normalizer.normalize_item(item, not case_sensitive, new_inputs))
+    if input_counts:
+        multiples = _sorted_multiples(input_counts, input_positions.get)
+        error_messages.append(_overlap_record(tab_num, bool(path), multiples, "input", case_sensitive))
+    if return_counts:
+        multiples = _sorted_multiples(return_counts, return_positions.get)
+        error_messages.append(_overlap_record(tab_num, bool(path), multiples, "return", case_sensitive))
+    return new_items
+
+
+def validate_and_normalize_items(config, tab_num, items, inputs, returns):
+    """Validate items to add to a tab of a normalized config and return them normalized, checking only them
+
+    Applies the rules validate_all() applies to the items of a tab, against indexes of the inputs and return values
+    the tab already has, so the cost is proportional to the number of new items; called from
+    definition.MenuDefinition.with_items(). Uses the compiled backend. Repeated values are compared once
+    normalized, so e.g. 1 and '1' are repeated even in a case-sensitive config.
+
+    Args:
+        config (dict): normalized config the items are added to
+        tab_num (int): number of the tab in config
+        items (list of dict): items to add, as they would be in a config
+        inputs (container of str): normalized inputs of the tab's items, e.g. its tab.Tab.item_table
+        returns (container of str): normalized return values of the tab's items
+
+    Returns:
+        (list of dict) the items, normalized
+
+    Raises:
+        InvalidInputError if the items are invalid, or would make the config invalid
+        ValueError if config has global_jump
+    """
+    _check_incremental(config)
+    case_sensitive = config["case_sensitive"]
+    multiple = len(config["tabs"]) > 1
+    selectors = {tab["tab_header_input"] for tab in config["tabs"]} if multiple else ()
+    error_messages = _ErrorRecords(DEFAULT_MAX_ERRORS)
+    try:
+        new_items = _validate_and_normalize_new_items(
+            error_messages,
+            items,
+            ("tab", tab_num) if multiple else (),
+            len(config["tabs"][tab_num]["items"]),
+            lambda choice: choice in selectors or choice in inputs,
+            returns,
+            case_sensitive,
+        )
+    except _ErrorLimitReached:
+        raise InvalidInputError(error_messages, complete=False) from None
+    if error_messages:
+        raise InvalidInputError(error_messages)
+    return new_items
+
+
+def validate_and_normalize_tab(config, tab, tab_inputs):
+    """Validate a tab to add after the last tab of a normalized config and return it normalized
+
+    Applies the rules validate_all() applies to a tab of a config with several tabs: the tab's own, and those
+    its tab_header_input must follow as an input of every tab, looked up in tab_inputs, so the cost is
+    proportional to the size of the new tab and the number of tabs; called from
+    definition.MenuDefinition.with_tab(). Uses the compiled backend.
+
+    Args:
+        config (dict): normalized config with more than one tab
+        tab (dict): tab to add, as it would be in a config
+        tab_inputs (list of container of str): normalized item inputs of every tab of config, in order, e.g. the
+                                               item_table of every tab.Tab
+
+    Returns:
+        (dict) the tab, normalized
+
+    Raises:
+        InvalidInputError if the tab is invalid, or would make the config invalid
+        ValueError if config has global_jump or a single tab, whose tab has no tab_header_input
+    """
+    _check_incremental(config)
+    if len(config["tabs"]) < 2:
+        raise ValueError("tabs can only be added to a menu with several tabs, since a single tab has no header")
+    case_sensitive = config["case_sensitive"]
+    tab_num = len(config["tabs"])
+    path = ("tab", tab_num)
+    selectors = {old_tab["tab_header_input"] for old_tab in config["tabs"]}
+    error_messages = _ErrorRecords(DEFAULT_MAX_ERRORS)
+    try:
+        error_messages = _validate_schema_part(error_messages, _COMPILED_SCHEMAS.tab_schema_multiple, tab, path)
+        if error_messages:
+            raise InvalidInputError(error_messages)
+        selector = str(tab["tab_header_input"])
+        if not case_sensitive:
+            selector = selector.lower()
+        if selector in selectors:
+            error_messages.append(_overlap_record(tab_num, True, [(selector, 2)], "input", case_sensitive))
+        for old_tab_num, inputs in enumerate(tab_inputs):
+            if selector in inputs:
+                error_messages.append(_overlap_record(old_tab_num, True, [(selector, 2)], "input", case_sensitive))
+        selectors.add(selector)
+        new_items = _validate_and_normalize_new_items(
+            error_messages, tab["items"], path, 0, selectors.__contains__, (), case_sensitive
+        )
+    except _ErrorLimitReached:
+        raise InvalidInputError(error_messages, complete=False) from None
+    if error_messages:
+        raise InvalidInputError(error_messages)
+    return normalizer.normalize_tab(tab, not case_sensitive, new_items)
+
+
+def validate_and_normalize_provided(config, tab_num, items, first_item_num, inputs, returns):
+    """Validate items fetched from a provider.ItemProvider for a tab of a normalized config, and normalize them
+
+    Applies the rules validate_all() applies to the items of a tab, to one page of provided items, against the
+    inputs valid in the tab and the return values of its items in the config; called from
+    definition.MenuDefinition when a page is fetched. Uses the compiled backend. Items of other pages are not
+    compared, since they may never be fetched.
+
+    Args:
+        config (dict): normalized config
+        tab_num (int): number of the tab in config
+        items (list of dict): the provided items
+        first_item_num (int): number of the first of them in error messages, after the items of the config
+        inputs (container of str): every input already valid in the tab, e.g. its tab.Tab.input2result
+        returns (container of str): normalized return values of the tab's items in the config
+
+    Returns:
+        (list of dict) the items, normalized
+
+    Raises:
+        InvalidInputError if the items are invalid, or repeat an input or return value of the tab
+    """
+    multiple = len(config["tabs"]) > 1
+    error_messages = _ErrorRecords(DEFAULT_MAX_ERRORS)
+    try:
+        new_items = _validate_and_normalize_new_items(
+            error_messages,
+            items,
+            ("tab", tab_num) if multiple else (),
+            first_item_num,
+            inputs.__contains__,
+            returns,
+            config["case_sensitive"],
+        )
+    except _ErrorLimitReached:
+        raise InvalidInputError(error_messages, complete=False) from None
+    if error_messages:
+        raise InvalidInputError(error_messages)
+    return new_items
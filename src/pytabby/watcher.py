@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Contains ConfigWatcher class, used by menu.Menu.watch() to reload a config file when it changes
+
+The file is polled with os.stat() before every menu is shown, which costs a few microseconds, and is read
+again only if its mtime or size has changed. A new MenuDefinition is built with
+definition.MenuDefinition.updated(), so only changed tabs are validated again, and the session swaps it in
+between two inputs: an input is always processed by the menu that was shown when it was typed.
+"""
+
+import os
+
+
+def _print_error(path, error):
+    """Default on_error of ConfigWatcher: prints the error where the menu is shown"""
+    print("Could not reload {0}, keeping the current menu: {1}".format(path, error))
+
+
+class ConfigWatcher:
+    """Polls a yaml or json config file and builds a new MenuDefinition when it changes
+
+    Args:
+        path (str or pathlib.Path): path to the config file
+        read_config (callable): reads the file at a path into a config dict, e.g. menu.Menu.read_config_file
+        validation_backend (str): 'compiled' or 'schema', passed to definition.MenuDefinition.updated()
+        on_error (callable or None): called with path and exception if a changed file cannot be read or is
+                                     invalid; if None, a message is printed
+
+    Attributes:
+        error (Exception or None): why the last change could not be loaded, or None if it was
+
+    Methods:
+        read(): reads the file, recording its current mtime and size
+        poll(definition): new MenuDefinition if the file has changed since the last read() or poll(), else None
+        invalidate(): makes the next change be loaded in full, after the menu was changed other than by poll()
+    """
+
+    __slots__ = ("path", "read_config", "validation_backend", "on_error", "error", "_signature", "_config")
+
+    def __init__(self, path, read_config, validation_backend="compiled", on_error=None):
+        """Instantiator for ConfigWatcher class; see class docstring for arguments"""
+        self.path = path
+        self.read_config = read_config
+        self.validation_backend = validation_backend
+        self.on_error = _print_error if on_error is None else on_error
+        self.error = None
+        self._signature = None
+        self._config = None
+
+    def _stat_signature(self):
+        """Returns (mtime_ns, size) of the file, or None if it cannot be accessed, e.g. while it is replaced"""
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def read(self):
+        """Reads the file, recording its mtime and size first, so that a change while reading is seen by poll()
+
+        Returns:
+            (dict) config
+        """
+        self._signature = self._stat_signature()
+        self._config = self.read_config(self.path)
+        return self._config
+
+    def poll(self, definition):
+        """Returns a MenuDefinition of the file if it has changed since it was last read, else None
+
+        A changed file that cannot be read, or whose config is invalid, is reported to on_error, once per change,
+        and None is returned, so the caller keeps its menu.
+
+        Args:
+            definition (definition.MenuDefinition): the definition built from the last config read
+
+        Returns:
+            (definition.MenuDefinition or None) the new definition, or None if there is none to swap in
+        """
+        signature = self._stat_signature()
+        if signature == self._signature:
+            return None
+        self._signature = signature
+        try:
+            if signature is None:
+                raise FileNotFoundError("{0} cannot be accessed".format(self.path))
+            config = self.read_config(self.path)
+            new_definition = definition.updated(config, self._config, self.validation_backend)
+        except Exception as e:  # noqa  # whatever is wrong with the new file, the menu must keep running
+            self.error = e
+            self.on_error(self.path, e)
+            return None
+        self.error = None
+        self._config = config
+        return new_definition
+
+    def invalidate(self):
+        """Forgets the config last read, so that the next change validates every tab again
+
+        Called when the menu has been changed since, e.g. by menu.Menu.add_item(): the tabs of its definition
+        may then differ from those of the config last read, even in tabs that are the same in the changed file.
+        """
+        self._config = None
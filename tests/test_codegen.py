@@ -0,0 +1,119 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests pytabby/codegen.py and the compile subcommand of pytabby/cli.py"""
+
+# pylama: ignore=D102
+# pylint: disable=C0116,C0330,W0212,C0103
+
+import ast
+import importlib.util
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from pytabby import Menu
+import pytabby
+import pytabby.cli as cli
+import pytabby.codegen as codegen
+import pytabby.compiled as compiled
+import pytabby.normalizer as normalizer
+import pytabby.validators as validators
+
+
+def generate_and_import(tmpdir, config, name="ops_menu"):
+    """Writes config to a json file, generates a module from it and imports it"""
+    json_path = str(tmpdir.join("menu.json"))
+    with open(json_path, "w") as f:
+        json.dump(config, f)
+    module_path = str(tmpdir.join(name + ".py"))
+    cli.main(["compile", json_path, "-o", module_path])
+    spec = importlib.util.spec_from_file_location(name, module_path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module, json_path
+
+
+@pytest.mark.integration
+@pytest.mark.run(order=5)
+def test_generated_menu_same_as_menu(tmpdir, config_all):
+    """A generated module builds a menu with the same tabs, frames and selections as Menu"""
+    module, json_path = generate_and_import(tmpdir, config_all)
+    generated, menu = module.build_menu(), Menu.from_file(json_path)
+    if generated._config != codegen._tuples(menu._config):
+        raise AssertionError("configs differ")
+    for tab1, tab2 in zip(generated._tabs, menu._tabs):
+        for attribute in ["head_choice", "head_desc", "head_desc_long", "selectors", "input2result"]:
+            if getattr(tab1, attribute) != getattr(tab2, attribute):
+                raise AssertionError("tabs differ in {0}".format(attribute))
+    for tab_number in range(len(menu._tabs)):
+        generated._change_tab(tab_number, announce=False)
+        menu._change_tab(tab_number, announce=False)
+        if generated._render() != menu._render() or generated._render("a message") != menu._render("a message"):
+            raise AssertionError
+    inputs = ["1", "2", "3", "un", "deux", "x", "three"]
+    if list(module.build_menu().run_batch(inputs)) != list(Menu.from_file(json_path).run_batch(inputs)):
+        raise AssertionError
+
+
+@pytest.mark.integration
+@pytest.mark.run(order=5)
+def test_built_without_validating_or_normalizing(tmpdir, monkeypatch, config_multiple):
+    """build_menu() neither validates nor normalizes, and starts with every frame rendered"""
+    module, _ = generate_and_import(tmpdir, config_multiple)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("called")
+
+    monkeypatch.setattr(validators, "validate_all", fail)
+    monkeypatch.setattr(validators, "validate_and_normalize", fail)
+    monkeypatch.setattr(normalizer, "normalize", fail)
+    menu = module.build_menu(start_tab_number=1)
+    if sorted(menu.definition._frames) != [(0, 0, 80, None), (1, 0, 80, None)]:
+        raise AssertionError
+    if menu._render() is not module.FRAMES[(1, 0, 80, None)] or menu.definition.tabs.n_built != 1:
+        raise AssertionError
+
+
+@pytest.mark.integration
+@pytest.mark.run(order=5)
+def test_built_without_yaml(tmpdir, config_multiple):
+    """Neither importing the generated module nor building its menu imports yaml or schema"""
+    generate_and_import(tmpdir, config_multiple)
+    path = [os.path.dirname(os.path.dirname(pytabby.__file__)), str(tmpdir)]
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(path))
+    statement = "import sys, ops_menu; ops_menu.build_menu(); print('yaml' in sys.modules, 'schema' in sys.modules)"
+    out = subprocess.run([sys.executable, "-c", statement], env=env, stdout=subprocess.PIPE, check=True).stdout
+    if out.split() != [b"False", b"False"]:
+        raise AssertionError(out)
+
+
+@pytest.mark.integration
+@pytest.mark.run(order=5)
+def test_source_hash_checked(tmpdir, config_multiple):
+    """build_menu() rejects a changed source file if given one, and a module of another format version"""
+    module, json_path = generate_and_import(tmpdir, config_multiple)
+    if module.SOURCE_HASH != compiled.source_hash(json_path).hex():
+        raise AssertionError
+    module.build_menu(path_to_config=json_path)
+    with open(json_path, "a") as f:
+        f.write(" ")
+    with pytest.raises(compiled.CompiledMenuError, match="stale"):
+        module.build_menu(path_to_config=json_path)
+    module.build_menu()
+    module.FORMAT_VERSION = codegen.FORMAT_VERSION + 1
+    with pytest.raises(compiled.CompiledMenuError, match="format version"):
+        module.build_menu()
+
+
+@pytest.mark.function
+@pytest.mark.run(order=5)
+def test_literal_round_trip(config_all):
+    """Generated literals evaluate to the values they were generated from"""
+    config = codegen._tuples(normalizer.normalize(config_all))
+    for value in [config, {(0, 0, 80, None): "\n[1] one\n", (1, 2, 40, None): ""}, (), {}, ("a",)]:
+        if ast.literal_eval(codegen._literal(value)) != value:
+            raise AssertionError(value)
@@ -0,0 +1,185 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests pytabby/compiled.py and the Menu.compile() and Menu.load_compiled() methods that use it"""
+
+# pylama: ignore=D102
+# pylint: disable=C0116,C0330,W0212,C0103
+
+import json
+import os
+
+import pytest
+
+from pytabby import Menu
+import pytabby.compiled as compiled
+import pytabby.validators as validators
+
+
+def yaml_path():
+    """Gets path to test yaml file"""
+    path_to_here = os.path.realpath(__file__)
+    this_dir = os.path.split(path_to_here)[0]
+    return os.path.join(this_dir, "data", "test_config.yaml")
+
+
+def assert_same_menu(menu1, menu2):
+    """Menus built from the same config must have the same config and dispatch tables"""
+    if menu1._config != menu2._config:
+        raise AssertionError("configs differ")
+    if len(menu1._tabs) != len(menu2._tabs):
+        raise AssertionError("number of tabs differs")
+    for tab1, tab2 in zip(menu1._tabs, menu2._tabs):
+        for attribute in ["head_choice", "head_desc", "head_desc_long", "selectors", "input2result"]:
+            if getattr(tab1, attribute) != getattr(tab2, attribute):
+                raise AssertionError("tabs differ in {0}".format(attribute))
+
+
+@pytest.mark.integration
+@pytest.mark.run(order=5)
+def test_roundtrip_yaml(tmpdir):
+    """A menu loaded from a compiled yaml config equals one built from the config"""
+    path = str(tmpdir.join("menu.compiled"))
+    Menu.compile(yaml_path(), path)
+    loaded = Menu.load_compiled(path, yaml_path())
+    assert_same_menu(loaded, Menu(Menu.safe_read_yaml(yaml_path())))
+
+
+@pytest.mark.integration
+@pytest.mark.run(order=5)
+def test_roundtrip_json(tmpdir, config_single_without_key):
+    """Json configs are compiled too, and single-tab layouts survive the round trip"""
+    json_path = str(tmpdir.join("menu.json"))
+    with open(json_path, "w") as f:
+        json.dump(config_single_without_key, f)
+    path = str(tmpdir.join("menu.compiled"))
+    Menu.compile(json_path, path)
+    loaded = Menu.load_compiled(path, json_path)
+    assert_same_menu(loaded, Menu(Menu.read_json(json_path)))
+
+
+@pytest.mark.integration
+@pytest.mark.run(order=5)
+def test_load_compiled_skips_validation(tmpdir, monkeypatch):
+    """Loading must not call the validator"""
+    path = str(tmpdir.join("menu.compiled"))
+    Menu.compile(yaml_path(), path)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("validate_all was called")
+
+    monkeypatch.setattr(validators, "validate_all", fail)
+    menu = Menu.load_compiled(path, start_tab_number=1)
+    if menu._current_tab_number != 1:
+        raise AssertionError
+
+
+@pytest.mark.breaking
+@pytest.mark.run(order=5)
+def test_stale_artifact(tmpdir):
+    """Changing the source after compiling makes the artifact stale"""
+    source = tmpdir.join("menu.yaml")
+    with open(yaml_path()) as f:
+        source.write(f.read())
+    path = str(tmpdir.join("menu.compiled"))
+    Menu.compile(str(source), path)
+    source.write(source.read().replace("Description", "Changed"))
+    with pytest.raises(compiled.CompiledMenuError, match="stale"):
+        Menu.load_compiled(path, str(source))
+
+
+@pytest.mark.breaking
+@pytest.mark.run(order=5)
+@pytest.mark.parametrize(
+    "corruption, match",
+    [
+        (lambda data: b"NOTMENU!" + data[8:], "not a compiled menu"),
+        (lambda data: data[:8] + b"\xff\xff" + data[10:], "format version"),
+        (lambda data: data[:-1] + bytes([data[-1] ^ 1]), "corrupt"),
+        (lambda data: data[:10], "too short"),
+    ],
+    ids=["magic", "version", "payload", "truncated"],
+)
+def test_rejected_artifact(tmpdir, corruption, match):
+    """Unrecognized, wrong version and corrupt artifacts are rejected"""
+    path = tmpdir.join("menu.compiled")
+    Menu.compile(yaml_path(), str(path))
+    path.write_binary(corruption(path.read_binary()))
+    with pytest.raises(compiled.CompiledMenuError, match=match):
+        Menu.load_compiled(str(path))
+
+
+# Menu.from_file() #
+
+
+def copy_of_yaml(tmpdir):
+    """Copies test yaml to tmpdir so it can be modified; returns py.path.local"""
+    source = tmpdir.join("menu.yaml")
+    with open(yaml_path()) as f:
+        source.write(f.read())
+    return source
+
+
+@pytest.mark.integration
+@pytest.mark.run(order=5)
+def test_from_file_without_cache():
+    """Without cache_dir, from_file is equivalent to reading the file and instantiating"""
+    assert_same_menu(Menu.from_file(yaml_path()), Menu(Menu.safe_read_yaml(yaml_path())))
+
+
+@pytest.mark.integration
+@pytest.mark.run(order=5)
+def test_from_file_cache_miss_then_hit(tmpdir, monkeypatch):
+    """First call fills the cache, second call loads from it without validating"""
+    cache_dir = tmpdir.join("cache")
+    first = Menu.from_file(yaml_path(), cache_dir=str(cache_dir))
+    if len(cache_dir.listdir()) != 1:
+        raise AssertionError("cache not filled")
+
+    def fail(*args, **kwargs):
+        raise AssertionError("validate_all was called")
+
+    monkeypatch.setattr(validators, "validate_all", fail)
+    second = Menu.from_file(yaml_path(), cache_dir=str(cache_dir))
+    assert_same_menu(first, second)
+
+
+@pytest.mark.integration
+@pytest.mark.run(order=5)
+def test_from_file_modified_source(tmpdir):
+    """Modifying the source gives a cache miss, and the outdated entry is pruned"""
+    source = copy_of_yaml(tmpdir)
+    cache_dir = tmpdir.join("cache")
+    Menu.from_file(str(source), cache_dir=str(cache_dir))
+    old_entries = cache_dir.listdir()
+    source.write(source.read().replace("Description", "Changed, and longer"))
+    menu = Menu.from_file(str(source), cache_dir=str(cache_dir))
+    if menu._tabs[0].head_desc != "Changed, and longer":
+        raise AssertionError
+    new_entries = cache_dir.listdir()
+    if len(new_entries) != 1 or new_entries == old_entries:
+        raise AssertionError(new_entries)
+
+
+@pytest.mark.integration
+@pytest.mark.run(order=5)
+def test_from_file_same_stat_different_content(tmpdir):
+    """The content hash catches changes that leave mtime and size unchanged"""
+    source = copy_of_yaml(tmpdir)
+    cache_dir = tmpdir.join("cache")
+    Menu.from_file(str(source), cache_dir=str(cache_dir))
+    stat = os.stat(str(source))
+    source.write(source.read().replace("Description", "Descr1ption"))
+    os.utime(str(source), ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    menu = Menu.from_file(str(source), cache_dir=str(cache_dir))
+    if menu._tabs[0].head_desc != "Descr1ption":
+        raise AssertionError
+
+
+@pytest.mark.integration
+@pytest.mark.run(order=5)
+def test_from_file_unwritable_cache(tmpdir):
+    """A cache that cannot be written does not prevent the menu from being created"""
+    not_a_dir = tmpdir.join("file")
+    not_a_dir.write("")
+    _ = Menu.from_file(yaml_path(), cache_dir=str(not_a_dir))
@@ -0,0 +1,386 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests definition.py and its use by menu.MenuSession"""
+
+# pylama: ignore=D102
+# pylint: disable=C0116,C0330,W0212,C0103
+
+from concurrent.futures import ThreadPoolExecutor
+from copy import deepcopy
+import tracemalloc
+
+import pytest
+
+import pytabby.normalizer as normalizer
+import pytabby.validators as validators
+
+from pytabby import Menu, MenuDefinition, MenuSession
+
+
+@pytest.mark.smoke
+@pytest.mark.run(order=12)
+def test_definition_smoke(config_all):
+    """A definition and a session of it run like a Menu"""
+    definition = MenuDefinition.from_config(config_all)
+    session = MenuSession(definition)
+    if session._render() != Menu(config_all)._render():
+        raise AssertionError
+
+
+@pytest.mark.function
+@pytest.mark.run(order=12)
+class TestImmutableHashable:
+    """Tests that definitions are frozen and hashable"""
+
+    def test_attributes_frozen(self, config_all):
+        _ = self.__class__  # just to get rid of codacy warning, I know, it's stupid
+        definition = MenuDefinition.from_config(config_all)
+        with pytest.raises(AttributeError):
+            definition.screen_width = 10
+        with pytest.raises(AttributeError):
+            definition.new_attribute = None
+        with pytest.raises(AttributeError):
+            del definition.tabs
+
+    def test_equal_configs_equal_definitions(self, config_all):
+        _ = self.__class__  # just to get rid of codacy warning, I know, it's stupid
+        definition1 = MenuDefinition.from_config(deepcopy(config_all))
+        definition2 = MenuDefinition.from_config(deepcopy(config_all))
+        if definition1 != definition2 or hash(definition1) != hash(definition2):
+            raise AssertionError
+        if len({definition1: None, definition2: None}) != 1:
+            raise AssertionError
+
+    def test_different_configs_differ(self, config_multiple):
+        _ = self.__class__  # just to get rid of codacy warning, I know, it's stupid
+        other = deepcopy(config_multiple)
+        other["screen_width"] = 40
+        if MenuDefinition.from_config(config_multiple) == MenuDefinition.from_config(other):
+            raise AssertionError
+
+
+@pytest.mark.function
+@pytest.mark.run(order=12)
+class TestSessions:
+    """Tests that sessions hold only cursor state"""
+
+    def test_session_has_no_dict(self, config_all):
+        _ = self.__class__  # just to get rid of codacy warning, I know, it's stupid
+        session = MenuSession(MenuDefinition.from_config(config_all))
+        if hasattr(session, "__dict__"):
+            raise AssertionError
+
+    def test_sessions_independent(self, config_multiple):
+        _ = self.__class__  # just to get rid of codacy warning, I know, it's stupid
+        definition = MenuDefinition.from_config(config_multiple)
+        session1 = MenuSession(definition)
+        session2 = session1.session(start_tab_number=1)
+        list(session1.run_batch(["deux"]))
+        if session1._current_tab_number != 1 or session2.session()._current_tab_number != 1:
+            raise AssertionError
+        list(session2.run_batch(["un"]))
+        if session1._current_tab_number != 1 or session2._current_tab_number != 0:
+            raise AssertionError
+
+    def test_invalid_start_tab(self, config_single_with_key):
+        _ = self.__class__  # just to get rid of codacy warning, I know, it's stupid
+        with pytest.raises(AssertionError):
+            MenuSession(MenuDefinition.from_config(config_single_with_key), start_tab_number=1)
+
+    def test_menu_from_definition(self, config_multiple):
+        _ = self.__class__  # just to get rid of codacy warning, I know, it's stupid
+        definition = MenuDefinition.from_config(config_multiple)
+        menu = Menu.from_definition(definition, start_tab_number=1)
+        if menu.definition is not definition or menu._config is not definition.config:
+            raise AssertionError
+        if menu._current_tab_number != 1:
+            raise AssertionError
+
+
+@pytest.mark.integration
+@pytest.mark.run(order=12)
+def test_threads_share_definition(config_multiple):
+    """Sessions in many threads render from one definition and get the same frames as a single session"""
+    definition = MenuDefinition.from_config(config_multiple)
+    n_tabs = len(definition.tabs)
+    expected = [Menu(config_multiple, start_tab_number=i)._render(str(i)) for i in range(n_tabs)]
+
+    def render(i):
+        return MenuSession(definition, i % n_tabs)._render(str(i % n_tabs))
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        frames = list(executor.map(render, range(200)))
+    if frames != [expected[i % n_tabs] for i in range(200)]:
+        raise AssertionError
+    if len(definition._frames) != n_tabs:
+        raise AssertionError
+
+
+@pytest.mark.function
+@pytest.mark.run(order=12)
+def test_unused_tabs_not_built(config_multiple):
+    """A session builds the tabs and item lines it shows, not every tab of the definition"""
+    definition = MenuDefinition.from_config(config_multiple)
+    if definition.tabs.n_built != 1 or definition.item_lines.n_built != 0:
+        raise AssertionError
+    events = list(MenuSession(definition).run_batch(["2"]))
+    if events[0].value != ("un", "2") or definition.tabs.n_built != 1:
+        raise AssertionError
+    list(MenuSession(definition).run_batch(["deux", "4"]))
+    if definition.tabs.n_built != 2:
+        raise AssertionError
+
+
+def numbered_config(n_tabs, n_items):
+    """Config with n_tabs tabs of n_items items each"""
+    return {
+        "tabs": [
+            {
+                "tab_header_input": "t{0}".format(i),
+                "items": [
+                    {
+                        "item_choice_displayed": str(j),
+                        "item_description": "item {0}".format(j),
+                        "item_inputs": ["i{0}".format(j)],
+                        "item_returns": "r{0}".format(j),
+                    }
+                    for j in range(n_items)
+                ],
+            }
+            for i in range(n_tabs)
+        ]
+    }
+
+
+@pytest.mark.function
+@pytest.mark.run(order=12)
+class TestUpdated:
+    """Tests MenuDefinition.updated(), which validates and normalizes only the tabs that changed"""
+
+    def test_only_changed_tab_normalized(self, monkeypatch):
+        _ = self.__class__  # just to get rid of codacy warning, I know, it's stupid
+        config = numbered_config(4, 50)
+        definition = MenuDefinition.from_config(config)
+        definition.render(0, 0, 80)
+        definition.render(2, 0, 80)
+        new_config = deepcopy(config)
+        new_config["tabs"][2]["items"].append(
+            {"item_choice_displayed": "x", "item_description": "x", "item_inputs": ["x"], "item_returns": "x"}
+        )
+        normalized_items = []
+        normalize_item = normalizer.normalize_item
+
+        def counting_normalize_item(*args):
+            normalized_items.append(args[0])
+            return normalize_item(*args)
+
+        monkeypatch.setattr(normalizer, "normalize_item", counting_normalize_item)
+        new_definition = definition.updated(new_config, config)
+        if len(normalized_items) != 51:
+            raise AssertionError(len(normalized_items))
+        if new_definition.config["tabs"][0] is not definition.config["tabs"][0]:
+            raise AssertionError
+        if sorted(new_definition._frames) != [(0, 0, 80, None)]:
+            raise AssertionError
+        if new_definition != MenuDefinition.from_config(new_config):
+            raise AssertionError
+
+    def test_full_when_headers_or_settings_change(self):
+        _ = self.__class__  # just to get rid of codacy warning, I know, it's stupid
+        config = numbered_config(3, 5)
+        definition = MenuDefinition.from_config(config)
+        definition.render(0, 0, 80)
+        for key, value in [("tab_header_input", "new"), ("tab_header_description", "new")]:
+            new_config = deepcopy(config)
+            new_config["tabs"][1][key] = value
+            new_definition = definition.updated(new_config, config)
+            if new_definition._frames or new_definition != MenuDefinition.from_config(new_config):
+                raise AssertionError(key)
+        new_config = deepcopy(config)
+        new_config["case_sensitive"] = True
+        if definition.updated(new_config, config).config["tabs"][0] is definition.config["tabs"][0]:
+            raise AssertionError
+
+    def test_invalid_change(self):
+        _ = self.__class__  # just to get rid of codacy warning, I know, it's stupid
+        config = numbered_config(3, 5)
+        definition = MenuDefinition.from_config(config)
+        new_config = deepcopy(config)
+        new_config["tabs"][1]["items"][0]["item_inputs"] = ["i1"]  # repeats the input of the next item
+        with pytest.raises(validators.InvalidInputError, match="tab#1"):
+            definition.updated(new_config, config)
+        # a repeated tab selector is only checked against unchanged tabs if they are validated again
+        new_config = deepcopy(config)
+        new_config["tabs"][1]["items"][0]["item_inputs"] = ["t0"]
+        with pytest.raises(validators.InvalidInputError, match="tab#1"):
+            definition.updated(new_config, config)
+
+
+def numbered_item(name):
+    """Item of a numbered_config() tab, for name not already in it"""
+    return {
+        "item_choice_displayed": str(name),
+        "item_description": "item {0}".format(name),
+        "item_inputs": ["i{0}".format(name)],
+        "item_returns": "r{0}".format(name),
+    }
+
+
+def rendered_definition():
+    """Returns a definition with three rendered pages in tab 1, and its config with items 25 and 26 added"""
+    config = dict(numbered_config(3, 25), page_size=10)
+    definition = MenuDefinition.from_config(config)
+    for key in [(0, 0, 80, None), (1, 0, 80, None), (1, 1, 80, None), (1, 2, 80, None)]:
+        definition.render(*key)
+    new_config = deepcopy(config)
+    new_config["tabs"][1]["items"] += [numbered_item(25), numbered_item(26)]
+    return definition, new_config
+
+
+@pytest.mark.function
+@pytest.mark.run(order=12)
+class TestIncremental:
+    """Tests MenuDefinition.with_items(), without_item() and with_tab(), which validate only what they add"""
+
+    def test_with_items(self, monkeypatch):
+        _ = self.__class__  # just to get rid of codacy warning, I know, it's stupid
+        definition, new_config = rendered_definition()
+        normalized_items = []
+        normalize_item = normalizer.normalize_item
+
+        def counting_normalize_item(*args):
+            normalized_items.append(args[0])
+            return normalize_item(*args)
+
+        monkeypatch.setattr(normalizer, "normalize_item", counting_normalize_item)
+        new_definition = definition.with_items(1, [numbered_item(25), numbered_item(26)])
+        if len(normalized_items) != 2:
+            raise AssertionError(len(normalized_items))
+        expected = MenuDefinition.from_config(new_config)
+        if new_definition != expected or definition == expected:
+            raise AssertionError
+        if new_definition.tabs[1].process_input("i26") != expected.tabs[1].process_input("i26"):
+            raise AssertionError
+        if definition.tabs[1].process_input("i26")["type"] != "invalid":
+            raise AssertionError
+
+    def test_with_items_reuses_tabs_and_frames(self):
+        _ = self.__class__  # just to get rid of codacy warning, I know, it's stupid
+        definition, new_config = rendered_definition()
+        new_definition = definition.with_items(1, [numbered_item(25), numbered_item(26)])
+        if new_definition.tabs[0] is not definition.tabs[0] or new_definition.tabs[1] is definition.tabs[1]:
+            raise AssertionError
+        # the pages before the new items are shared, the last page is rendered again
+        if sorted(new_definition._frames) != [(0, 0, 80, None), (1, 0, 80, None), (1, 1, 80, None)]:
+            raise AssertionError
+        expected = MenuDefinition.from_config(new_config)
+        for page_number in range(3):
+            if new_definition.render(1, page_number, 80) != expected.render(1, page_number, 80):
+                raise AssertionError(page_number)
+
+    def test_with_wider_items(self):
+        _ = self.__class__  # just to get rid of codacy warning, I know, it's stupid
+        config = numbered_config(2, 5)
+        definition = MenuDefinition.from_config(config)
+        definition.render(0, 0, 80)
+        new_definition = definition.with_items(0, [numbered_item("wide")])
+        if new_definition._frames:
+            raise AssertionError
+        new_config = deepcopy(config)
+        new_config["tabs"][0]["items"].append(numbered_item("wide"))
+        if new_definition.item_lines[0] != MenuDefinition.from_config(new_config).item_lines[0]:
+            raise AssertionError
+
+    def test_invalid_items(self):
+        _ = self.__class__  # just to get rid of codacy warning, I know, it's stupid
+        definition = MenuDefinition.from_config(numbered_config(3, 5))
+        repeated_input = dict(numbered_item(5), item_inputs=["i0"])
+        repeated_return = dict(numbered_item(5), item_returns="r0")
+        selector = dict(numbered_item(5), item_inputs=["t2"])
+        for items in [[repeated_input], [repeated_return], [selector], [numbered_item(5), numbered_item(5)]]:
+            with pytest.raises(validators.InvalidInputError, match="tab#1, there are repeated"):
+                definition.with_items(1, items)
+        with pytest.raises(validators.InvalidInputError, match="tab#1.*item#5"):
+            definition.with_items(1, [{"item_inputs": ["x"]}])
+        config = dict(numbered_config(3, 5), global_jump=True)
+        with pytest.raises(ValueError, match="global_jump"):
+            MenuDefinition.from_config(config).with_items(1, [numbered_item(5)])
+        if len(definition.config["tabs"][1]["items"]) != 5:
+            raise AssertionError
+
+    def test_without_item(self):
+        _ = self.__class__  # just to get rid of codacy warning, I know, it's stupid
+        config = dict(numbered_config(2, 25), page_size=10)
+        config["tabs"][1]["items"][0]["item_choice_displayed"] = "zero"  # wider than the item removed
+        definition = MenuDefinition.from_config(config)
+        for key in [(0, 0, 80, None), (1, 0, 80, None), (1, 1, 80, None), (1, 2, 80, None)]:
+            definition.render(*key)
+        new_definition = definition.without_item(1, "r13")
+        new_config = deepcopy(config)
+        del new_config["tabs"][1]["items"][13]
+        expected = MenuDefinition.from_config(new_config)
+        if new_definition != expected or new_definition.item_lines[1] != expected.item_lines[1]:
+            raise AssertionError
+        if sorted(new_definition._frames) != [(0, 0, 80, None), (1, 0, 80, None)]:
+            raise AssertionError
+        if new_definition.tabs[1].process_input("i13")["type"] != "invalid":
+            raise AssertionError
+        # items can be removed one after the other, using the indexes of the previous definition
+        if new_definition.without_item(1, "r14") != definition.without_item(1, "r14").without_item(1, "r13"):
+            raise AssertionError
+        with pytest.raises(ValueError, match="no item returning 'r13'"):
+            new_definition.without_item(1, "r13")
+        single = MenuDefinition.from_config(numbered_config(2, 1))  # one item per tab
+        with pytest.raises(ValueError, match="only item"):
+            single.without_item(0, "r0")
+
+    def test_cost_independent_of_tab_size(self):
+        _ = self.__class__  # just to get rid of codacy warning, I know, it's stupid
+
+        def mutation_cost(n_items):
+            """Bytes allocated at most while adding and removing items, rendering after each change"""
+            definition = MenuDefinition.from_config(dict(numbered_config(2, n_items), page_size=10))
+            # builds the indexes carried from one definition to the next, once per tab
+            definition = definition.with_items(1, [numbered_item("x")]).without_item(1, "rx")
+            tracemalloc.start()
+            try:
+                for i in range(50):
+                    definition = definition.with_items(1, [numbered_item("new{0}".format(i))])
+                    definition = definition.without_item(1, "r{0}".format(n_items // 2 + i))
+                    definition.render(1, 0, 80)
+                return tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+
+        small, large = mutation_cost(1000), mutation_cost(100000)
+        # copying the tables of the tab once would take megabytes at 100000 items
+        if large > 2 * small + 100000:
+            raise AssertionError((small, large))
+
+    def test_with_tab(self):
+        _ = self.__class__  # just to get rid of codacy warning, I know, it's stupid
+        config = numbered_config(2, 5)
+        definition = MenuDefinition.from_config(config)
+        definition.render(0, 0, 80)
+        new_tab = {"tab_header_input": "t2", "items": [numbered_item(0), numbered_item(1)]}
+        new_definition = definition.with_tab(new_tab)
+        new_config = deepcopy(config)
+        new_config["tabs"].append(new_tab)
+        expected = MenuDefinition.from_config(new_config)
+        if new_definition != expected or new_definition._frames:
+            raise AssertionError
+        if new_definition.render(0, 0, 80) != expected.render(0, 0, 80):
+            raise AssertionError
+        for tab_number in range(3):
+            if new_definition.tabs[tab_number].process_input("t2") != expected.tabs[tab_number].process_input("t2"):
+                raise AssertionError(tab_number)
+        if new_definition.tabs[0].item_table is not definition.tabs[0].item_table:
+            raise AssertionError
+        for header in ["t0", "i3"]:
+            with pytest.raises(validators.InvalidInputError, match="repeated input values"):
+                definition.with_tab(dict(new_tab, tab_header_input=header))
+        with pytest.raises(validators.InvalidInputError, match="repeated input values"):
+            definition.with_tab(dict(new_tab, items=[dict(numbered_item(0), item_inputs=["t1"])]))
+        with pytest.raises(ValueError, match="several tabs"):
+            MenuDefinition.from_config({"tabs": [{"items": [numbered_item(0)]}]}).with_tab(new_tab)
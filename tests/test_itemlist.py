@@ -0,0 +1,61 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests pytabby/itemlist.py"""
+
+# pylama: ignore=D102
+# pylint: disable=C0116,C0330,W0212,C0103
+
+import random
+
+import pytest
+
+from pytabby.itemlist import ItemList
+
+
+@pytest.mark.function
+@pytest.mark.run(order=12)
+class TestItemList:
+    """Tests ItemList against a list changed the same way"""
+
+    def test_wrap(self):
+        _ = self.__class__  # just to get rid of codacy warning, I know, it's stupid
+        items = ["a", "b", "c"]
+        item_list = ItemList.wrap(items)
+        if list(item_list) != items or item_list[1:] != ["b", "c"] or item_list[-1] != "c" or item_list.next_id != 3:
+            raise AssertionError
+        if ItemList.wrap(item_list) is not item_list or len(ItemList.wrap([])) != 0:
+            raise AssertionError
+        with pytest.raises(IndexError):
+            item_list[3]  # pylint: disable=pointless-statement
+
+    def test_same_as_list(self):
+        _ = self.__class__  # just to get rid of codacy warning, I know, it's stupid
+        rng = random.Random(0)
+        reference = list(range(1000))
+        ids = list(range(1000))
+        item_list = ItemList.wrap(list(reference))
+        versions = []
+        for step in range(3000):
+            if reference and rng.random() < 0.5:
+                position = rng.randrange(len(reference))
+                if item_list.position(ids[position]) != position:
+                    raise AssertionError(step)
+                item_list = item_list.removed(ids.pop(position))
+                del reference[position]
+            else:
+                new_items = [("new", item_list.next_id + i) for i in range(rng.randint(1, 3))]
+                ids.extend(range(item_list.next_id, item_list.next_id + len(new_items)))
+                item_list = item_list.appended(new_items)
+                reference.extend(new_items)
+            start, stop = sorted([rng.randrange(len(reference) + 1), rng.randrange(len(reference) + 1)])
+            if len(item_list) != len(reference) or item_list[start:stop] != reference[start:stop]:
+                raise AssertionError(step)
+            if step % 500 == 0:
+                versions.append((item_list, list(reference)))
+        if list(item_list) != reference:
+            raise AssertionError
+        # every version is left unchanged by the changes made to it
+        for version, version_reference in versions:
+            if list(version) != version_reference:
+                raise AssertionError
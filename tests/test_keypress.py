@@ -0,0 +1,151 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests keypress.py and keystroke mode of menu.MenuSession"""
+
+# pylama: ignore=D102
+# pylint: disable=C0116,C0330,W0212,C0103
+
+import io
+import os
+import sys
+
+import pytest
+
+from pytabby import Menu
+import pytabby.keypress as keypress
+import pytabby.menu
+
+SORTED_INPUTS = ("a", "b", "s", "sa", "sav")
+
+
+def collect(keys, sorted_inputs=SORTED_INPUTS, **kwargs):
+    """Runs keypress.collect_keys() on a string of keys; returns (typed, echoed text, number of keys left)"""
+    remaining = list(keys)
+    echoed = []
+
+    def read_key():
+        return remaining.pop(0) if remaining else ""
+
+    typed = keypress.collect_keys(read_key, echoed.append, sorted_inputs, **kwargs)
+    return typed, "".join(echoed), len(remaining)
+
+
+@pytest.mark.function
+@pytest.mark.run(order=13)
+@pytest.mark.parametrize(
+    "typed,expected",
+    [("a", True), ("s", False), ("sa", False), ("sav", True), ("z", True), ("sx", True), ("", False)],
+)
+def test_is_resolved(typed, expected):
+    """Unique inputs and impossible prefixes are resolved, prefixes of longer inputs are not"""
+    if keypress.is_resolved(typed, SORTED_INPUTS) != expected:
+        raise AssertionError
+
+
+@pytest.mark.function
+@pytest.mark.run(order=13)
+class TestCollectKeys:
+    """Tests reading keys until a selection is resolved"""
+
+    def test_single_key_resolves(self):
+        _ = self.__class__  # just to get rid of codacy warning, I know, it's stupid
+        if collect("bzz") != ("b", "b\n", 2):
+            raise AssertionError
+
+    def test_prefix_waits_for_enter(self):
+        _ = self.__class__  # just to get rid of codacy warning, I know, it's stupid
+        if collect("s\rzz") != ("s", "s\n", 2):
+            raise AssertionError
+        if collect("savzz") != ("sav", "sav\n", 2):
+            raise AssertionError
+
+    def test_unique_prefix_completed(self):
+        _ = self.__class__  # just to get rid of codacy warning, I know, it's stupid
+        if collect("oq", ("open", "quit")) != ("open", "open\n", 1):
+            raise AssertionError
+        if collect("O", ("open", "quit")) != ("Open", "Open\n", 0):
+            raise AssertionError
+        if collect("sa\r") != ("sa", "sa\n", 0):  # 'sa' and 'sav' start with 'sa'
+            raise AssertionError
+        if collect("/\r", ("/a", "b"), free_prefix="/") != ("/", "/\n", 0):  # may be a search, so not completed
+            raise AssertionError
+
+    def test_invalid_resolves_immediately(self):
+        _ = self.__class__  # just to get rid of codacy warning, I know, it's stupid
+        if collect("sx") != ("sx", "sx\n", 0):
+            raise AssertionError
+
+    def test_backspace_and_control_keys(self):
+        _ = self.__class__  # just to get rid of codacy warning, I know, it's stupid
+        if collect("s\x1b\x7fa") != ("a", "s\b \ba\n", 0):
+            raise AssertionError
+
+    def test_escape_sequences_ignored(self):
+        _ = self.__class__  # just to get rid of codacy warning, I know, it's stupid
+        # up arrow as CSI and as SS3, Ctrl-right arrow, F5, and Alt-arrow (ESC before a CSI sequence)
+        for keys in ["\x1b[Aa", "\x1bOAa", "\x1b[1;5Ca", "\x1b[15~a", "\x1b\x1b[Ba"]:
+            if collect(keys) != ("a", "a\n", 0):
+                raise AssertionError(repr(keys))
+        with pytest.raises(EOFError):
+            collect("\x1b[1")
+
+    def test_case_insensitive(self):
+        _ = self.__class__  # just to get rid of codacy warning, I know, it's stupid
+        if collect("A")[0] != "A":
+            raise AssertionError
+        if collect("S\r", case_sensitive=True)[0] != "S":  # resolved as invalid, Enter not read
+            raise AssertionError
+
+    def test_wait_prefix(self):
+        _ = self.__class__  # just to get rid of codacy warning, I know, it's stupid
+        if collect("#12\r", wait_prefix="#") != ("#12", "#12\n", 0):
+            raise AssertionError
+
+    def test_free_prefix(self):
+        _ = self.__class__  # just to get rid of codacy warning, I know, it's stupid
+        if collect("/sav x\r", free_prefix="/") != ("/sav x", "/sav x\n", 0):
+            raise AssertionError
+        if collect("/a", ("/a", "b"), free_prefix="/") != ("/a", "/a\n", 0):  # a valid input resolves as usual
+            raise AssertionError
+
+    def test_end_of_input(self):
+        _ = self.__class__  # just to get rid of codacy warning, I know, it's stupid
+        with pytest.raises(EOFError):
+            collect("")
+        with pytest.raises(EOFError):
+            collect("\x04")
+
+
+@pytest.mark.function
+@pytest.mark.run(order=13)
+def test_falls_back_to_line_mode(config_multiple, monkeypatch):
+    """If stdin is not a terminal, keystroke mode reads lines with input()"""
+    monkeypatch.setattr(sys, "stdin", io.StringIO(""))
+    monkeypatch.setattr(pytabby.menu, "input", lambda prompt: "2", raising=False)
+    menu = Menu(config_multiple)
+    menu.keystroke_mode = True
+    if not menu.keystroke_mode or menu.run() != ("un", "2"):
+        raise AssertionError
+
+
+@pytest.mark.integration
+@pytest.mark.run(order=13)
+@pytest.mark.skipif(not hasattr(os, "openpty") or keypress.termios is None, reason="no pseudo-terminals")
+def test_keystroke_mode_on_terminal(config_multiple, monkeypatch, capsys):
+    """On a terminal, selections are made without Enter, and the terminal settings are restored"""
+    master, slave = os.openpty()
+    with os.fdopen(slave, "r") as terminal:
+        settings = keypress.termios.tcgetattr(slave)
+        monkeypatch.setattr(sys, "stdin", terminal)
+        os.write(master, b"d3")  # 'd' is the start of 'deux' only
+        menu = Menu(config_multiple)
+        menu.keystroke_mode = True
+        value = menu.run()
+        if keypress.termios.tcgetattr(slave) != settings:
+            raise AssertionError("terminal settings not restored")
+    os.close(master)
+    if value != ("deux", "three"):
+        raise AssertionError
+    if capsys.readouterr().out.find("?: deux\n") == -1:
+        raise AssertionError
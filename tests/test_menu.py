@@ -6,15 +6,21 @@
 # pylama: ignore=D102
 # pylint: disable=C0116,C0330,W0212,C0103
 
+import asyncio
 from copy import deepcopy
 import json
 import os
+import subprocess
+import sys
 
 import pytest
+import yaml
 
 # import from __init__
 from pytabby import Menu
 import pytabby
+from pytabby.menu import BatchEvent
+import pytabby.validators as validators
 
 
 def yaml_path():
@@ -55,6 +61,23 @@ class TestStaticMethods:
         if not config_from_yaml == config_from_json:
             raise AssertionError
 
+    def test_yaml_pure_python_fallback(self, monkeypatch):
+        """Without libyaml, the pure-python loader is used and gives the same config"""
+        _ = self.__class__  # just to get rid of codacy warning, I know, it's stupid
+        config_default = Menu.safe_read_yaml(yaml_path())
+        monkeypatch.delattr(yaml, "CSafeLoader", raising=False)
+        if Menu.yaml_backend() != "SafeLoader":
+            raise AssertionError
+        if Menu.safe_read_yaml(yaml_path()) != config_default:
+            raise AssertionError
+
+    def test_yaml_backend(self):
+        """Reports libyaml's loader when PyYAML was built with it"""
+        _ = self.__class__  # just to get rid of codacy warning, I know, it's stupid
+        expected = "CSafeLoader" if yaml.__with_libyaml__ else "SafeLoader"
+        if Menu.yaml_backend() != expected:
+            raise AssertionError
+
 
 @pytest.mark.function
 @pytest.mark.run(order=6)
@@ -161,12 +184,12 @@ class TestCollectInput:
         data = {}
         pytabby.menu.input = lambda x: test_input_valid_entry
         result = menu._collect_input()
-        data["result"] = result
+        data["result"] = dict(result)
         if id_.find("multiple") != -1:
             test_input_tab = normal["tabs"][1]["tab_header_input"]
             pytabby.menu.input = lambda x: test_input_tab
             result2 = menu._collect_input()
-            data["result_multiple"] = result2
+            data["result_multiple"] = dict(result2)
         data_regression.check(data)
 
     def teardown_method(self):
@@ -261,3 +284,497 @@ class TestRun:
         """Reverts input"""
         _ = self.__class__  # just to get rid of codacy warning, I know, it's stupid
         pytabby.menu.input = input
+
+
+@pytest.mark.smoke
+@pytest.mark.run(order=-1)
+def test_menu_smoke_schema_backend(config_all):
+    """Menu creation also succeeds when validating with the schema package"""
+    _ = Menu(config_all, validation_backend="schema")
+
+
+@pytest.mark.function
+@pytest.mark.run(order=8)
+class TestFrameCache:
+    """Tests caching of rendered frames"""
+
+    def test_cached_frame_reused(self, config_all, monkeypatch):
+        _ = self.__class__  # just to get rid of codacy warning, I know, it's stupid
+        menu = Menu(config_all)
+        first = menu._render("message")
+        monkeypatch.setattr(pytabby.formatting, "format_menu", None)  # would fail if called
+        if menu._render("message") is not first:
+            raise AssertionError
+
+    def test_frame_matches_format_menu(self, config_multiple):
+        _ = self.__class__  # just to get rid of codacy warning, I know, it's stupid
+        menu = Menu(config_multiple)
+        menu._change_tab(1)
+        expected = pytabby.formatting.format_menu(menu._config, 1, 80, "message")
+        if menu._render("message") != expected:
+            raise AssertionError
+
+    def test_width_change_rerenders(self, config_multiple):
+        _ = self.__class__  # just to get rid of codacy warning, I know, it's stupid
+        menu = Menu(config_multiple)
+        wide = menu._render()
+        menu.screen_width = 10
+        if menu._render() == wide:
+            raise AssertionError("headers should wrap differently")
+        if (0, 0, 80, None) not in menu._frames:
+            raise AssertionError("frames of other widths stay cached for other sessions")
+        with pytest.raises(ValueError):
+            menu.screen_width = 0
+
+    def test_cache_bounded(self, config_all):
+        _ = self.__class__  # just to get rid of codacy warning, I know, it's stupid
+        menu = Menu(config_all)
+        for i in range(pytabby.definition.MAX_CACHED_FRAMES + 10):
+            menu._render(str(i))
+        if len(menu._frames) != pytabby.definition.MAX_CACHED_FRAMES:
+            raise AssertionError
+
+
+def paged_config(n_items=25, page_size=10):
+    """Two-tab config whose first tab has n_items items, shown page_size at a time"""
+    items = [
+        {"item_choice_displayed": i, "item_description": "Item {0}".format(i), "item_inputs": [i], "item_returns": i}
+        for i in range(n_items)
+    ]
+    tab2_items = [{"item_choice_displayed": "x", "item_description": "X", "item_inputs": ["x"], "item_returns": "x"}]
+    return {
+        "page_size": page_size,
+        "tabs": [{"tab_header_input": "a", "items": items}, {"tab_header_input": "b", "items": tab2_items}],
+    }
+
+
+@pytest.mark.integration
+@pytest.mark.run(order=10)
+class TestPaging:
+    """Monkeypatches module.input function"""
+
+    def test_only_page_rendered(self):
+        _ = self.__class__  # just to get rid of codacy warning, I know, it's stupid
+        menu = Menu(paged_config())
+        lines = menu._render().split("\n")
+        item_lines = [line for line in lines if line.find("] Item") != -1]
+        if len(item_lines) != 10 or item_lines[0] != "[0 ] Item 0":
+            raise AssertionError(lines)
+        if not lines[-1].startswith("Page 1/3"):
+            raise AssertionError(lines)
+
+    def test_no_page_line_if_one_page(self):
+        _ = self.__class__  # just to get rid of codacy warning, I know, it's stupid
+        menu = Menu(paged_config(n_items=5))
+        if menu._render().find("Page") != -1:
+            raise AssertionError
+
+    def test_navigation_then_item_on_other_page(self, capsys):
+        _ = self.__class__  # just to get rid of codacy warning, I know, it's stupid
+        menu = Menu(paged_config())
+        inputs = iter([">", "#3", "<", "#4", "<", "<", "<", "2"])
+        pytabby.menu.input = lambda x: next(inputs)
+        result = menu.run()
+        if result != ("a", "2"):
+            raise AssertionError(result)
+        out, _ = capsys.readouterr()
+        for page_line in ["Page 1/3", "Page 2/3", "Page 3/3"]:
+            if out.find(page_line) == -1:
+                raise AssertionError(page_line)
+
+    def test_items_on_other_pages_resolve(self):
+        _ = self.__class__  # just to get rid of codacy warning, I know, it's stupid
+        menu = Menu(paged_config())
+        pytabby.menu.input = lambda x: "24"
+        if menu._collect_input() != {"type": "return", "return_value": "24"}:
+            raise AssertionError
+
+    def test_change_tab_resets_page(self):
+        _ = self.__class__  # just to get rid of codacy warning, I know, it's stupid
+        menu = Menu(paged_config())
+        if not menu._change_page(">"):
+            raise AssertionError
+        menu._change_tab(1)
+        menu._change_tab(0)
+        if menu._current_page_number != 0:
+            raise AssertionError
+
+    def teardown_method(self):
+        """Reverts input"""
+        _ = self.__class__  # just to get rid of codacy warning, I know, it's stupid
+        pytabby.menu.input = input
+
+
+@pytest.mark.integration
+@pytest.mark.run(order=10)
+class TestRunBatch:
+    """Tests Menu.run_batch"""
+
+    def test_selections_and_invalid(self, config_multiple, capsys, random_string):
+        _ = self.__class__  # just to get rid of codacy warning, I know, it's stupid
+        menu = Menu(config_multiple)
+        normal = menu._config
+        tab1 = normal["tabs"][1]
+        inputs = [
+            normal["tabs"][0]["items"][0]["item_inputs"][0],
+            random_string,
+            tab1["tab_header_input"],
+            tab1["items"][0]["item_inputs"][0],
+        ]
+        events = list(menu.run_batch(inputs))
+        expected = [
+            pytabby.menu.BatchEvent("selection", inputs[0], ("un", "1"), 0),
+            pytabby.menu.BatchEvent("invalid", random_string, None, 0),
+            pytabby.menu.BatchEvent("selection", inputs[3], ("deux", "three"), 1),
+        ]
+        if events != expected:
+            raise AssertionError(events)
+        if menu._current_tab_number != 1:
+            raise AssertionError
+        out, _ = capsys.readouterr()
+        if out:
+            raise AssertionError("nothing should be printed")
+
+    def test_matches_run(self, config_all):
+        _ = self.__class__  # just to get rid of codacy warning, I know, it's stupid
+        normal = Menu(deepcopy(config_all))._config
+        test_input = normal["tabs"][0]["items"][0]["item_inputs"][0]
+        pytabby.menu.input = lambda x: test_input
+        from_run = Menu(deepcopy(config_all)).run()
+        event = next(Menu(deepcopy(config_all)).run_batch([test_input]))
+        if event.value != from_run:
+            raise AssertionError
+
+    def test_lazy(self, config_single_with_key):
+        _ = self.__class__  # just to get rid of codacy warning, I know, it's stupid
+        menu = Menu(config_single_with_key)
+
+        def endless():
+            while True:
+                yield "1"
+
+        event = next(menu.run_batch(endless()))
+        if event.type != "selection":
+            raise AssertionError
+
+    def test_ambiguous_prefix(self, config_multiple):
+        _ = self.__class__  # just to get rid of codacy warning, I know, it's stupid
+        c = deepcopy(config_multiple)
+        c["prefix_matching"] = True
+        c["tabs"][1]["items"][1]["item_inputs"].append("thirty")
+        events = list(Menu(c).run_batch(["d", "th", "thr", "fo"]))
+        expected = [
+            pytabby.menu.BatchEvent("ambiguous", "th", ("thirty", "three"), 1),
+            pytabby.menu.BatchEvent("selection", "thr", ("deux", "three"), 1),
+            pytabby.menu.BatchEvent("selection", "fo", ("deux", "four!"), 1),
+        ]
+        if events != expected:
+            raise AssertionError(events)
+
+    def test_global_jump(self, config_multiple):
+        _ = self.__class__  # just to get rid of codacy warning, I know, it's stupid
+        c = deepcopy(config_multiple)
+        c["global_jump"] = True
+        menu = Menu(c)
+        events = list(menu.run_batch(["three", "un:tWo", "deux:1"]))
+        expected = [
+            pytabby.menu.BatchEvent("selection", "three", ("deux", "three"), 1),
+            pytabby.menu.BatchEvent("selection", "un:tWo", ("un", "2"), 0),
+            pytabby.menu.BatchEvent("invalid", "deux:1", None, 0),
+        ]
+        if events != expected:
+            raise AssertionError(events)
+        pytabby.menu.input = lambda x: "four"
+        if menu.run() != ("deux", "four!") or menu._current_tab_number != 1:
+            raise AssertionError
+
+    def test_ambiguous_prompt(self, config_multiple):
+        _ = self.__class__  # just to get rid of codacy warning, I know, it's stupid
+        c = deepcopy(config_multiple)
+        c["prefix_matching"] = True
+        c["tabs"][0]["items"][0]["item_inputs"].append("tWelve")
+        menu = Menu(c)
+        menu._testing = "collect_input"
+        pytabby.menu.input = lambda x: "tW"
+        if menu._collect_input() != "Ambiguous (tWelve, tWo), try again":
+            raise AssertionError
+        many = pytabby.tab.Result("ambiguous", candidates=tuple("abcdefghij"))
+        if pytabby.menu._retry_prompt(many) != "Ambiguous (a, b, c, d, e, f, g, h, ...), try again":
+            raise AssertionError
+
+    def teardown_method(self):
+        """Reverts input"""
+        _ = self.__class__  # just to get rid of codacy warning, I know, it's stupid
+        pytabby.menu.input = input
+
+
+class FakeWriter:
+    """Collects bytes written like an asyncio.StreamWriter"""
+
+    def __init__(self):
+        """Instantiator for FakeWriter class; starts with nothing written"""
+        self.data = b""
+
+    def write(self, data):
+        self.data += data
+
+    async def drain(self):
+        pass
+
+
+def stream_reader(lines):
+    """asyncio.StreamReader fed with lines, then end of stream; must be called inside the event loop"""
+    reader = asyncio.StreamReader()
+    reader.feed_data("".join(line + "\n" for line in lines).encode("utf-8"))
+    reader.feed_eof()
+    return reader
+
+
+@pytest.mark.integration
+@pytest.mark.run(order=10)
+class TestRunAsync:
+    """Tests Menu.run_async with asyncio streams"""
+
+    def test_change_tab_invalid_then_item(self, config_multiple, random_string):
+        _ = self.__class__  # just to get rid of codacy warning, I know, it's stupid
+        menu = Menu(config_multiple)
+        normal = menu._config
+        tab1 = normal["tabs"][1]
+        lines = [random_string, tab1["tab_header_input"], tab1["items"][0]["item_inputs"][0]]
+        writer = FakeWriter()
+
+        async def session():
+            return await menu.run_async("a message", stream_reader(lines), writer)
+
+        result = asyncio.run(session())
+        if result != ("deux", "three"):
+            raise AssertionError(result)
+        out = writer.data.decode("utf-8")
+        for part in ["a message", "Invalid, try again: ", "Change tab to deux", menu._render("a message")]:
+            if out.find(part) == -1:
+                raise AssertionError(part)
+
+    def test_end_of_stream(self, config_single_without_key):
+        _ = self.__class__  # just to get rid of codacy warning, I know, it's stupid
+        menu = Menu(config_single_without_key)
+
+        async def session():
+            return await menu.run_async(reader=stream_reader([]), writer=FakeWriter())
+
+        with pytest.raises(EOFError):
+            asyncio.run(session())
+
+    def test_concurrent_sessions(self, config_multiple):
+        _ = self.__class__  # just to get rid of codacy warning, I know, it's stupid
+        menus = [Menu(deepcopy(config_multiple)) for _ in range(20)]
+
+        async def sessions():
+            return await asyncio.gather(
+                *[m.run_async(reader=stream_reader(["deux", "3"]), writer=FakeWriter()) for m in menus]
+            )
+
+        if asyncio.run(sessions()) != [("deux", "three")] * 20:
+            raise AssertionError
+
+
+LAZY_IMPORTS = ["asyncio", "json", "yaml", "schema"]
+
+
+def import_times(statement):
+    """Cumulative import time in microseconds of each top-level module imported by statement
+
+    Measured in a new interpreter with python -X importtime; best of 3 runs
+    """
+    env = dict(os.environ, PYTHONPATH=os.path.dirname(os.path.dirname(pytabby.__file__)))
+    best = {}
+    for _ in range(3):
+        stderr = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", statement], env=env, stderr=subprocess.PIPE, check=True
+        ).stderr.decode("utf-8")
+        for line in stderr.splitlines()[1:]:  # first line is the column header
+            _, cumulative, name = line.split("|")
+            if not name.startswith("  "):  # imported by statement, not by another module
+                best[name.strip()] = min(best.get(name.strip(), float("inf")), int(cumulative))
+    return best
+
+
+@pytest.mark.benchmark
+@pytest.mark.run(order=11)
+class TestImportTime:
+    """Tests that import pytabby does not import modules it only needs for some menus"""
+
+    def test_lazy_modules_not_imported(self):
+        _ = self.__class__  # just to get rid of codacy warning, I know, it's stupid
+        statement = "import sys, pytabby; print(' '.join(sorted(sys.modules)))"
+        env = dict(os.environ, PYTHONPATH=os.path.dirname(os.path.dirname(pytabby.__file__)))
+        modules = subprocess.run(
+            [sys.executable, "-c", statement], env=env, stdout=subprocess.PIPE, check=True
+        ).stdout.split()
+        imported = [name for name in LAZY_IMPORTS if name.encode("utf-8") in modules]
+        if imported:
+            raise AssertionError(imported)
+
+    def test_import_time_regression(self):
+        """Importing pytabby takes less time than importing the modules it imports lazily
+
+        It included them before they were made lazy.
+        """
+        _ = self.__class__  # just to get rid of codacy warning, I know, it's stupid
+        pytabby_time = import_times("import pytabby")["pytabby"]
+        lazy_times = import_times("import " + ", ".join(LAZY_IMPORTS))
+        lazy_time = sum(lazy_times[name] for name in LAZY_IMPORTS)
+        if pytabby_time > lazy_time:
+            raise AssertionError("import pytabby: {0} us, its lazy imports: {1} us".format(pytabby_time, lazy_time))
+
+
+def write_config(path, config, mtime_ns):
+    """Writes config as json, with an explicit mtime so that the change is seen however fast the test runs"""
+    with open(path, "w") as f:
+        json.dump(config, f)
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+@pytest.mark.integration
+@pytest.mark.run(order=10)
+class TestWatch:
+    """Tests Menu.watch(), which reloads a config file when it changes"""
+
+    def test_reload_keeps_tab(self, tmpdir, config_multiple):
+        _ = self.__class__  # just to get rid of codacy warning, I know, it's stupid
+        path = str(tmpdir.join("menu.json"))
+        write_config(path, config_multiple, 10 ** 18)
+        menu = Menu.watch(path, start_tab_number=1)
+        definition = menu.definition
+        if list(menu.run_batch(["3"]))[0].value != ("deux", "three"):
+            raise AssertionError
+        config_multiple["tabs"][1]["items"][0]["item_returns"] = "trois"
+        write_config(path, config_multiple, 2 * 10 ** 18)
+        if list(menu.run_batch(["3"]))[0].value != ("deux", "trois") or menu.definition is definition:
+            raise AssertionError
+        # the unchanged tab was carried over, not normalized again
+        if menu.definition.config["tabs"][0] is not definition.config["tabs"][0]:
+            raise AssertionError
+        new_tab = {"tab_header_input": "zero", "items": [config_multiple["tabs"][0]["items"][0]]}
+        config_multiple["tabs"].insert(0, new_tab)
+        write_config(path, config_multiple, 3 * 10 ** 18)
+        if list(menu.run_batch(["3"]))[0] != BatchEvent("selection", "3", ("deux", "trois"), 2):
+            raise AssertionError
+
+    def test_new_tab_position(self, tmpdir, config_multiple):
+        _ = self.__class__  # just to get rid of codacy warning, I know, it's stupid
+        path = str(tmpdir.join("menu.json"))
+        write_config(path, config_multiple, 10 ** 18)
+        menu = Menu.watch(path, start_tab_number=1)
+        config_multiple["tabs"].reverse()
+        config_multiple["page_size"] = 1
+        write_config(path, config_multiple, 2 * 10 ** 18)
+        list(menu.run_batch([">"]))
+        if menu._current_tab_number != 0 or menu._current_page_number != 1:
+            raise AssertionError
+        config_multiple["tabs"][0]["items"].pop()
+        write_config(path, config_multiple, 3 * 10 ** 18)
+        list(menu.run_batch(["x"]))
+        if menu._current_tab_number != 0 or menu._current_page_number != 0:  # there is only one page now
+            raise AssertionError
+
+    def test_invalid_reload_keeps_menu(self, tmpdir, config_multiple):
+        _ = self.__class__  # just to get rid of codacy warning, I know, it's stupid
+        path = str(tmpdir.join("menu.json"))
+        write_config(path, config_multiple, 10 ** 18)
+        errors = []
+        menu = Menu.watch(path, on_error=lambda path_, error: errors.append(error))
+        definition = menu.definition
+        invalid = deepcopy(config_multiple)
+        invalid["tabs"][0]["items"][1]["item_inputs"] = ["ONE"]
+        write_config(path, invalid, 2 * 10 ** 18)
+        if list(menu.run_batch(["2", "2"]))[0].value != ("un", "2") or menu.definition is not definition:
+            raise AssertionError
+        if len(errors) != 1 or not isinstance(errors[0], validators.InvalidInputError):
+            raise AssertionError(errors)
+        if menu._watcher.error is not errors[0]:
+            raise AssertionError
+        os.remove(path)  # e.g. while being replaced
+        list(menu.run_batch(["2", "2"]))
+        if len(errors) != 2 or not isinstance(errors[1], FileNotFoundError):
+            raise AssertionError(errors)
+        write_config(path, config_multiple, 3 * 10 ** 18)
+        list(menu.run_batch(["2"]))
+        if len(errors) != 2 or menu._watcher.error is not None or menu.definition is definition:
+            raise AssertionError(errors)
+
+    def test_default_on_error_prints(self, tmpdir, config_multiple, capsys):
+        _ = self.__class__  # just to get rid of codacy warning, I know, it's stupid
+        path = str(tmpdir.join("menu.json"))
+        write_config(path, config_multiple, 10 ** 18)
+        menu = Menu.watch(path)
+        with open(path, "w") as f:
+            f.write("{")
+        list(menu.run_batch(["2"]))
+        if capsys.readouterr().out.find("Could not reload {0}, keeping the current menu".format(path)) == -1:
+            raise AssertionError
+
+    def test_swap_between_inputs(self, tmpdir, config_multiple):
+        """The input typed at a menu is processed by that menu; the change is shown at the next run()"""
+        _ = self.__class__  # just to get rid of codacy warning, I know, it's stupid
+        path = str(tmpdir.join("menu.json"))
+        write_config(path, config_multiple, 10 ** 18)
+        menu = Menu.watch(path)
+        changed = deepcopy(config_multiple)
+        changed["tabs"][0]["items"][1]["item_returns"] = "deux!"
+
+        def change_then_select(prompt):
+            write_config(path, changed, 2 * 10 ** 18)
+            return "2"
+
+        pytabby.menu.input = change_then_select
+        try:
+            if menu.run() != ("un", "2") or menu.run() != ("un", "deux!"):
+                raise AssertionError
+        finally:
+            pytabby.menu.input = input
+
+
+@pytest.mark.integration
+@pytest.mark.run(order=10)
+class TestIncrementalChanges:
+    """Tests Menu.add_item(), remove_item() and add_tab()"""
+
+    def test_changes_then_select(self, config_multiple):
+        _ = self.__class__  # just to get rid of codacy warning, I know, it's stupid
+        menu = Menu(config_multiple, start_tab_number=1)
+        session = menu.session()
+        item = {"item_choice_displayed": "5", "item_description": "Five", "item_inputs": [5], "item_returns": 5}
+        menu.add_item(1, item)
+        menu.add_tab({"tab_header_input": "trois", "items": [dict(config_multiple["tabs"][0]["items"][0])]})
+        menu.remove_item(0, "2")
+        events = list(menu.run_batch(["5", "un", "2", "trois", "1"]))
+        expected = [
+            BatchEvent("selection", "5", ("deux", "5"), 1),
+            BatchEvent("invalid", "2", None, 0),
+            BatchEvent("selection", "1", ("trois", "1"), 2),
+        ]
+        if events != expected:
+            raise AssertionError(events)
+        if list(session.run_batch(["5"]))[0].type != "invalid":  # sessions keep the definition they had
+            raise AssertionError
+
+    def test_page_clamped(self, config_multiple):
+        _ = self.__class__  # just to get rid of codacy warning, I know, it's stupid
+        config_multiple["page_size"] = 1
+        menu = Menu(config_multiple)
+        list(menu.run_batch([">"]))
+        menu.remove_item(0, "2")
+        if menu._current_page_number != 0 or menu.definition.n_pages(0) != 1:
+            raise AssertionError
+
+    def test_watched_menu_reloaded_in_full(self, tmpdir, config_multiple):
+        _ = self.__class__  # just to get rid of codacy warning, I know, it's stupid
+        path = str(tmpdir.join("menu.json"))
+        write_config(path, config_multiple, 10 ** 18)
+        menu = Menu.watch(path)
+        menu.remove_item(0, "2")
+        config_multiple["tabs"][1]["items"][0]["item_returns"] = "trois"
+        write_config(path, config_multiple, 2 * 10 ** 18)
+        # tab 0 is the same in both versions of the file, but not in the menu, so it is taken from the file
+        if list(menu.run_batch(["2"]))[0].value != ("un", "2"):
+            raise AssertionError
@@ -12,6 +12,7 @@ import pytest
 
 import pytabby.normalizer as normalizer
 
+
 @pytest.mark.function
 @pytest.mark.run(order=1)
 def test__add_tabs_key_if_needed_multiple(config_all_with_id):
@@ -157,3 +158,78 @@ class TestCaseInsensitive:
             or normal["tabs"][0]["items"][0]["item_inputs"][0] != random_string.lower()
         ):
             raise AssertionError
+
+
+class CountingDict(dict):
+    """dict that counts how many times its items() are walked"""
+
+    def __init__(self, *args, **kwargs):
+        """Instantiator for CountingDict class; takes the same arguments as dict"""
+        super().__init__(*args, **kwargs)
+        self.walks = 0
+
+    def items(self):
+        self.walks += 1
+        return super().items()
+
+
+def make_config(n_items):
+    """Multiple-tab config with n_items items in the first tab, each a CountingDict"""
+    items = [
+        CountingDict(
+            {
+                "item_choice_displayed": i,
+                "item_description": "Item {0}".format(i),
+                "item_inputs": [i, "I{0}".format(i)],
+                "item_returns": "r{0}".format(i),
+            }
+        )
+        for i in range(n_items)
+    ]
+    return {
+        "tabs": [
+            {
+                "tab_header_input": "a",
+                "tab_header_description": "A",
+                "tab_header_long_description": "AA",
+                "items": items,
+            },
+            {"tab_header_input": "b", "items": [CountingDict(item) for item in items[:1]]},
+        ]
+    }
+
+
+@pytest.mark.function
+@pytest.mark.run(order=2)
+def test_each_item_walked_once(config_multiple):
+    """Regression: items used to be rebuilt once per key of their tab"""
+    c = deepcopy(config_multiple)
+    for tab in c["tabs"]:
+        tab["items"] = [CountingDict(item) for item in tab["items"]]
+    normalizer.normalize(c)
+    for tab in c["tabs"]:
+        for item in tab["items"]:
+            if item.walks != 1:
+                raise AssertionError(item.walks)
+
+
+@pytest.mark.function
+@pytest.mark.run(order=2)
+def test_each_item_walked_once_in_large_tab():
+    """Normalization stays a single pass over the items however many there are"""
+    config = make_config(16000)
+    normalizer.normalize(config)
+    walks = {item.walks for tab in config["tabs"] for item in tab["items"]}
+    if walks != {1}:
+        raise AssertionError(walks)
+
+
+@pytest.mark.function
+@pytest.mark.run(order=2)
+def test_default_page_size(config_all):
+    """Configs without page_size are not paged, and without prefix_matching need exact inputs"""
+    normal = normalizer.normalize(deepcopy(config_all))
+    if normal["page_size"] is not None:
+        raise AssertionError
+    if normal["prefix_matching"] is not False:
+        raise AssertionError
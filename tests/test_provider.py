@@ -0,0 +1,250 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests pytabby/provider.py and provided items in definition.MenuDefinition and menu.MenuSession"""
+
+# pylama: ignore=D102
+# pylint: disable=C0116,C0330,W0212,C0103
+
+import pytest
+
+from pytabby import ItemProvider, Menu, MenuDefinition
+import pytabby.validators as validators
+
+
+def host_item(i):
+    """Item as provided for host number i"""
+    return {
+        "item_choice_displayed": str(i),
+        "item_description": "host{0}".format(i),
+        "item_inputs": [str(i)],
+        "item_returns": "host{0}".format(i),
+    }
+
+
+class Hosts:
+    """Callable item source of n_hosts hosts, recording the calls made to it"""
+
+    def __init__(self, n_hosts):
+        """Instantiator for Hosts class; see class docstring"""
+        self.n_hosts = n_hosts
+        self.calls = []
+
+    def __call__(self, offset, limit):
+        self.calls.append((offset, limit))
+        return [host_item(i) for i in range(offset, min(offset + limit, self.n_hosts))]
+
+
+class Clock:
+    """Clock that only moves when told to"""
+
+    def __init__(self):
+        """Instantiator for Clock class; starts at time 0"""
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def hosts_config():
+    """Config with a tab for hosts, with a refresh item, and another tab"""
+    return {
+        "tabs": [
+            {
+                "tab_header_input": "hosts",
+                "items": [
+                    {
+                        "item_choice_displayed": "r",
+                        "item_description": "Refresh",
+                        "item_inputs": ["r"],
+                        "item_returns": "refresh",
+                    }
+                ],
+            },
+            {
+                "tab_header_input": "other",
+                "items": [
+                    {
+                        "item_choice_displayed": "q",
+                        "item_description": "Quit",
+                        "item_inputs": ["q"],
+                        "item_returns": "quit",
+                    }
+                ],
+            },
+        ]
+    }
+
+
+@pytest.mark.function
+@pytest.mark.run(order=13)
+class TestItemProvider:
+    """Tests ItemProvider's fetching and caching"""
+
+    def test_callable_fetched_by_page(self):
+        _ = self.__class__  # just to get rid of codacy warning, I know, it's stupid
+        hosts = Hosts(25)
+        item_provider = ItemProvider(hosts, page_size=10)
+        items, more = item_provider.page(1)
+        if [item["item_returns"] for item in items] != ["host{0}".format(i) for i in range(10, 20)] or not more:
+            raise AssertionError
+        if item_provider.page(1)[0] is not items or hosts.calls != [(10, 11)]:
+            raise AssertionError
+        if item_provider.n_pages() != (3, False):
+            raise AssertionError
+        if len(item_provider.page(2)[0]) != 5 or item_provider.page(2)[1] or item_provider.n_pages() != (3, True):
+            raise AssertionError
+        if item_provider.page(3) != ((), False) or item_provider.n_pages() != (3, True):
+            raise AssertionError
+
+    def test_ttl(self):
+        _ = self.__class__  # just to get rid of codacy warning, I know, it's stupid
+        hosts, clock = Hosts(25), Clock()
+        item_provider = ItemProvider(hosts, page_size=10, ttl=5, clock=clock)
+        items = item_provider.page(0)[0]
+        clock.now = 4.9
+        if item_provider.page(0)[0] is not items:
+            raise AssertionError
+        clock.now = 5.0
+        hosts.n_hosts = 5
+        if item_provider.page(0) != (tuple(host_item(i) for i in range(5)), False) or len(hosts.calls) != 2:
+            raise AssertionError
+        if item_provider.n_pages() != (1, True):
+            raise AssertionError
+
+    def test_size_limit(self):
+        _ = self.__class__  # just to get rid of codacy warning, I know, it's stupid
+        hosts = Hosts(100)
+        item_provider = ItemProvider(hosts, page_size=10, max_cached_items=20)
+        for page_number in [0, 1, 0, 2]:
+            item_provider.page(page_number)
+        # page 1 was the least recently used
+        if list(item_provider._pages) != [0, 2] or item_provider._n_cached_items != 20:
+            raise AssertionError
+        item_provider.page(1)
+        if len(hosts.calls) != 4:
+            raise AssertionError
+        item_provider.clear()
+        item_provider.page(0)
+        if len(hosts.calls) != 5 or item_provider._n_cached_items != 10:
+            raise AssertionError
+
+    def test_iterable_pulled_lazily(self):
+        _ = self.__class__  # just to get rid of codacy warning, I know, it's stupid
+        pulled = []
+
+        def generate():
+            for i in range(1000):
+                pulled.append(i)
+                yield host_item(i)
+
+        item_provider = ItemProvider(generate(), page_size=10, max_cached_items=5)
+        if pulled or item_provider.page(1)[0] != tuple(host_item(i) for i in range(10, 20)):
+            raise AssertionError
+        if len(pulled) != 21 or item_provider.page(0)[0] != tuple(host_item(i) for i in range(10)):
+            raise AssertionError
+        if len(pulled) != 21:
+            raise AssertionError
+
+    def test_invalid_arguments(self):
+        _ = self.__class__  # just to get rid of codacy warning, I know, it's stupid
+        for kwargs in [{"page_size": 0}, {"page_size": True}, {"ttl": 0}, {"max_cached_items": -1}]:
+            with pytest.raises(ValueError):
+                ItemProvider(Hosts(5), **kwargs)
+
+
+@pytest.mark.integration
+@pytest.mark.run(order=13)
+class TestProvidedItems:
+    """Tests menus with provided items"""
+
+    def test_render_and_select(self):
+        _ = self.__class__  # just to get rid of codacy warning, I know, it's stupid
+        hosts = Hosts(45)
+        menu = Menu(hosts_config(), item_providers={0: ItemProvider(hosts, page_size=10)})
+        frame = menu._render()
+        if "[r] Refresh\n[0] host0" not in frame or "[9] host9\nPage 1/2+ " not in frame:
+            raise AssertionError(frame)
+        # only the items of the page shown can be selected
+        events = list(menu.run_batch(["3", "13", ">", "13", "#5", "44", "r", "other", "3"]))
+        values = [event.value for event in events]
+        if values != [("hosts", "host3"), None, ("hosts", "host13"), ("hosts", "host44"), ("hosts", "refresh"), None]:
+            raise AssertionError(events)
+        if hosts.calls != [(0, 11), (10, 11), (40, 11)]:
+            raise AssertionError(hosts.calls)
+        menu._change_tab(0, announce=False)
+        list(menu.run_batch(["#5"]))
+        if "Page 5/5 " not in menu._render() or list(menu.run_batch(["#6"]))[0].type != "invalid":
+            raise AssertionError
+
+    def test_generator(self):
+        _ = self.__class__  # just to get rid of codacy warning, I know, it's stupid
+        pulled = []
+
+        def generate():
+            for i in range(10 ** 6):
+                pulled.append(i)
+                yield host_item(i)
+
+        menu = Menu(hosts_config(), item_providers={0: ItemProvider(generate(), page_size=5)})
+        if list(menu.run_batch([">", ">", "12"]))[0].value != ("hosts", "host12") or len(pulled) != 16:
+            raise AssertionError
+        if menu.definition.sorted_inputs(0, 2) != ("10", "11", "12", "13", "14", "<", ">", "hosts", "other", "r"):
+            raise AssertionError(menu.definition.sorted_inputs(0, 2))
+
+    def test_page_validated_once(self, monkeypatch):
+        _ = self.__class__  # just to get rid of codacy warning, I know, it's stupid
+        definition = MenuDefinition.from_config(hosts_config(), item_providers={0: ItemProvider(Hosts(30))})
+        calls = []
+        validate = validators.validate_and_normalize_provided
+
+        def counting_validate(*args):
+            calls.append(args[2])
+            return validate(*args)
+
+        monkeypatch.setattr(validators, "validate_and_normalize_provided", counting_validate)
+        definition.render(0, 0, 80)
+        definition.provided_result(0, 0, "3")
+        definition.render(0, 1, 80)
+        if len(calls) != 2 or [len(items) for items in calls] != [20, 10]:
+            raise AssertionError
+
+    def test_pages_kept_while_provider_caches_them(self):
+        _ = self.__class__  # just to get rid of codacy warning, I know, it's stupid
+        item_provider = ItemProvider(Hosts(1000), page_size=5, max_cached_items=10)
+        menu = Menu(hosts_config(), item_providers={0: item_provider})
+        menu._render()
+        for _ in range(60):
+            list(menu.run_batch([">"]))
+            menu._render()
+        if len(item_provider._pages) != 2 or len(menu.definition._provided_pages) > 2:
+            raise AssertionError(menu.definition._provided_pages.keys())
+        if item_provider.cached(0) is not None or item_provider.cached(60) != item_provider.page(60)[0]:
+            raise AssertionError
+
+    def test_invalid_provided_items(self):
+        _ = self.__class__  # just to get rid of codacy warning, I know, it's stupid
+        for item in [dict(host_item(1), item_inputs=["r"]), dict(host_item(1), item_returns="refresh"), {"a": 1}]:
+            items = [host_item(0), item]
+            menu = Menu(hosts_config(), item_providers={0: ItemProvider(lambda offset, limit, items=items: items)})
+            with pytest.raises(validators.InvalidInputError, match="tab#0.*item#2|tab#0, there are repeated"):
+                menu._render()
+
+    def test_item_providers_checked(self):
+        _ = self.__class__  # just to get rid of codacy warning, I know, it's stupid
+        for item_providers in [{2: ItemProvider(Hosts(5))}, {"hosts": ItemProvider(Hosts(5))}, {0: Hosts(5)}]:
+            with pytest.raises(ValueError, match="item_providers"):
+                Menu(hosts_config(), item_providers=item_providers)
+
+    def test_kept_by_new_definitions(self):
+        _ = self.__class__  # just to get rid of codacy warning, I know, it's stupid
+        item_provider = ItemProvider(Hosts(5))
+        definition = MenuDefinition.from_config(hosts_config(), item_providers={0: item_provider})
+        if definition == MenuDefinition.from_config(hosts_config()):
+            raise AssertionError
+        new_item = {"item_choice_displayed": "x", "item_description": "X", "item_inputs": ["x"], "item_returns": "x"}
+        new_definition = definition.with_items(0, [new_item])
+        if new_definition.item_providers != {0: item_provider}:
+            raise AssertionError
+        if "[x] X\n[0] host0" not in new_definition.render(0, 0, 80):
+            raise AssertionError
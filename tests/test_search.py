@@ -0,0 +1,137 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests pytabby/search.py and search inputs in menu.MenuSession"""
+
+# pylama: ignore=D102
+# pylint: disable=C0116,C0330,W0212,C0103
+
+import pytest
+
+from pytabby import Menu
+from pytabby.search import SearchIndex
+import pytabby.menu
+
+WORDS = ["widget", "bolt", "screw", "hex", "nut", "washer", "bracket", "steel", "brass", "copper", "relay"]
+
+
+def inventory_items(n_items):
+    """Items like those generated from an inventory, with descriptions made of three words and a SKU"""
+    return [
+        {
+            "item_choice_displayed": str(i),
+            "item_description": "{0} {1} {2} SKU-{3}".format(
+                WORDS[i % 11], WORDS[(i // 11) % 11], WORDS[(i // 121) % 11], i
+            ),
+            "item_inputs": [str(i)],
+            "item_returns": str(i),
+        }
+        for i in range(n_items)
+    ]
+
+
+@pytest.mark.function
+@pytest.mark.run(order=2)
+class TestSearchIndex:
+    """Tests SearchIndex.search"""
+
+    def test_all_words_must_match(self):
+        _ = self.__class__  # just to get rid of codacy warning, I know, it's stupid
+        index = SearchIndex(inventory_items(2000))
+        matches = index.search("Hex BOLT")
+        if not matches or matches != sorted(matches):
+            raise AssertionError
+        for i in matches:
+            description = inventory_items(2000)[i]["item_description"].lower()
+            if "hex" not in description or "bolt" not in description:
+                raise AssertionError
+
+    def test_substring_not_just_trigrams(self):
+        _ = self.__class__  # just to get rid of codacy warning, I know, it's stupid
+        index = SearchIndex([{"item_choice_displayed": "a", "item_description": "abc xbcd"}])
+        if index.search("bcd") != [0] or index.search("abcd") != []:
+            raise AssertionError
+
+    def test_short_and_empty_queries(self):
+        _ = self.__class__  # just to get rid of codacy warning, I know, it's stupid
+        index = SearchIndex(inventory_items(30))
+        if index.search("  ") != list(range(30)):
+            raise AssertionError
+        if index.search("29") != [29] or index.search("zz") != []:
+            raise AssertionError
+
+    def test_choice_searched_and_no_description(self):
+        _ = self.__class__  # just to get rid of codacy warning, I know, it's stupid
+        index = SearchIndex([{"item_choice_displayed": "Quit", "item_description": None}])
+        if index.search("qui") != [0]:
+            raise AssertionError
+
+
+class CountingList(list):
+    """List counting the elements read by index"""
+
+    def __init__(self, elements):
+        """Instantiator for CountingList class; takes the elements of the list"""
+        super().__init__(elements)
+        self.n_read = 0
+
+    def __getitem__(self, index):
+        """Returns the element at index, counting it as read"""
+        self.n_read += 1
+        return super().__getitem__(index)
+
+
+@pytest.mark.function
+@pytest.mark.run(order=2)
+def test_search_reads_few_texts_at_100k():
+    """Queries on 100k items read only the texts of items containing a rare part of their long words"""
+    index = SearchIndex(inventory_items(100000))
+    index._texts = CountingList(index._texts)
+    # words of up to three characters are looked up in the index without reading any text
+    for query, max_read in [("hex nut 123", 0), ("zz", 0), ("99", 0), ("a 1", 0), ("sku-99999", 1000)]:
+        index._texts.n_read = 0
+        matches = index.search(query)
+        if index._texts.n_read > max_read:
+            raise AssertionError("query {0!r} read {1} texts".format(query, index._texts.n_read))
+        expected = [i for i, text in enumerate(index._texts) if all(word in text for word in query.split())]
+        if matches != expected:
+            raise AssertionError(query)
+
+
+@pytest.mark.integration
+@pytest.mark.run(order=10)
+class TestSearchInput:
+    """Tests search inputs in Menu"""
+
+    def test_collect_input_shows_matches(self, capsys):
+        _ = self.__class__  # just to get rid of codacy warning, I know, it's stupid
+        menu = Menu({"items": inventory_items(500)})
+        menu._testing = "collect_input"
+        pytabby.menu.input = lambda x: "/SKU-49"
+        if menu._collect_input() != "?":
+            raise AssertionError
+        lines = capsys.readouterr().out.splitlines()
+        items = [line for line in lines if line.startswith("[")]
+        if len(items) != 11 or not all("SKU-49" in line for line in items):  # 49 and 490 to 499
+            raise AssertionError(lines)
+        if lines[-1] != "11 matches for 'sku-49' (/ alone: show all items)":
+            raise AssertionError(lines[-1])
+
+    def test_matches_limited(self):
+        _ = self.__class__  # just to get rid of codacy warning, I know, it's stupid
+        menu = Menu({"items": inventory_items(500), "page_size": 5})
+        frame = menu._search_frame("/steel")
+        if frame.count("\n[") != 5 or frame.find("showing the first 5") == -1:
+            raise AssertionError(frame)
+        if menu._search_frame("/ ") != menu._render():
+            raise AssertionError
+
+    def test_batch_ignores_search(self, config_multiple):
+        _ = self.__class__  # just to get rid of codacy warning, I know, it's stupid
+        if list(Menu(config_multiple).run_batch(["/one"])):
+            raise AssertionError
+
+    def teardown_method(self):
+        """Reverts input"""
+        _ = self.__class__  # just to get rid of codacy warning, I know, it's stupid
+        pytabby.menu.input = input
@@ -0,0 +1,133 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests pytabby/server.py and the serve and connect subcommands of pytabby/cli.py"""
+
+# pylama: ignore=D102
+# pylint: disable=C0116,C0330,W0212,C0103
+
+import asyncio
+import socket
+import time
+
+import pytest
+
+from pytabby import Menu
+import pytabby.cli as cli
+import pytabby.server as server
+
+N_LOAD_TEST_SESSIONS = 300
+
+
+async def client_session(address, lines, expected):
+    """Simulated client: sends lines, reads until expected text, disconnects; returns everything received"""
+    if isinstance(address, str):
+        reader, writer = await asyncio.open_unix_connection(address)
+    else:
+        reader, writer = await asyncio.open_connection(*address)
+    writer.write("".join(line + "\n" for line in lines).encode("utf-8"))
+    await writer.drain()
+    received = await asyncio.wait_for(reader.readuntil(expected.encode("utf-8")), 10)
+    writer.close()
+    await writer.wait_closed()
+    return received.decode("utf-8")
+
+
+def run_clients(menu, sessions, path=None, on_selection=None):
+    """Serves menu on a free localhost port (or Unix socket path) and runs sessions, a list of (lines, expected)"""
+
+    async def main():
+        srv = await server.start_server(menu, path=path, port=0, on_selection=on_selection)
+        async with srv:
+            address = path if path is not None else srv.sockets[0].getsockname()[:2]
+            return await asyncio.gather(*[client_session(address, lines, expected) for lines, expected in sessions])
+
+    return asyncio.run(main())
+
+
+@pytest.mark.function
+@pytest.mark.run(order=11)
+def test_default_on_selection():
+    """Tuples of multiple-tab menus are joined with colons"""
+    if server.default_on_selection(("a", "b")) != "Selected a:b\n":
+        raise AssertionError
+    if server.default_on_selection("b") != "Selected b\n":
+        raise AssertionError
+
+
+@pytest.mark.integration
+@pytest.mark.run(order=11)
+def test_sessions_have_own_state(config_multiple):
+    """One session changing tab does not change another session's tab, nor the served menu's"""
+    menu = Menu(config_multiple)
+    received = run_clients(menu, [(["deux", "3"], "Selected deux:three\n"), (["1"], "Selected un:1\n")])
+    if received[1].find("Change tab") != -1:
+        raise AssertionError
+    if menu._current_tab_number != 0:
+        raise AssertionError
+
+
+@pytest.mark.integration
+@pytest.mark.run(order=11)
+def test_sessions_share_definition(config_multiple):
+    """Sessions share the served menu's definition, including its rendered frames"""
+    menu = Menu(config_multiple)
+    session = menu.session()
+    session._change_tab(1, announce=False)
+    session._render()
+    if session.definition is not menu.definition or not menu._frames:
+        raise AssertionError
+    if menu._current_tab_number != 0:
+        raise AssertionError
+
+
+@pytest.mark.integration
+@pytest.mark.run(order=11)
+def test_custom_on_selection(config_single_without_key):
+    """on_selection's return value is sent to the client"""
+    menu = Menu(config_single_without_key)
+    received = run_clients(menu, [(["1"], "handled 1\n")], on_selection=lambda value: "handled {0}\n".format(value))
+    if received[0].find("?: ") == -1:
+        raise AssertionError
+
+
+@pytest.mark.integration
+@pytest.mark.run(order=11)
+@pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="Unix sockets not available")
+def test_unix_socket(config_multiple, tmp_path):
+    """Serves over a Unix socket"""
+    menu = Menu(config_multiple)
+    run_clients(menu, [(["3", "deux", "3"], "Selected deux:three\n")], path=str(tmp_path / "menu.sock"))
+
+
+@pytest.mark.benchmark
+@pytest.mark.run(order=11)
+def test_load_many_concurrent_sessions(config_multiple):
+    """Hundreds of simulated sessions, each changing tab and selecting, served by one menu"""
+    menu = Menu(config_multiple)
+    sessions = []
+    for i in range(N_LOAD_TEST_SESSIONS):
+        if i % 2:
+            sessions.append((["bad input", "deux", "three"], "Selected deux:three\n"))
+        else:
+            sessions.append((["ONE"], "Selected un:1\n"))
+    start = time.perf_counter()
+    received = run_clients(menu, sessions)
+    elapsed = time.perf_counter() - start
+    if len(received) != N_LOAD_TEST_SESSIONS:
+        raise AssertionError
+    if elapsed > 30:
+        raise AssertionError("{0} sessions took {1:.1f}s".format(N_LOAD_TEST_SESSIONS, elapsed))
+
+
+@pytest.mark.function
+@pytest.mark.run(order=11)
+def test_cli_parser():
+    """The serve and connect subcommands parse their arguments"""
+    parser = cli._build_parser()
+    args = parser.parse_args(["serve", "menu.yaml", "--unix", "/tmp/menu.sock", "--handler", "pytabby.server:serve"])
+    if args.config != "menu.yaml" or args.unix != "/tmp/menu.sock" or args.handler is not server.serve:
+        raise AssertionError
+    args = parser.parse_args(["connect", "--port", "9000"])
+    if args.port != 9000 or args.host != server.DEFAULT_HOST:
+        raise AssertionError
@@ -9,9 +9,11 @@ If input config changes, regression tests will have to change.
 Functionality of this module is tested in menu.py tests
 """
 
+# pylama: ignore=D102
 # pylint: disable=C0116,C0330,W0212,C0103
 
 from copy import deepcopy
+import random
 
 import pytest
 
@@ -49,5 +51,268 @@ def test_regress_create_tab_object(data_regression, config_all_with_id):
     tabs = tab.create_tab_objects(c)
     data = {}
     for i, tab_instance in enumerate(tabs):
-        data[i] = freeze_tab(tab_instance.__dict__)
+        tab_dict = {k: getattr(tab_instance, k) for k in ["head_choice", "head_desc", "head_desc_long", "selectors"]}
+        tab_dict["input2result"] = tab_instance.input2result
+        data[i] = freeze_tab(tab_dict)
     data_regression.check(data)
+
+
+@pytest.mark.function
+@pytest.mark.run(order=3)
+def test_selector_results_shared(config_multiple):
+    """Tab-change Results are built once per menu, not once per tab"""
+    tabs = tab.create_tab_objects(normalizer.normalize(deepcopy(config_multiple)))
+    selector = tabs[0].selectors[1]
+    if not all(t.process_input(selector) is tabs[0].process_input(selector) for t in tabs):
+        raise AssertionError
+
+
+@pytest.mark.function
+@pytest.mark.run(order=3)
+def test_item_inputs_share_result(config_multiple):
+    """All inputs of one item lead to the same Result object"""
+    c = normalizer.normalize(deepcopy(config_multiple))
+    tab_instance = tab.create_tab_objects(c)[0]
+    inputs = c["tabs"][0]["items"][0]["item_inputs"]
+    if len(inputs) < 2 or tab_instance.process_input(inputs[0]) is not tab_instance.process_input(inputs[1]):
+        raise AssertionError
+
+
+@pytest.mark.function
+@pytest.mark.run(order=1)
+def test_result_behaves_like_read_only_dict():
+    """Result compares equal to the dicts it replaced, and cannot be changed"""
+    result = tab.Result("change_tab", new_number=1)
+    if result != {"type": "change_tab", "new_number": 1} or result["new_number"] != 1:
+        raise AssertionError
+    if result.get("return_value", "n/a") != "n/a" or tab.INVALID != {"type": "invalid"}:
+        raise AssertionError
+    with pytest.raises(AttributeError):
+        result.type = "return"
+    if deepcopy(result) != result:
+        raise AssertionError
+    if not hasattr(tab.Tab, "__slots__"):
+        raise AssertionError
+
+
+def prefix_tabs(prefix_matching=True):
+    """Tab objects of a two-tab config whose inputs share prefixes"""
+    items = [
+        {"item_choice_displayed": "s", "item_inputs": ["save", "s"], "item_returns": "save"},
+        {"item_choice_displayed": "sa", "item_inputs": ["save as"], "item_returns": "save_as"},
+        {"item_choice_displayed": "se", "item_inputs": ["select"], "item_returns": "select"},
+        {"item_choice_displayed": "o", "item_inputs": ["open", "open file"], "item_returns": "open"},
+    ]
+    other_items = [{"item_choice_displayed": "x", "item_inputs": ["x"], "item_returns": "x"}]
+    config = {
+        "prefix_matching": prefix_matching,
+        "tabs": [{"tab_header_input": "files", "items": items}, {"tab_header_input": "edit", "items": other_items}],
+    }
+    return tab.create_tab_objects(normalizer.normalize(config))
+
+
+@pytest.mark.function
+@pytest.mark.run(order=3)
+class TestPrefixMatching:
+    """Tests prefix matching in Tab.process_input"""
+
+    def test_unique_prefix(self):
+        _ = self.__class__  # just to get rid of codacy warning, I know, it's stupid
+        tab_instance = prefix_tabs()[0]
+        if tab_instance.process_input("op")["return_value"] != "open":  # both inputs of 'open' start with 'op'
+            raise AssertionError
+        if tab_instance.process_input("sel")["return_value"] != "select":
+            raise AssertionError
+        if tab_instance.process_input("ed") != {"type": "change_tab", "new_number": 1}:
+            raise AssertionError
+
+    def test_exact_match_first(self):
+        _ = self.__class__  # just to get rid of codacy warning, I know, it's stupid
+        tab_instance = prefix_tabs()[0]
+        if tab_instance.process_input("save")["return_value"] != "save":  # also a prefix of 'save as'
+            raise AssertionError
+
+    def test_ambiguous_prefix(self):
+        _ = self.__class__  # just to get rid of codacy warning, I know, it's stupid
+        result = prefix_tabs()[0].process_input("sa")
+        if result != {"type": "ambiguous", "candidates": ("save", "save as")}:
+            raise AssertionError(result)
+
+    def test_invalid(self):
+        _ = self.__class__  # just to get rid of codacy warning, I know, it's stupid
+        tab_instance = prefix_tabs()[0]
+        for inputstr in ["", "z", "opx", "save as well"]:
+            if tab_instance.process_input(inputstr) is not tab.INVALID:
+                raise AssertionError(inputstr)
+
+    def test_off_by_default(self):
+        _ = self.__class__  # just to get rid of codacy warning, I know, it's stupid
+        tab_instance = prefix_tabs(prefix_matching=False)[0]
+        if tab_instance.process_input("op") is not tab.INVALID or tab_instance._trie is not None:
+            raise AssertionError
+
+    def test_trie_built_once_lazily(self):
+        _ = self.__class__  # just to get rid of codacy warning, I know, it's stupid
+        tab_instance = prefix_tabs()[0]
+        tab_instance.process_input("save")
+        if tab_instance._trie is not None:
+            raise AssertionError("exact matches do not need the trie")
+        tab_instance.process_input("op")
+        trie = tab_instance._trie
+        tab_instance.process_input("sel")
+        if trie is None or tab_instance._trie is not trie:
+            raise AssertionError
+
+
+def jump_tabs(global_jump=True):
+    """Tab objects of config_multiple's layout with global_jump; 'x' is an input of two tabs"""
+    config = {
+        "global_jump": global_jump,
+        "tabs": [
+            {
+                "tab_header_input": "files",
+                "items": [
+                    {"item_choice_displayed": "o", "item_inputs": ["o"], "item_returns": "open"},
+                    {"item_choice_displayed": "x", "item_inputs": ["x"], "item_returns": "exit"},
+                ],
+            },
+            {
+                "tab_header_input": "edit",
+                "items": [
+                    {"item_choice_displayed": "c", "item_inputs": ["c", "copy"], "item_returns": "copy"},
+                    {"item_choice_displayed": "x", "item_inputs": ["x"], "item_returns": "cut"},
+                ],
+            },
+        ],
+    }
+    return tab.create_tab_objects(normalizer.normalize(config))
+
+
+@pytest.mark.function
+@pytest.mark.run(order=3)
+class TestGlobalJump:
+    """Tests global jump inputs in Tab.process_input"""
+
+    def test_qualified_and_unique_inputs(self):
+        _ = self.__class__  # just to get rid of codacy warning, I know, it's stupid
+        files = jump_tabs()[0]
+        expected = {"type": "jump", "new_number": 1, "return_value": "copy"}
+        for inputstr in ["edit:c", "edit:copy", "c", "copy"]:
+            if files.process_input(inputstr) != expected:
+                raise AssertionError(inputstr)
+        if files.process_input("edit:x")["return_value"] != "cut":
+            raise AssertionError
+
+    def test_shared_and_not_unique(self):
+        _ = self.__class__  # just to get rid of codacy warning, I know, it's stupid
+        files, edit = jump_tabs()
+        if files.process_input("c") is not files.process_input("edit:copy"):
+            raise AssertionError
+        if files._jump_results is not edit._jump_results:
+            raise AssertionError
+        if "x" in files._jump_results:  # both tabs have 'x'
+            raise AssertionError
+
+    def test_current_tab_first(self):
+        _ = self.__class__  # just to get rid of codacy warning, I know, it's stupid
+        files = jump_tabs()[0]
+        if files.process_input("x") != {"type": "return", "return_value": "exit"}:
+            raise AssertionError
+        if files.process_input("o")["type"] != "return":
+            raise AssertionError
+
+    def test_off_by_default(self):
+        _ = self.__class__  # just to get rid of codacy warning, I know, it's stupid
+        if jump_tabs(global_jump=False)[0].process_input("edit:c") is not tab.INVALID:
+            raise AssertionError
+
+
+def wide_config(n_tabs):
+    """Normalized config with n_tabs tabs of two items each"""
+    return normalizer.normalize(
+        {
+            "tabs": [
+                {
+                    "tab_header_input": "t{0}".format(i),
+                    "items": [
+                        {
+                            "item_choice_displayed": str(j),
+                            "item_inputs": ["{0}-{1}".format(i, j)],
+                            "item_returns": "{0}-{1}".format(i, j),
+                        }
+                        for j in range(2)
+                    ],
+                }
+                for i in range(n_tabs)
+            ]
+        }
+    )
+
+
+def tab_dict(tab_instance):
+    """Everything a Tab holds, for comparison"""
+    dct = {k: getattr(tab_instance, k) for k in ["head_choice", "head_desc", "head_desc_long", "selectors"]}
+    dct["input2result"] = tab_instance.input2result
+    return freeze_tab(dct)
+
+
+@pytest.mark.function
+@pytest.mark.run(order=3)
+class TestLazyTabs:
+    """Tests that tabs after the first are built on first access"""
+
+    def test_only_first_built(self):
+        _ = self.__class__  # just to get rid of codacy warning, I know, it's stupid
+        tabs = tab.create_tab_objects(wide_config(50))
+        if len(tabs) != 50 or tabs.n_built != 1:
+            raise AssertionError
+        if tabs[30] is not tabs[30] or tabs[-1] is not tabs[49] or tabs.n_built != 3:
+            raise AssertionError
+        list(tabs)
+        if tabs.n_built != 50:
+            raise AssertionError
+
+    def test_lazy_identical_to_eager(self):
+        _ = self.__class__  # just to get rid of codacy warning, I know, it's stupid
+        config = wide_config(5)
+        eager = list(tab.create_tab_objects(config))
+        lazy = tab.create_tab_objects(config)
+        for i in reversed(range(5)):
+            if tab_dict(lazy[i]) != tab_dict(eager[i]):
+                raise AssertionError
+        # selector results are still shared by every tab, however late it is built
+        if lazy[4].input2result["t0"] is not lazy[0].input2result["t0"]:
+            raise AssertionError
+
+
+@pytest.mark.function
+@pytest.mark.run(order=3)
+class TestLayeredDict:
+    """Tests LayeredDict against a dict changed the same way"""
+
+    def test_same_as_dict(self):
+        _ = self.__class__  # just to get rid of codacy warning, I know, it's stupid
+        rng = random.Random(0)
+        reference = {"k{0}".format(i): i for i in range(200)}
+        layered = tab.LayeredDict(dict(reference))
+        versions = []
+        for step in range(2000):
+            removed = rng.sample(sorted(reference), min(len(reference), rng.randint(0, 2)))
+            added = {"k{0}".format(rng.randrange(400)): step for _ in range(rng.randint(0, 2))}
+            new_layered = layered.updated(added, removed)
+            for key in removed:
+                del reference[key]
+            reference.update(added)
+            if new_layered != reference or len(new_layered) != len(reference):
+                raise AssertionError(step)
+            if step % 400 == 0:
+                versions.append((layered, dict(layered)))
+            layered = new_layered
+        if len(layered._layers) > 12:  # O(log n) layers
+            raise AssertionError(layered)
+        for key in ["k0", "k399", "nokey"]:
+            if layered.get(key, -1) != reference.get(key, -1) or (key in layered) != (key in reference):
+                raise AssertionError(key)
+        for version, version_dict in versions:
+            if version != version_dict:
+                raise AssertionError
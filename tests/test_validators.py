@@ -6,15 +6,25 @@
 # pylama: ignore=D102
 # pylint: disable=C0116,C0330,W0212,C0103
 
+from collections import Counter
 from copy import deepcopy
+import random
+import time
+import tracemalloc
 
 import pytest
 
+import pytabby.normalizer as normalizer
 import pytabby.validators as validators
 
 # HELPER FUNCTIONS #
 
 
+def messages_of(error_messages):
+    """Returns the messages of a list of validators.ErrorRecord, as validate_all shows them"""
+    return [str(error) for error in error_messages]
+
+
 def del_key_if_present(dict_, key):
     """Returns dict with deleted key if it was there, otherwise unchanged dict"""
     if key in dict_.keys():
@@ -28,7 +38,7 @@ def del_key_if_present(dict_, key):
 def validate_schema_fail(conf, expected_error_message_parts, case=None):
     """Boilerplate to validate the failure of a schema"""
     error_messages = []
-    error_messages = validators._validate_schema(error_messages, conf)
+    error_messages = messages_of(validators._validate_schema(error_messages, conf))
     if len(error_messages) != 1:
         raise AssertionError("There should be one error message, not {0}".format(len(error_messages)))
     for message in expected_error_message_parts:
@@ -46,7 +56,7 @@ def validate_iteration_fail(conf, expected_error_message_part, case=None):
     Note there may be multiple errors, this will only check if the iteration error appears.
     """
     error_messages = []
-    error_messages = validators._validate_schema(error_messages, conf)
+    error_messages = messages_of(validators._validate_schema(error_messages, conf))
     if validators._determine_config_layout(conf) is None:
         error_messages.append("Schema type not recognized")
     found = False
@@ -530,20 +540,10 @@ def test_fn__config_tabs(config_all):
 
 @pytest.mark.function
 @pytest.mark.run(order=2)
-def test_fn__validate_no_return_value_overlap(config_all):
+def test_fn__validate_no_overlap(config_all):
     """Expect pass on valid input data"""
     error_messages = []
-    error_messages = validators._validate_no_return_value_overlap(error_messages, config_all)
-    if error_messages:
-        raise AssertionError
-
-
-@pytest.mark.function
-@pytest.mark.run(order=2)
-def test_fn__validate_no_input_value_overlap(config_all):
-    """Expect pass on valid input data"""
-    error_messages = []
-    error_messages = validators._validate_no_input_value_overlap(error_messages, config_all)
+    error_messages = validators._validate_no_overlap(error_messages, config_all)
     if error_messages:
         raise AssertionError
 
@@ -559,7 +559,7 @@ def test_validate_no_return_value_overlap_fail(config_all_with_id):
     else:
         c["items"] += [c["items"][-1]]
     error_messages = []
-    error_messages = validators._validate_no_return_value_overlap(error_messages, c)
+    error_messages = messages_of(validators._validate_no_overlap(error_messages, c))
     if all([x.find("there are repeated return values") == -1 for x in error_messages]):
         raise AssertionError
 
@@ -581,8 +581,8 @@ def test_validate_no_input_value_overlap_fail_within_an_item(config_all_with_id,
         else:
             c["items"][0]["item_inputs"] += new_returns
         error_messages = []
-        validators._validate_no_input_value_overlap(error_messages, c)
-        if all([x.find("there are repeated input values") == -1 for x in error_messages]):
+        validators._validate_no_overlap(error_messages, c)
+        if all([x.find("there are repeated input values") == -1 for x in messages_of(error_messages)]):
             raise AssertionError
 
 
@@ -599,11 +599,66 @@ def test__validate_no_input_value_overlap_fail_between_item_and_tab(config_multi
         else:
             c["tabs"][1]["items"][0]["item_inputs"] += [random_string.lower()]
         error_messages = []
-        validators._validate_no_input_value_overlap(error_messages, c)
-        if all([x.find("there are repeated input values") == -1 for x in error_messages]):
+        validators._validate_no_overlap(error_messages, c)
+        if all([x.find("there are repeated input values") == -1 for x in messages_of(error_messages)]):
             raise AssertionError
 
 
+def counter_overlap_messages(config):
+    """Messages of repeated inputs and return values, computed with one Counter per tab as validators used to"""
+    case_sensitive = config.get("case_sensitive", False)
+    tabs = config["tabs"]
+    selectors = [tab["tab_header_input"] for tab in tabs]
+    input_messages, return_messages = [], []
+    for tab_num, tab in enumerate(tabs):
+        choices = selectors + [entry for item in tab["items"] for entry in item["item_inputs"]]
+        if not case_sensitive:
+            choices = [str(choice).lower() for choice in choices]
+        multiples = [x for x in Counter(choices).most_common() if x[1] > 1]
+        if multiples:
+            input_messages.append(
+                "In tab#{0}, there are repeated input values including tab selectors: {1}.{2}".format(
+                    tab_num,
+                    multiples,
+                    "" if case_sensitive else " Note case sensitive is false, so values have been changed to "
+                    "lower-case, which can create overlap",
+                )
+            )
+        multiples = [x for x in Counter(item["item_returns"] for item in tab["items"]).most_common() if x[1] > 1]
+        if multiples:
+            return_messages.append("In tab#{0}, there are repeated return values: {1}.".format(tab_num, multiples))
+    return input_messages + return_messages
+
+
+@pytest.mark.breaking
+@pytest.mark.run(order=3)
+@pytest.mark.parametrize("seed", range(20))
+def test_validate_no_overlap_matches_counters(seed):
+    """Single-pass overlap detection gives the same messages, in the same order, as one Counter per tab"""
+    rng = random.Random(seed)
+    values = ["a", "A", "b", "B", "c", 1, "1", "d"]
+    config = {
+        "case_sensitive": rng.random() < 0.5,
+        "tabs": [
+            {
+                "tab_header_input": rng.choice(values),
+                "items": [
+                    {
+                        "item_choice_displayed": "x",
+                        "item_inputs": rng.sample(values, rng.randint(1, 3)),
+                        "item_returns": rng.choice(values),
+                    }
+                    for _ in range(rng.randint(1, 5))
+                ],
+            }
+            for _ in range(rng.randint(2, 4))
+        ],
+    }
+    messages = messages_of(validators._validate_no_overlap([], config))
+    if messages != counter_overlap_messages(config):
+        raise AssertionError("\n".join(messages + ["!="] + counter_overlap_messages(config)))
+
+
 @pytest.mark.integration
 @pytest.mark.run(order=4)
 def test_fn_validate_all(config_all):
@@ -628,9 +683,363 @@ def test_fn_validate_all_fail(config_all):
 
 @pytest.mark.function
 @pytest.mark.run(order=1)
-def test__shorten_long_schema_error_messages():
+def test__shorten_long_schema_error_message():
     """Tests that function"""
-    error_messages = ["stuff that comes at the beginning in {'key': 'value'}"]
-    error_messages = validators._shorten_long_schema_error_messages(error_messages)
-    if error_messages[0] != "stuff that comes at the beginning in config":
+    error_message = "stuff that comes at the beginning in {'key': 'value'}"
+    if validators._shorten_long_schema_error_message(error_message) != "stuff that comes at the beginning in config":
+        raise AssertionError
+    if validators._shorten_long_schema_error_message("in {} is too short") != "in {} is too short":
+        raise AssertionError
+
+
+# BACKEND TESTS #
+
+
+def _items_of(c):
+    """Return the items list of the first tab of any config layout"""
+    if "tabs" in c.keys():
+        return c["tabs"][0]["items"]
+    return c["items"]
+
+
+BACKEND_MUTATIONS = {
+    "none": lambda c: c,
+    "case_sensitive_str": lambda c: c.update({"case_sensitive": "string"}),
+    "screen_width_bool": lambda c: c.update({"screen_width": True}),
+    "screen_width_negative": lambda c: c.update({"screen_width": -1}),
+    "page_size_str": lambda c: c.update({"page_size": "string"}),
+    "page_size_zero": lambda c: c.update({"page_size": 0}),
+    "prefix_matching_str": lambda c: c.update({"prefix_matching": "string"}),
+    "global_jump_str": lambda c: c.update({"global_jump": "string"}),
+    "top_level_wrong_key": lambda c: c.update({"astring": "astring", "anotherstring": 1}),
+    "not_a_dict": lambda c: _items_of(c).__setitem__(0, "s"),
+    "item_inputs_str": lambda c: _items_of(c)[0].update({"item_inputs": "astring"}),
+    "item_inputs_empty": lambda c: _items_of(c)[0].update({"item_inputs": ()}),
+    "item_inputs_dict": lambda c: _items_of(c)[0].update({"item_inputs": {0: 1}}),
+    "item_returns_none": lambda c: _items_of(c)[0].update({"item_returns": None}),
+    "item_description_empty": lambda c: _items_of(c)[0].update({"item_description": ""}),
+    "item_missing_keys": lambda c: _items_of(c).__setitem__(0, {"item_description": "x"}),
+    "entry_none": lambda c: _items_of(c)[0]["item_inputs"].__setitem__(0, None),
+    "entry_empty": lambda c: _items_of(c)[0]["item_inputs"].__setitem__(0, ""),
+}
+
+
+@pytest.mark.breaking
+@pytest.mark.run(order=3)
+@pytest.mark.parametrize("mutation", sorted(BACKEND_MUTATIONS.keys()))
+def test_compiled_backend_matches_schema_backend(config_all, mutation):
+    """The compiled backend must produce exactly the same error messages as the schema package"""
+    c = deepcopy(config_all)
+    BACKEND_MUTATIONS[mutation](c)
+    compiled = messages_of(validators._validate_schema([], c, backend="compiled"))
+    schema_ = messages_of(validators._validate_schema([], c, backend="schema"))
+    if mutation != "none" and not schema_:
+        raise AssertionError("mutation did not break config")
+    if compiled != schema_:
+        raise AssertionError("\n".join(compiled + ["!="] + schema_))
+
+
+@pytest.mark.breaking
+@pytest.mark.run(order=3)
+def test_compiled_backend_matches_schema_backend_forbidden_key(config_single_with_key):
+    """Forbidden keys in single_with_key layout give the same message in both backends"""
+    c = deepcopy(config_single_with_key)
+    c["tabs"][0]["tab_header_description"] = "astring"
+    compiled = messages_of(validators._validate_schema([], c, backend="compiled"))
+    schema_ = messages_of(validators._validate_schema([], c, backend="schema"))
+    if not compiled or compiled != schema_:
+        raise AssertionError("\n".join(compiled + ["!="] + schema_))
+
+
+@pytest.mark.breaking
+@pytest.mark.run(order=3)
+def test_unrecognized_backend(config_all):
+    """Only values in VALIDATION_BACKENDS are allowed"""
+    with pytest.raises(ValueError):
+        validators.validate_all(config_all, backend="nonexistent")
+
+
+@pytest.mark.function
+@pytest.mark.run(order=3)
+def test_prefix_matching_warns_about_page_inputs(config_multiple):
+    """With prefix_matching and page_size, inputs starting with a page navigation input hide it"""
+    c = deepcopy(config_multiple)
+    c["page_size"] = 1
+    c["tabs"][1]["items"][0]["item_inputs"].append(">>")
+    validators.validate_all(c)  # no warning without prefix matching
+    c["prefix_matching"] = True
+    with pytest.warns(validators.PrefixMatchingWarning, match=r"tab#1.*\['>>'\]"):
+        validators.validate_all(c)
+    c["tabs"][1]["items"][0]["item_inputs"][-1] = ">"
+    validators.validate_all(c)  # equal inputs already take precedence, prefix matching changes nothing
+
+
+@pytest.mark.breaking
+@pytest.mark.run(order=3)
+class TestGlobalJumpOverlap:
+    """Tests cross-tab rules for global_jump"""
+
+    def test_valid(self, config_multiple):
+        _ = self.__class__  # just to get rid of codacy warning, I know, it's stupid
+        c = deepcopy(config_multiple)
+        c["global_jump"] = True
+        if validators._validate_no_overlap([], c):
+            raise AssertionError
+
+    def test_repeated_qualified_input(self, config_multiple):
+        _ = self.__class__  # just to get rid of codacy warning, I know, it's stupid
+        c = deepcopy(config_multiple)
+        c["global_jump"] = True
+        c["tabs"][0]["tab_header_input"] = "un:x"
+        c["tabs"][1]["tab_header_input"] = "un"
+        c["tabs"][1]["items"][0]["item_inputs"].append("x:2")
+        messages = messages_of(validators._validate_no_overlap([], c))
+        if messages != ["With global_jump, there are repeated qualified inputs: [('un:x:2', 2)]."]:
+            raise AssertionError(messages)
+
+    def test_qualified_input_is_input(self, config_multiple):
+        _ = self.__class__  # just to get rid of codacy warning, I know, it's stupid
+        c = deepcopy(config_multiple)
+        c["global_jump"] = True
+        c["case_sensitive"] = False
+        c["tabs"][1]["items"][0]["item_inputs"].append("UN:1")
+        with pytest.raises(validators.InvalidInputError, match="also inputs of tabs or tab selectors: \\['un:1'\\]"):
+            validators.validate_all(c)
+
+    def test_single_tab_ignored(self, config_single_with_key):
+        _ = self.__class__  # just to get rid of codacy warning, I know, it's stupid
+        c = deepcopy(config_single_with_key)
+        c["global_jump"] = True
+        validators.validate_all(c)
+
+
+# ERROR RECORD TESTS #
+
+
+class CountingRepr:
+    """Value that counts how many times its repr is built"""
+
+    n_reprs = 0
+
+    def __repr__(self):
+        """Returns the same repr every time, counting it"""
+        CountingRepr.n_reprs += 1
+        return "CountingRepr()"
+
+
+def broken_items(n_items):
+    """Single tab config whose every item has an invalid item_returns value"""
+    return {
+        "items": [
+            {"item_choice_displayed": "a", "item_inputs": [str(i)], "item_returns": None} for i in range(n_items)
+        ]
+    }
+
+
+@pytest.mark.breaking
+@pytest.mark.run(order=4)
+class TestErrorRecords:
+    """Tests structured, bounded and lazily formatted errors of validate_all"""
+
+    def test_records(self):
+        _ = self.__class__  # just to get rid of codacy warning, I know, it's stupid
+        with pytest.raises(validators.InvalidInputError) as excinfo:
+            validators.validate_all(broken_items(3))
+        errors = excinfo.value.errors
+        if [error.path for error in errors] != [("item", 0), ("item", 1), ("item", 2)]:
+            raise AssertionError(errors)
+        if {error.kind for error in errors} != {"schema"} or not excinfo.value.complete:
+            raise AssertionError(errors)
+        expected = "item#1: schema.SchemaError: Key 'item_returns' error: <lambda>(None) should evaluate to True"
+        if str(errors[1]) != expected:
+            raise AssertionError(str(errors[1]))
+
+    def test_max_errors_and_fail_fast(self):
+        _ = self.__class__  # just to get rid of codacy warning, I know, it's stupid
+        for kwargs, n_errors in [({}, 100), ({"max_errors": 7}, 7), ({"fail_fast": True}, 1)]:
+            with pytest.raises(validators.InvalidInputError) as excinfo:
+                validators.validate_all(broken_items(50000), **kwargs)
+            if len(excinfo.value.errors) != n_errors or excinfo.value.complete:
+                raise AssertionError
+            if not str(excinfo.value).endswith("Stopped after {0} error(s); there may be more.".format(n_errors)):
+                raise AssertionError
+        with pytest.raises(validators.InvalidInputError) as excinfo:
+            validators.validate_all(broken_items(150), max_errors=None)
+        if len(excinfo.value.errors) != 150 or not excinfo.value.complete:
+            raise AssertionError
+        for max_errors in [0, True, 1.5]:
+            with pytest.raises(ValueError):
+                validators.validate_all(broken_items(1), max_errors=max_errors)
+
+    def test_formatted_only_when_displayed(self):
+        _ = self.__class__  # just to get rid of codacy warning, I know, it's stupid
+        c = broken_items(1)
+        c["items"][0]["item_returns"] = "a"
+        c["items"][0]["item_inputs"] = {"a": [CountingRepr()] * 1000}
+        c["wrong_key"] = CountingRepr()
+        CountingRepr.n_reprs = 0
+        with pytest.raises(validators.InvalidInputError) as excinfo:
+            validators.validate_all(c)
+        if CountingRepr.n_reprs:
+            raise AssertionError
+        message = str(excinfo.value)
+        if CountingRepr.n_reprs != 3 * validators._MAX_REPR_ITEMS:  # item_inputs is shown three times
+            raise AssertionError(CountingRepr.n_reprs)
+        if message.find("Wrong key 'wrong_key' in config") == -1 or message.find("CountingRepr(), ...]}") == -1:
+            raise AssertionError(message)
+
+    def test_message_or_single_record(self):
+        _ = self.__class__  # just to get rid of codacy warning, I know, it's stupid
+        error = validators.InvalidInputError("msg")
+        if str(error) != "msg" or error.args != ("msg",) or error.errors:
+            raise AssertionError(error.errors)
+        record = validators.ErrorRecord(("tab", 0), "schema", ("bad",))
+        error = validators.InvalidInputError(record)
+        if error.errors != [record] or str(error) != "\nErrors:\n1. tab#0: bad":
+            raise AssertionError(str(error))
+
+
+@pytest.mark.function
+@pytest.mark.run(order=1)
+@pytest.mark.parametrize("value", [{}, (), (1,), [1, (2,), {"a": None}], "s" * 10, {1: "x", "y": [True]}])
+def test_bounded_repr_of_small_values(value):
+    """Small values are shown exactly as repr() shows them"""
+    if validators._bounded_repr(value) != repr(value):
+        raise AssertionError
+
+
+# FUSED VALIDATE AND NORMALIZE TESTS #
+
+
+def validate_then_normalize(config, backend="compiled"):
+    """Returns normalized config, or message of InvalidInputError, as validate_all() then normalize() give them"""
+    try:
+        validators.validate_all(config, backend=backend)
+    except (validators.InvalidInputError, AttributeError) as e:  # AttributeError for items that are not dicts
+        return repr(e) if isinstance(e, AttributeError) else str(e)
+    return normalizer.normalize(config)
+
+
+def validate_and_normalize(config, backend="compiled"):
+    """Returns normalized config, or message of InvalidInputError, as validators.validate_and_normalize gives them"""
+    try:
+        return validators.validate_and_normalize(config, backend=backend)
+    except (validators.InvalidInputError, AttributeError) as e:  # AttributeError for items that are not dicts
+        return repr(e) if isinstance(e, AttributeError) else str(e)
+
+
+@pytest.mark.breaking
+@pytest.mark.run(order=4)
+@pytest.mark.parametrize("backend", validators.VALIDATION_BACKENDS)
+@pytest.mark.parametrize("mutation", sorted(BACKEND_MUTATIONS.keys()))
+def test_validate_and_normalize_matches(config_all, mutation, backend):
+    """One traversal gives the same normalized config or the same errors, and leaves config unchanged"""
+    c = deepcopy(config_all)
+    BACKEND_MUTATIONS[mutation](c)
+    before = deepcopy(c)
+    fused = validate_and_normalize(c, backend)
+    if c != before:
+        raise AssertionError("config was modified")
+    if fused != validate_then_normalize(c, backend):
+        raise AssertionError(fused)
+
+
+@pytest.mark.breaking
+@pytest.mark.run(order=4)
+@pytest.mark.parametrize("seed", range(20))
+def test_validate_and_normalize_matches_overlap(seed):
+    """Repeated inputs, return values and qualified inputs are found as validate_all() finds them"""
+    rng = random.Random(seed)
+    values = ["a", "A", "b", "B", "c", 1, "1", "d:a", 0]
+    config = {
+        "case_sensitive": rng.random() < 0.5,
+        "global_jump": rng.random() < 0.5,
+        "tabs": [
+            {
+                "tab_header_input": rng.choice(values),
+                "items": [
+                    {
+                        "item_choice_displayed": "x",
+                        "item_inputs": rng.sample(values, rng.randint(1, 2)),
+                        "item_returns": rng.choice(values),
+                    }
+                    for _ in range(rng.randint(1, 3))
+                ],
+            }
+            for _ in range(rng.randint(2, 3))
+        ],
+    }
+    if validate_and_normalize(config) != validate_then_normalize(config):
+        raise AssertionError
+
+
+@pytest.mark.function
+@pytest.mark.run(order=4)
+def test_normalize_does_not_modify_config(config_all):
+    """The caller's config is left as it was, including single_without_key layouts"""
+    c = deepcopy(config_all)
+    normalizer.normalize(c)
+    if c != config_all:
         raise AssertionError
+
+
+def lower_case_config(n_items):
+    """Four tabs sharing n_items items with lower-case inputs, as most configs have"""
+    return {
+        "tabs": [
+            {
+                "tab_header_input": "t{0}".format(t),
+                "items": [
+                    {
+                        "item_choice_displayed": str(i),
+                        "item_description": "item number {0}".format(i),
+                        "item_inputs": ["i{0}".format(i), "item{0}".format(i)],
+                        "item_returns": "r{0}".format(i),
+                    }
+                    for i in range(n_items // 4)
+                ],
+            }
+            for t in range(4)
+        ]
+    }
+
+
+def timeit_once(function):
+    """Returns seconds taken by one call of function"""
+    start = time.perf_counter()
+    function()
+    return time.perf_counter() - start
+
+
+@pytest.mark.benchmark
+@pytest.mark.run(order=4)
+@pytest.mark.parametrize("n_items", [1000, 10000, 100000])
+def test_benchmark_validate_and_normalize(n_items):
+    """One traversal allocates less at its peak than validate_all() then normalize(), and takes less time
+
+    Less allocation because the normalized inputs reuse the caller's strings when already lower-case. Allocation
+    is linear in items and tracing it is slow, so it is compared up to 10k items; time is compared from 10k
+    items, where the difference is well above timing noise
+    """
+    config = lower_case_config(n_items)
+
+    def fused():
+        validators.validate_and_normalize(config)
+
+    def separate():
+        validators.validate_all(config)
+        normalizer.normalize(config)
+
+    peaks, times = {}, {}
+    for name, function in [("fused", fused), ("separate", separate)]:
+        if n_items <= 10000:
+            tracemalloc.start()
+            function()
+            peaks[name] = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        if n_items >= 10000:
+            times[name] = min(timeit_once(function) for _ in range(3))
+    if peaks and peaks["fused"] >= peaks["separate"]:
+        raise AssertionError(peaks)
+    if times and times["fused"] >= times["separate"]:
+        raise AssertionError(times)